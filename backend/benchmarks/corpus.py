@@ -0,0 +1,134 @@
+import os
+import random
+import shutil
+
+# Seconds since the epoch of 2015-01-01, the oldest modification time given to generated files
+BASE_TIME = 1420070400
+TEN_YEARS = 10 * 365 * 24 * 3600
+
+EXTENSIONS = (".jpg", ".png", ".txt", ".pdf", ".mp4", ".json", ".docx", "")
+
+# Corpus parameters per profile, the keyword arguments of generate_corpus
+PROFILES = {
+    "smoke": dict(tiny_files=500, tiny_size=(0, 4096), huge_files=1, huge_size=8 << 20,
+                  fanout=4, levels=2, depth=16, hardlinks=20, duplicate_ratio=0.3),
+    "default": dict(tiny_files=20000, tiny_size=(0, 16384), huge_files=4, huge_size=64 << 20,
+                    fanout=6, levels=3, depth=64, hardlinks=500, duplicate_ratio=0.3),
+    "large": dict(tiny_files=200000, tiny_size=(0, 65536), huge_files=8, huge_size=512 << 20,
+                  fanout=8, levels=4, depth=128, hardlinks=5000, duplicate_ratio=0.3),
+}
+
+CHUNK_SIZE = 1 << 20
+
+
+def _directories(root, fanout, levels, depth):
+    """
+    Returns the directories of the corpus: a balanced tree with fanout subdirectories per
+    level, plus one chain of depth nested directories.
+    """
+    directories = [root]
+    current = [root]
+    for level in range(levels):
+        current = [os.path.join(parent, f"dir_{level}_{index}") for parent in current for index in range(fanout)]
+        directories.extend(current)
+
+    chain = root
+    for level in range(depth):
+        chain = os.path.join(chain, f"nested_{level:03d}")
+        directories.append(chain)
+
+    for directory in directories:
+        os.makedirs(directory, exist_ok=True)
+    return directories
+
+
+def _write_huge_file(path, size, seed):
+    rng = random.Random(seed)
+    with open(path, 'wb') as f:
+        remaining = size
+        while remaining > 0:
+            chunk = min(CHUNK_SIZE, remaining)
+            f.write(rng.randbytes(chunk))
+            remaining -= chunk
+
+
+def generate_corpus(root, seed=0, tiny_files=500, tiny_size=(0, 4096), huge_files=1, huge_size=8 << 20,
+                    fanout=4, levels=2, depth=16, hardlinks=20, duplicate_ratio=0.3):
+    """
+    Generates a deterministic synthetic directory tree. The same arguments always produce the
+    same paths, contents and modification times, so runs on different commits are comparable.
+
+    Args:
+        root (str): Directory to generate the corpus in, created if missing.
+        seed (int): Seed of the random generator.
+        tiny_files (int): Number of small files.
+        tiny_size (tuple): Minimum and maximum size in bytes of a small file.
+        huge_files (int): Number of large files.
+        huge_size (int): Size in bytes of a large file.
+        fanout (int): Subdirectories per directory of the balanced tree.
+        levels (int): Levels of the balanced tree.
+        depth (int): Length of the chain of nested directories.
+        hardlinks (int): Number of hard links to small files, placed in their own directory.
+        duplicate_ratio (float): Probability of a file repeating the content of an earlier file.
+
+    Returns:
+        dict: A manifest describing the generated corpus.
+    """
+    rng = random.Random(seed)
+    directories = _directories(root, fanout, levels, depth)
+
+    manifest = {
+        'seed': seed,
+        'files': 0,
+        'bytes': 0,
+        'duplicate_files': 0,
+        'hardlinks': 0,
+        'directories': len(directories),
+        'max_depth': depth,
+    }
+
+    contents = []
+    tiny_paths = []
+    for index in range(tiny_files):
+        directory = rng.choice(directories)
+        path = os.path.join(directory, f"file_{index:07d}{rng.choice(EXTENSIONS)}")
+        if contents and rng.random() < duplicate_ratio:
+            content = rng.choice(contents)
+            manifest['duplicate_files'] += 1
+        else:
+            content = rng.randbytes(rng.randint(*tiny_size))
+            contents.append(content)
+        with open(path, 'wb') as f:
+            f.write(content)
+        mtime = BASE_TIME + rng.randint(0, TEN_YEARS)
+        os.utime(path, (mtime, mtime))
+        tiny_paths.append(path)
+        manifest['files'] += 1
+        manifest['bytes'] += len(content)
+
+    huge_paths = []
+    for index in range(huge_files):
+        path = os.path.join(rng.choice(directories), f"huge_{index:03d}.bin")
+        if huge_paths and rng.random() < duplicate_ratio:
+            shutil.copyfile(rng.choice(huge_paths), path)
+            manifest['duplicate_files'] += 1
+        else:
+            _write_huge_file(path, huge_size, seed * 1000003 + index)
+            huge_paths.append(path)
+        mtime = BASE_TIME + rng.randint(0, TEN_YEARS)
+        os.utime(path, (mtime, mtime))
+        manifest['files'] += 1
+        manifest['bytes'] += huge_size
+
+    links_directory = os.path.join(root, "links")
+    os.makedirs(links_directory, exist_ok=True)
+    for index, target in enumerate(rng.sample(tiny_paths, min(hardlinks, len(tiny_paths)))):
+        try:
+            os.link(target, os.path.join(links_directory, f"link_{index:06d}_{os.path.basename(target)}"))
+        except OSError:
+            # File systems without hard links still get the rest of the corpus
+            break
+        manifest['hardlinks'] += 1
+        manifest['files'] += 1
+
+    return manifest
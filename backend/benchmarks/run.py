@@ -0,0 +1,195 @@
+import argparse
+import contextlib
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The application imports modules relative to backend/ (src.core) and to backend/src (database, api)
+sys.path[:0] = [BACKEND_DIRECTORY, os.path.join(BACKEND_DIRECTORY, "src")]
+
+from benchmarks.corpus import PROFILES, generate_corpus  # noqa: E402
+from src.core.processor import Processor  # noqa: E402
+from src.core.file_operations import FileOperations  # noqa: E402
+from src.core.progress import Progress  # noqa: E402
+from src.core.metrics import METRICS  # noqa: E402
+
+STAGES = ("walk", "get_file_metadata", "add_files", "add_duplicates", "move_duplicates")
+
+
+def _git_revision():
+    """
+    Returns the commit the benchmark runs on and whether the working tree has changes.
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=BACKEND_DIRECTORY, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=BACKEND_DIRECTORY,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        return commit, bool(status)
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def _timed(function):
+    started = time.perf_counter()
+    result = function()
+    return time.perf_counter() - started, result
+
+
+def run_once(params, seed, workdir):
+    """
+    Generates a corpus in workdir and times every stage on it separately.
+    Generating the corpus is not part of any measurement.
+
+    Returns:
+        tuple: The corpus manifest and a dictionary with seconds, items and bytes per stage.
+    """
+    source = os.path.join(workdir, "source")
+    destination = os.path.join(workdir, "destination")
+    manifest = generate_corpus(source, seed=seed, **params)
+
+    METRICS.reset()
+    processor = Processor(db_name=os.path.join(workdir, "benchmark.db"))
+    file_operations = FileOperations()
+    results = {}
+
+    # Stages print per file, keep the terminal out of the measurement
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        seconds, filepaths = _timed(lambda: processor._get_all_filepaths(source))
+        results['walk'] = {'seconds': seconds, 'items': len(filepaths), 'bytes': 0}
+
+        seconds, sizes = _timed(lambda: [file_operations.get_file_metadata(path)['size'] for path in filepaths])
+        results['get_file_metadata'] = {'seconds': seconds, 'items': len(sizes), 'bytes': sum(sizes)}
+
+        progress = Progress("add_files", show_bar=False)
+        seconds, _ = _timed(lambda: processor.add_files(source, progress=progress))
+        results['add_files'] = {'seconds': seconds, 'items': progress.done, 'bytes': progress.bytes}
+
+        progress = Progress("add_duplicates", unit="hash", show_bar=False)
+        seconds, _ = _timed(lambda: processor.add_duplicates(progress=progress))
+        results['add_duplicates'] = {'seconds': seconds, 'items': progress.done, 'bytes': 0}
+
+        progress = Progress("move_duplicates", show_bar=False)
+        seconds, _ = _timed(lambda: processor.move_duplicates(destination, progress=progress))
+        results['move_duplicates'] = {'seconds': seconds, 'items': progress.done, 'bytes': progress.bytes}
+
+    processor.db_operations.close()
+    return manifest, results
+
+
+def _aggregate(runs):
+    """
+    Summarizes the repetitions of every stage. Throughput is derived from the fastest run,
+    which is the least disturbed by other load on the machine.
+    """
+    stages = {}
+    for stage in STAGES:
+        seconds = [run[stage]['seconds'] for run in runs]
+        best = min(seconds)
+        items, total_bytes = runs[0][stage]['items'], runs[0][stage]['bytes']
+        stages[stage] = {
+            'seconds': [round(value, 6) for value in seconds],
+            'min_seconds': round(best, 6),
+            'median_seconds': round(statistics.median(seconds), 6),
+            'items': items,
+            'bytes': total_bytes,
+            'items_per_second': round(items / best, 3) if best > 0 else None,
+            'bytes_per_second': round(total_bytes / best, 3) if best > 0 else None,
+        }
+    return stages
+
+
+def compare(results, baseline, threshold):
+    """
+    Compares the fastest run of every stage against a baseline result file.
+
+    Returns:
+        list: Descriptions of the stages that got slower by more than threshold (a fraction).
+    """
+    regressions = []
+    # Round trip through JSON, tuples of the profile are lists in the baseline file
+    if json.loads(json.dumps(results['corpus'])) != baseline.get('corpus'):
+        logging.warning("The baseline was measured on a different corpus, the comparison is not meaningful.")
+    for stage, measured in results['stages'].items():
+        reference = baseline.get('stages', {}).get(stage)
+        if not reference or not reference['min_seconds']:
+            continue
+        change = measured['min_seconds'] / reference['min_seconds'] - 1
+        if change > threshold:
+            regressions.append(f"{stage}: {reference['min_seconds']:.4f}s -> {measured['min_seconds']:.4f}s "
+                               f"(+{change:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the processing stages on a synthetic corpus.")
+    parser.add_argument("-p", "--profile", choices=sorted(PROFILES), default="smoke", help="Size of the corpus.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the corpus generator.")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Number of runs, each on a fresh corpus.")
+    parser.add_argument("--duplicate-ratio", type=float, help="Override the duplicate ratio of the profile.")
+    parser.add_argument("-o", "--output", type=str, help="Path of the JSON result file.")
+    parser.add_argument("--compare", type=str, help="Result file of a baseline run to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Slowdown of a stage, as a fraction, reported as a regression.")
+    parser.add_argument("--workdir", type=str, help="Directory for the corpora, a temporary directory by default.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Keep the log output of the stages.")
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    params = dict(PROFILES[args.profile])
+    if args.duplicate_ratio is not None:
+        params['duplicate_ratio'] = args.duplicate_ratio
+
+    runs = []
+    manifest = None
+    for _ in range(args.repeat):
+        with tempfile.TemporaryDirectory(dir=args.workdir, prefix="matr-benchmark-") as workdir:
+            manifest, stages = run_once(params, args.seed, workdir)
+            runs.append(stages)
+
+    commit, dirty = _git_revision()
+    results = {
+        'commit': commit,
+        'dirty': dirty,
+        'created_at': time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'profile': args.profile,
+        'repeat': args.repeat,
+        'corpus': {'params': params, **manifest},
+        'stages': _aggregate(runs),
+        'metrics': METRICS.summary(),
+    }
+
+    output = args.output or os.path.join(os.path.dirname(os.path.abspath(__file__)), "results",
+                                         f"{args.profile}-{(commit or 'unknown')[:12]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    for stage, measured in results['stages'].items():
+        print(f"{stage:<18} {measured['min_seconds']:>10.4f}s  {measured['items']:>8} items  "
+              f"{measured['items_per_second'] or 0:>12.1f} items/s")
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import logging
 from src.core.processor import Processor
+from src.core.cache import SummaryCache
 from argparse import Namespace
 from database.Postgresql import Postgresql
 from src.api.ApiServerUvicorn import APIServerUvicorn
@@ -42,7 +43,7 @@ class App:
         try:
             self._args_config = ArgsConfig(**vars(args))
             self._config = Config(self._args_config)  # Returns the configuration instance.
-            self._processor = Processor()
+            self._processor = Processor(cache=SummaryCache(), config=self._config.get_config_app())
             self._db = Postgresql(self._config) #ToDo
             self._api_server = APIServerUvicorn(self._db)
             self._initialized = True
@@ -53,9 +54,10 @@ class App:
             raise
 
     def run_api_server(self):
-        api_host = self._config.get_config_api()['api_host']
-        api_port = self._config.get_config_api()['api_port']
-        api_log_level = self._config.get_config_api()['api_log_level']
+        api_config = self._config.get_config_api()
+        api_host = api_config['api_host']
+        api_port = api_config['api_port']
+        api_log_level = api_config['api_log_level']
 
         self._api_server.run(api_host, api_port, api_log_level)
 
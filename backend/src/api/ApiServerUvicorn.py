@@ -2,11 +2,16 @@ import logging
 import uvicorn
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 from database.DatabaseBase import DatabaseBase
 from database.Postgresql import Postgresql
+from api.v1.routers.RouterBase import RouterBase
+from api.v1.routers import routerDuplicates, routerJobs, routerItems, routerFiles, routerRollups
+from src.config.Config import Config
+from src.core.jobs import JobManager
+from src.core.metrics import METRICS
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -24,7 +29,7 @@ class APIServerUvicorn:
         return cls._instance
 
     def __init__(self, postgresql:Postgresql):
-        if hasattr(self, 'initialized') and self.initialized:
+        if self._initialized:
             logging.info("APIServer instance already initialized.")
             return
 
@@ -35,6 +40,13 @@ class APIServerUvicorn:
             # self._setup_exception_handlers()
             # Example database operation
             self._db = postgresql
+            RouterBase(fast_api).include_routers([
+                (routerDuplicates.router, "/duplicates"),
+                (routerJobs.router, "/jobs"),
+                (routerRollups.router, "/rollups"),
+                (routerItems.router, ""),
+                (routerFiles.router, "/files"),
+            ])
             self._initialized = True
             logging.info("APIServer instance successfully initialized.")
         except Exception as e:
@@ -48,13 +60,22 @@ class APIServerUvicorn:
         @fast_api.on_event("shutdown")
         async def shutdown_event():
             logging.info("Shutting down FastAPI server...")
+            if JobManager._instance is not None:
+                JobManager._instance.shutdown()
+            if Config._instance is not None:
+                Config._instance.stop_watching()
+            await self._db.dispose_async()
 
 
         @fast_api.get("/")
         async def read_root():
-            results = self._db.execute("SELECT * FROM health_check")
+            results = await self._db.execute_async("SELECT * FROM health_check")
             return {"message": str(results)}  # TODO message results: results)}
 
+        @fast_api.get("/metrics", response_class=PlainTextResponse)
+        async def read_metrics():
+            # Prometheus text exposition format, includes the counters merged in from finished jobs
+            return PlainTextResponse(METRICS.render_prometheus(), media_type="text/plain; version=0.0.4")
 
         @fast_api.exception_handler(RequestValidationError)
         async def validation_exception_handler(request, exc):
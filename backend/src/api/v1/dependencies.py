@@ -1,13 +1,69 @@
 # src/api/dependencies.py
-from sqlalchemy.orm import sessionmaker
+from typing import AsyncGenerator, Generator
 from src.database.DatabaseBase import DatabaseBase
-from sqlalchemy.exc import OperationalError
-from fastapi import HTTPException
 from fastapi import Depends
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from src.common.Service import MyService
+from database.operations.db_operations import DatabaseOperations
+from src.core.cache import SummaryCache
+from src.core.jobs import JobManager
+from src.config.Config import Config
+from src.config.ConfigModel import AppConfig
 
+_summary_cache: SummaryCache = None
 
-def get_my_service(db: Session = Depends(DatabaseBase._get_session())) -> MyService:
+
+def get_database_session() -> Generator[Session, None, None]:
+    with DatabaseBase()._get_session() as session:
+        yield session
+
+
+async def get_async_database_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Provides an async session for read endpoints, so queries do not block the event loop.
+    """
+    async with DatabaseBase().get_async_session() as session:
+        yield session
+
+
+def get_my_service(db: Session = Depends(get_database_session)) -> MyService:
     return MyService(db)
 
+
+def get_database_operations() -> Generator[DatabaseOperations, None, None]:
+    """
+    Provides a connection to the file index for the duration of a request.
+    Requests are served from a threadpool, so the connection is not bound to the creating thread.
+    """
+    db_operations = DatabaseOperations(check_same_thread=False)
+    try:
+        yield db_operations
+    finally:
+        db_operations.close()
+
+
+def get_summary_cache() -> SummaryCache:
+    """
+    Provides the process wide summary cache. Its Redis connection pool is shared by all requests.
+    """
+    global _summary_cache
+    if _summary_cache is None:
+        _summary_cache = SummaryCache()
+    return _summary_cache
+
+
+def get_app_config() -> AppConfig:
+    """
+    Provides the current configuration snapshot.
+    """
+    return Config().get_config_app()
+
+
+def get_job_manager() -> JobManager:
+    """
+    Provides the job manager, started on first use with the configured concurrency limit.
+    """
+    if JobManager._instance is None:
+        JobManager(max_concurrent_jobs=Config().get_config_app().max_concurrent_jobs or 2)
+    return JobManager._instance
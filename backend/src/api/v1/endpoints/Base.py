@@ -1,4 +1,6 @@
 from typing import Generic, TypeVar, Type, List, Optional, Union, Dict, Any
+from sqlalchemy import insert, update, delete, select
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, ValidationError
 from sqlmodel import SQLModel
@@ -18,11 +20,18 @@ UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 ###
 
 class EndpointsBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
-    def __init__(self, model: Type[ModelType]):
+    # Maximum number of IDs bound in one IN clause of the bulk operations
+    BULK_CHUNK_SIZE = 500
+
+    def __init__(self, model: Type[ModelType], create_schema: Type[BaseModel] = None,
+                 update_schema: Type[BaseModel] = None):
         """
         Initialize the CRUD object with a specific SQLModel model.
+        The optional schemas are used to validate the rows of bulk operations one by one.
         """
         self.model = model
+        self.create_schema = create_schema
+        self.update_schema = update_schema
 
     @staticmethod
     def decode(data: Dict[str, Any], model: Type[BaseModel]) -> BaseModel:
@@ -150,3 +159,130 @@ class EndpointsBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             return obj
         else:
             raise HTTPException(status_code=404, detail=f"Item with ID {id} not found")
+
+    def _columns(self) -> List[str]:
+        return [column.name for column in self.model.__table__.columns]
+
+    def _validate_rows(self, objs_in: List[Union[BaseModel, Dict[str, Any]]], schema: Optional[Type[BaseModel]]):
+        """
+        Validate and encode the rows of a bulk operation.
+        Returns the valid rows with their position in the request and an error entry for every invalid row.
+        """
+        rows, errors = [], []
+        for index, obj_in in enumerate(objs_in):
+            try:
+                if isinstance(obj_in, dict) and schema is not None:
+                    obj_in = self.decode(obj_in, schema)
+                rows.append((index, self.encode(obj_in)))
+            except HTTPException as e:
+                errors.append({"index": index, "detail": e.detail})
+        return rows, errors
+
+    def _select_by_ids(self, db: Session, ids: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Load the given records with one query per chunk of IDs.
+        """
+        rows = []
+        for start in range(0, len(ids), self.BULK_CHUNK_SIZE):
+            chunk = ids[start:start + self.BULK_CHUNK_SIZE]
+            result = db.execute(select(self.model.__table__).where(self.model.id.in_(chunk)))
+            rows.extend(dict(row) for row in result.mappings())
+        return rows
+
+    def create_bulk(self, db: Session, *, objs_in: List[Union[CreateSchemaType, Dict[str, Any]]],
+                    return_rows: bool = False) -> Dict[str, Any]:
+        """
+        Create many records in a single transaction with one multi-row INSERT.
+        Invalid rows are reported and skipped, the valid rows are still inserted.
+        With return_rows the created records are returned via RETURNING instead of refreshing them one by one.
+        """
+        rows, errors = self._validate_rows(objs_in, self.create_schema)
+        if not rows:
+            return {"succeeded": 0, "failed": errors, "items": [] if return_rows else None}
+
+        # Instantiate the model to apply field defaults, so all rows bind the same columns.
+        columns = [column for column in self._columns() if column != "id"]
+        values = []
+        for _, data in rows:
+            db_obj = self.model(**data)
+            values.append({column: getattr(db_obj, column) for column in columns})
+
+        stmt = insert(self.model.__table__)
+        if return_rows:
+            stmt = stmt.returning(*self.model.__table__.columns)
+        try:
+            result = db.execute(stmt, values)
+            items = [dict(row) for row in result.mappings()] if return_rows else None
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            raise HTTPException(status_code=400, detail=f"Bulk insert failed, no rows were created: {e}")
+        return {"succeeded": len(values), "failed": errors, "items": items}
+
+    def update_bulk(self, db: Session, *, objs_in: List[Dict[str, Any]],
+                    return_rows: bool = False) -> Dict[str, Any]:
+        """
+        Update many records in a single transaction. Every row must contain the 'id' of the record.
+        Rows that are invalid, refer to unknown IDs or contain no updatable field are reported and skipped.
+        With return_rows the updated records are reloaded with one SELECT per chunk of IDs.
+        """
+        errors = []
+        candidates = []
+        for index, obj_in in enumerate(objs_in):
+            obj_in = dict(obj_in)
+            record_id = obj_in.pop("id", None)
+            if record_id is None:
+                errors.append({"index": index, "detail": "Missing 'id'"})
+                continue
+            candidates.append((index, record_id, obj_in))
+
+        rows, row_errors = self._validate_rows([data for _, _, data in candidates], self.update_schema)
+        errors.extend({**error, "index": candidates[error["index"]][0], "id": candidates[error["index"]][1]}
+                      for error in row_errors)
+
+        columns = set(self._columns())
+        updates = []
+        for position, data in rows:
+            index, record_id, _ = candidates[position]
+            updates.append((index, {"id": record_id, **{k: v for k, v in data.items() if k in columns and k != "id"}}))
+
+        existing_ids = {row["id"] for row in self._select_by_ids(db, [values["id"] for _, values in updates])}
+        for index, values in updates:
+            if values["id"] not in existing_ids:
+                errors.append({"index": index, "id": values["id"], "detail": f"Item with ID {values['id']} not found"})
+            elif len(values) == 1:
+                errors.append({"index": index, "id": values["id"], "detail": "No fields to update"})
+        updates = [values for _, values in updates if values["id"] in existing_ids and len(values) > 1]
+
+        try:
+            if updates:
+                # ORM bulk UPDATE by primary key, executed as executemany.
+                db.execute(update(self.model), updates)
+            items = self._select_by_ids(db, [values["id"] for values in updates]) if return_rows else None
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            raise HTTPException(status_code=400, detail=f"Bulk update failed, no rows were updated: {e}")
+        errors.sort(key=lambda error: error["index"])
+        return {"succeeded": len(updates), "failed": errors, "items": items}
+
+    def remove_bulk(self, db: Session, *, ids: List[Any], return_rows: bool = False) -> Dict[str, Any]:
+        """
+        Delete many records in a single transaction, using DELETE ... RETURNING to find unknown IDs.
+        """
+        deleted = []
+        try:
+            for start in range(0, len(ids), self.BULK_CHUNK_SIZE):
+                chunk = ids[start:start + self.BULK_CHUNK_SIZE]
+                stmt = delete(self.model.__table__).where(self.model.id.in_(chunk)) \
+                    .returning(*self.model.__table__.columns)
+                deleted.extend(dict(row) for row in db.execute(stmt).mappings())
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            raise HTTPException(status_code=400, detail=f"Bulk delete failed, no rows were deleted: {e}")
+
+        deleted_ids = {row["id"] for row in deleted}
+        errors = [{"index": index, "id": record_id, "detail": f"Item with ID {record_id} not found"}
+                  for index, record_id in enumerate(ids) if record_id not in deleted_ids]
+        return {"succeeded": len(deleted), "failed": errors, "items": deleted if return_rows else None}
@@ -0,0 +1,104 @@
+# src/api/v1/routers/routerDuplicates.py
+import json
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from api.v1.dependencies import get_database_operations, get_summary_cache
+from api.v1.schemas.Duplicate import (DuplicateGroupPage, DirectoryDuplicateGroupPage, NearDuplicateGroupPage,
+                                      DuplicateSummary, SimilarFiles)
+from database.operations.db_operations import DatabaseOperations
+from src.core.cache import SummaryCache
+
+router = APIRouter()
+
+MAX_PAGE_SIZE = 1000
+
+
+@router.get("/", response_model=DuplicateGroupPage)
+def list_duplicate_groups(cursor: Optional[int] = Query(default=None, ge=0),
+                          limit: int = Query(default=100, ge=1, le=MAX_PAGE_SIZE),
+                          db: DatabaseOperations = Depends(get_database_operations)):
+    """
+    List duplicate groups ordered by original file ID. Pass the returned 'next_cursor'
+    as 'cursor' to fetch the following page; it is null on the last page.
+    """
+    groups = db.get_duplicate_groups(after_id=cursor or 0, limit=limit)
+    next_cursor = groups[-1]['original_id'] if len(groups) == limit else None
+    return {"items": groups, "next_cursor": next_cursor}
+
+
+@router.get("/directories", response_model=DirectoryDuplicateGroupPage)
+def list_directory_duplicate_groups(cursor: Optional[int] = Query(default=None, ge=0),
+                                    limit: int = Query(default=100, ge=1, le=MAX_PAGE_SIZE),
+                                    db: DatabaseOperations = Depends(get_database_operations)):
+    """
+    List groups of directories with identical subtrees ordered by group ID, paginated like
+    the file level groups. Their files are not repeated in the file level groups.
+    """
+    groups = db.get_directory_groups(after_id=cursor or 0, limit=limit)
+    next_cursor = groups[-1]['id'] if len(groups) == limit else None
+    return {"items": groups, "next_cursor": next_cursor}
+
+
+@router.get("/near", response_model=NearDuplicateGroupPage)
+def list_near_duplicate_groups(cursor: Optional[int] = Query(default=None, ge=0),
+                               limit: int = Query(default=100, ge=1, le=MAX_PAGE_SIZE),
+                               db: DatabaseOperations = Depends(get_database_operations)):
+    """
+    List groups of images that look alike (re-encodings, resizes), paginated like the exact
+    duplicate groups. 'max_distance' is the largest fingerprint distance to the original.
+    """
+    groups = db.get_near_duplicate_groups(after_id=cursor or 0, limit=limit)
+    next_cursor = groups[-1]['original_id'] if len(groups) == limit else None
+    return {"items": groups, "next_cursor": next_cursor}
+
+
+@router.get("/similar", response_model=SimilarFiles)
+def list_similar_files(path: str,
+                       min_ratio: float = Query(default=0.0, ge=0.0, le=1.0),
+                       limit: int = Query(default=50, ge=1, le=MAX_PAGE_SIZE),
+                       db: DatabaseOperations = Depends(get_database_operations)):
+    """
+    List the files that share content with the file at 'path', by the content-defined chunks
+    they have in common, with the share of the file's bytes each of them contains. Only files
+    split by the chunk command are compared.
+    """
+    result = db.get_similar_files(path, min_ratio=min_ratio, limit=limit)
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"File {path} is not in the index")
+    return result
+
+
+@router.get("/summary", response_model=DuplicateSummary)
+def read_duplicates_summary(db: DatabaseOperations = Depends(get_database_operations),
+                            cache: SummaryCache = Depends(get_summary_cache)):
+    """
+    Aggregate figures over all duplicate groups. Served from the cache until the next
+    processing stage commits changes to the index.
+    """
+    return cache.get_or_compute("duplicates:summary", db.get_duplicates_summary)
+
+
+@router.get("/stream")
+def stream_duplicate_groups(cursor: Optional[int] = Query(default=None, ge=0),
+                            page_size: int = Query(default=500, ge=1, le=MAX_PAGE_SIZE)):
+    """
+    Stream all duplicate groups as newline-delimited JSON, one group per line,
+    while they are read page by page from the database.
+    """
+
+    def generate():
+        # The connection is owned by the generator, it outlives the request handler.
+        db = DatabaseOperations(check_same_thread=False)
+        try:
+            after_id = cursor or 0
+            while True:
+                groups = db.get_duplicate_groups(after_id=after_id, limit=page_size)
+                if not groups:
+                    break
+                yield "".join(json.dumps(group) + "\n" for group in groups)
+                after_id = groups[-1]['original_id']
+        finally:
+            db.close()
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
@@ -1,24 +1,23 @@
 # src/api/files.py
+from typing import List
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from src.database.models.item import Item
+from api.v1.dependencies import get_database_session, get_async_database_session
 
 router = APIRouter()
 
 
-def get_database_session() -> Session:
-    return Item().SESSION
-
-
-@router.get("/")
-async def read(db: Session = Depends(get_database_session)):
-    # Use the db as needed
-    db.query(Item).all()
-    return {"Hello": "World"}
+@router.get("/", response_model=List[Item])
+async def read(db: AsyncSession = Depends(get_async_database_session)):
+    result = await db.exec(select(Item))
+    return result.all()
 
 
 @router.post("/items/", response_model=Item)
 def create(item: Item, db: Session = Depends(get_database_session)):
+    # Sync handler: FastAPI runs it in its threadpool, the blocking session stays off the event loop.
     item = Item(**item.__dict__)
     db.add(item)
     db.commit()
@@ -1,17 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Dict, Any
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from api.v1.endpoints.Base import EndpointsBase
 from api.v1.endpoints.EndpointItem import Item
-from api.v1.schemas.Item import ItemCreate, ItemRead
+from api.v1.schemas.Item import ItemCreate, ItemRead, ItemUpdate
+from api.v1.schemas.Bulk import BulkResult
 from api.v1.dependencies import get_database_session  # Import your database session utility
 
 router = APIRouter()
-crud_item = EndpointsBase(Item)
+crud_item = EndpointsBase(Item, create_schema=ItemCreate, update_schema=ItemUpdate)
 
 @router.post("/items/", response_model=ItemRead)
 def create_item(item: ItemCreate, db: Session = Depends(get_database_session)):
     return crud_item.create(db, obj_in=item)
 
+@router.post("/items/bulk", response_model=BulkResult)
+def create_items(items: List[Dict[str, Any]] = Body(...),
+                 return_rows: bool = Query(default=False),
+                 db: Session = Depends(get_database_session)):
+    return crud_item.create_bulk(db, objs_in=items, return_rows=return_rows)
+
+@router.patch("/items/bulk", response_model=BulkResult)
+def update_items(items: List[Dict[str, Any]] = Body(...),
+                 return_rows: bool = Query(default=False),
+                 db: Session = Depends(get_database_session)):
+    return crud_item.update_bulk(db, objs_in=items, return_rows=return_rows)
+
+@router.delete("/items/bulk", response_model=BulkResult)
+def delete_items(ids: List[int] = Body(...),
+                 return_rows: bool = Query(default=False),
+                 db: Session = Depends(get_database_session)):
+    return crud_item.remove_bulk(db, ids=ids, return_rows=return_rows)
+
 @router.get("/items/{item_id}", response_model=ItemRead)
 def read_item(item_id: int, db: Session = Depends(get_database_session)):
     db_item = crud_item.get(db, id=item_id)
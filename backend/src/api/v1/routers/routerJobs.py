@@ -0,0 +1,81 @@
+# src/api/v1/routers/routerJobs.py
+import asyncio
+import json
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from api.v1.dependencies import get_job_manager, get_app_config
+from api.v1.schemas.Job import JobCreate, JobRead
+from src.core.jobs import JobManager, FINISHED_STATUSES
+from src.config.ConfigModel import AppConfig
+
+router = APIRouter()
+
+EVENT_INTERVAL_SECONDS = 1.0
+
+
+def _get_job_or_404(manager: JobManager, job_id: str) -> dict:
+    job = manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job with ID {job_id} not found")
+    return job
+
+
+@router.post("/", response_model=JobRead, status_code=202)
+def create_job(job_in: JobCreate, manager: JobManager = Depends(get_job_manager),
+               config: AppConfig = Depends(get_app_config)):
+    """
+    Start a scan, dedupe or move stage as a background job.
+    """
+    if job_in.kind == "scan" and not job_in.source:
+        raise HTTPException(status_code=400, detail="A scan job requires a 'source'.")
+    if job_in.kind == "move" and not job_in.destination:
+        raise HTTPException(status_code=400, detail="A move job requires a 'destination'.")
+
+    params = {key: value for key, value in (("source", job_in.source), ("destination", job_in.destination),
+                                            ("resume", job_in.resume)) if value}
+    job_id = manager.submit(job_in.kind, params, config=config)
+    return manager.get(job_id)
+
+
+@router.get("/", response_model=List[JobRead])
+def list_jobs(manager: JobManager = Depends(get_job_manager)):
+    return manager.list()
+
+
+@router.get("/{job_id}", response_model=JobRead)
+def read_job(job_id: str, manager: JobManager = Depends(get_job_manager)):
+    return _get_job_or_404(manager, job_id)
+
+
+@router.delete("/{job_id}", response_model=JobRead)
+def cancel_job(job_id: str, manager: JobManager = Depends(get_job_manager)):
+    """
+    Cancel a pending or running job.
+    """
+    _get_job_or_404(manager, job_id)
+    if not manager.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job with ID {job_id} has already finished")
+    return manager.get(job_id)
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request, manager: JobManager = Depends(get_job_manager)):
+    """
+    Server-Sent Events stream of the job state, one 'progress' event per interval
+    and a final 'end' event once the job has finished.
+    """
+    await run_in_threadpool(_get_job_or_404, manager, job_id)
+
+    async def generate():
+        while not await request.is_disconnected():
+            job = await run_in_threadpool(manager.get, job_id)
+            finished = job['status'] in FINISHED_STATUSES
+            yield f"event: {'end' if finished else 'progress'}\ndata: {json.dumps(job)}\n\n"
+            if finished:
+                break
+            await asyncio.sleep(EVENT_INTERVAL_SECONDS)
+
+    return StreamingResponse(generate(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
@@ -0,0 +1,49 @@
+# src/api/v1/routers/routerRollups.py
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from api.v1.dependencies import get_database_operations, get_summary_cache
+from api.v1.schemas.Rollup import DirectoryRollup, ExtensionRollup, GroupRollup
+from database.operations.db_operations import DatabaseOperations
+from src.core.cache import SummaryCache
+
+router = APIRouter()
+
+MAX_ROWS = 1000
+
+# All endpoints read the materialized rollups only, their cost depends on the size of the result.
+
+
+@router.get("/directories", response_model=List[DirectoryRollup])
+def list_directories(parent: Optional[str] = None,
+                     limit: int = Query(default=50, ge=1, le=MAX_ROWS),
+                     db: DatabaseOperations = Depends(get_database_operations),
+                     cache: SummaryCache = Depends(get_summary_cache)):
+    """
+    Direct subdirectories of 'parent' (the outermost directories if omitted),
+    ordered by the bytes reclaimable below them.
+    """
+    return cache.get_or_compute(f"rollups:directories:{parent}:{limit}",
+                                lambda: db.get_rollup_directories(parent, limit))
+
+
+@router.get("/directory", response_model=DirectoryRollup)
+def read_directory(path: str,
+                   db: DatabaseOperations = Depends(get_database_operations)):
+    rollup = db.get_rollup_directory(path)
+    if rollup is None:
+        raise HTTPException(status_code=404, detail=f"No duplicates below {path}")
+    return rollup
+
+
+@router.get("/extensions", response_model=List[ExtensionRollup])
+def list_extensions(limit: int = Query(default=50, ge=1, le=MAX_ROWS),
+                    db: DatabaseOperations = Depends(get_database_operations),
+                    cache: SummaryCache = Depends(get_summary_cache)):
+    return cache.get_or_compute(f"rollups:extensions:{limit}", lambda: db.get_rollup_extensions(limit))
+
+
+@router.get("/groups/top", response_model=List[GroupRollup])
+def list_top_groups(limit: int = Query(default=50, ge=1, le=MAX_ROWS),
+                    db: DatabaseOperations = Depends(get_database_operations),
+                    cache: SummaryCache = Depends(get_summary_cache)):
+    return cache.get_or_compute(f"rollups:groups:{limit}", lambda: db.get_top_groups(limit))
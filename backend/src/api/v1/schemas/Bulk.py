@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import Optional, List, Dict, Any
+
+
+class BulkError(BaseModel):
+    index: int
+    id: Optional[int] = None
+    detail: Any
+
+
+class BulkResult(BaseModel):
+    succeeded: int
+    failed: List[BulkError]
+    items: Optional[List[Dict[str, Any]]] = None
@@ -0,0 +1,72 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class DuplicateFile(BaseModel):
+    id: int
+    path: str
+    creation_time: Optional[str] = None
+
+
+class DuplicateGroup(BaseModel):
+    original_id: int
+    original_path: str
+    original_size: Optional[int] = None
+    duplicates: List[DuplicateFile]
+
+
+class DuplicateGroupPage(BaseModel):
+    items: List[DuplicateGroup]
+    next_cursor: Optional[int] = None
+
+
+class NearDuplicateGroup(DuplicateGroup):
+    max_distance: int
+
+
+class NearDuplicateGroupPage(BaseModel):
+    items: List[NearDuplicateGroup]
+    next_cursor: Optional[int] = None
+
+
+class DuplicateDirectory(BaseModel):
+    path: str
+    creation_time: Optional[str] = None
+
+
+class DirectoryDuplicateGroup(BaseModel):
+    id: int
+    hash: str
+    original_path: str
+    file_count: int
+    size: int
+    duplicates: List[DuplicateDirectory]
+
+
+class DirectoryDuplicateGroupPage(BaseModel):
+    items: List[DirectoryDuplicateGroup]
+    next_cursor: Optional[int] = None
+
+
+class SimilarFile(BaseModel):
+    id: int
+    path: str
+    size: Optional[int] = None
+    shared_bytes: int
+    shared_ratio: float
+
+
+class SimilarFiles(BaseModel):
+    id: int
+    path: str
+    size: Optional[int] = None
+    similar: List[SimilarFile]
+
+
+class DuplicateSummary(BaseModel):
+    groups: int
+    duplicates: int
+    reclaimable_bytes: int
+    directory_groups: int = 0
+    directory_duplicates: int = 0
+    directory_reclaimable_bytes: int = 0
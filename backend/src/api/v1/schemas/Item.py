@@ -9,7 +9,7 @@ class ItemCreate(BaseModel):
 
 class ItemUpdate(BaseModel):
     name: Optional[str] = None
-    Description: Optional[str] = None
+    description: Optional[str] = None
 
 
 class ItemRead(BaseModel):
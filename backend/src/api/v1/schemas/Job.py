@@ -0,0 +1,33 @@
+from pydantic import BaseModel
+from typing import Optional, Literal, Dict, Any
+
+
+class JobCreate(BaseModel):
+    kind: Literal["scan", "dedupe", "move"]
+    source: Optional[str] = None
+    destination: Optional[str] = None
+    resume: bool = False  # scan: continue after the checkpoint of an interrupted scan of the source
+
+
+class JobProgress(BaseModel):
+    stage: str
+    done: int
+    total: Optional[int] = None
+    bytes: int
+    elapsed_seconds: float
+    items_per_second: float
+    bytes_per_second: float
+    eta_seconds: Optional[float] = None
+
+
+class JobRead(BaseModel):
+    id: str
+    kind: str
+    params: Dict[str, Any]
+    status: str
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    progress: Optional[JobProgress] = None
+    error: Optional[str] = None
+    metrics: Optional[Dict[str, Any]] = None
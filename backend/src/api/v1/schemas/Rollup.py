@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+
+
+class DirectoryRollup(BaseModel):
+    path: str
+    duplicate_files: int
+    reclaimable_bytes: int
+
+
+class ExtensionRollup(BaseModel):
+    extension: str
+    duplicate_files: int
+    reclaimable_bytes: int
+
+
+class GroupRollup(BaseModel):
+    original_id: int
+    original_path: str
+    duplicate_files: int
+    reclaimable_bytes: int
@@ -3,7 +3,6 @@ import shutil
 from datetime import datetime
 import logging
 import random
-import requests
 from tqdm import tqdm
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -26,6 +25,7 @@ class Utilities:
             "message": message
         }
         try:
+            import requests  # Only needed for notifications, keeps it out of the startup path
             response = requests.post(api_url, headers=headers, json=data)
             if response.status_code != 200:
                 logging.error("Failed to send notification. API responded with: {response.text}")
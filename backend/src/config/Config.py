@@ -25,17 +25,20 @@ class Config:
     _config_file_path = CONFIG_FILE_PATH
     _initialized = False
 
-    def __new__(cls, *args_config: ArgsConfig):
+    def __new__(cls, *args_config: ArgsConfig, **kwargs):
         with cls._lock:
             if not cls._instance:
                 cls._instance = super().__new__(cls)
                 cls._instance._args_config = args_config
         return cls._instance
 
-    def __init__(self, args_config: ArgsConfig):
+    def __init__(self, args_config: ArgsConfig = None, watch=True):
         if not self._initialized:
             self._args_config = args_config
-            self._config_file_handler = ConfigFileHandler()  # Set the command-line arguments
+            if args_config and args_config.config:
+                self._config_file_path = args_config.config
+            # Short lived command line runs read the file once and do not watch it
+            self._config_file_handler = ConfigFileHandler(self._config_file_path, watch=watch)
             self._initialized = True
 
     def get_source(self):
@@ -90,7 +93,7 @@ class Config:
         """
         Get the API configuration from command line arguments or configuration file.
         """
-        # Retrieve the whole configuration dictionary safely
+        # Retrieve the configuration snapshot once, all values come from the same version
         try:
             app_config = self.get_config_app()
 
@@ -112,7 +115,13 @@ class Config:
 
     def get_config_app(self) -> AppConfig:
         """
-        Get the current configuration.
+        Get the current configuration. Returns the cached, validated snapshot without
+        reading the file; the snapshot is swapped when the file content changes.
         """
-        with self._lock:
-            return AppConfig(**self._config_file_handler.get_json())
+        return self._config_file_handler.get_snapshot()
+
+    def stop_watching(self):
+        """
+        Stop reloading the configuration on file changes.
+        """
+        self._config_file_handler._stop_watching_config()
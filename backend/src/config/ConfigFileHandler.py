@@ -4,8 +4,8 @@ import logging
 import os
 from threading import Lock
 
+from pydantic import ValidationError
 from src.config.ConfigModel import AppConfig
-from watchdog.observers import Observer
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -17,6 +17,13 @@ class ConfigFileHandler:
     """
     Singleton class that handles reading a configuration file and monitoring
     it for changes.
+
+    The file is parsed and validated into an immutable AppConfig snapshot once. Readers get
+    the cached snapshot without touching the disk. When the watcher sees a change of the file
+    content, a new snapshot is validated and swapped in; an invalid file keeps the old one.
+
+    The class implements the watchdog event handler interface (dispatch) itself, so watchdog
+    is only imported when the file is actually watched.
     """
     _instance = None  # Singleton instance
     _initialized = False
@@ -26,7 +33,7 @@ class ConfigFileHandler:
     _observer = None  # Watchdog observer for file changes
     _lock = Lock()  # Lock for thread-safety
 
-    def __new__(cls):
+    def __new__(cls, *args, **kwargs):
         """
         Ensure only one instance of ConfigFileHandler is created.
         """
@@ -34,84 +41,119 @@ class ConfigFileHandler:
             cls._instance = super(ConfigFileHandler, cls).__new__(cls)
         return cls._instance
 
-    def __init__(self):
+    def __init__(self, path=DEFAULT_CONFIG_PATH, watch=True):
         """
         Initialize the ConfigFileHandler instance. Load the configuration file
         and start the file observer to monitor for changes.
+
+        Args:
+            path (str): Path to the configuration file.
+            watch (bool): Whether to reload the configuration when the file changes.
         """
 
         if getattr(self, '_initialized', False):
             return
 
-        self._path = DEFAULT_CONFIG_PATH  # TODO check if this is the only source.
-        if self._config_json is None:  # Initialize only once
-            self._config_json = self.get_json()
-            self._observer = Observer()  # Initialize the observer here
-            # TODO no need to start 2 times: self._start_watching_config()
-        self.config_file_hash = self._calculate_file_hash()
+        self._path = path or DEFAULT_CONFIG_PATH
+        self._abspath = os.path.abspath(self._path)
+        self.config_file_hash = None
+        self._reload_config()
+        if watch:
+            self._start_watching_config()
         self._initialized = True
 
-    def get_json(self):
+    def get_snapshot(self) -> AppConfig:
         """
-        Load configuration from the specified file path. Defaults to the class
-        CONFIG_FILE_PATH if no path is provided.
+        Returns the current validated configuration. The snapshot is immutable and replaced
+        as a whole on reload, so callers can keep a reference for a consistent view.
         """
-        with self._lock:
-            if not os.path.exists(self._path):
-                logging.error(f"Configuration file not found at {self._path}")
-                return {}
+        return self._app_config
 
-            try:
-                with open(self._path, 'r') as file:
-                    return json.load(file)
-            except json.JSONDecodeError as e:
-                logging.error(f"Error decoding JSON from configuration file {self._path}: {e}")
-            except IOError as e:
-                logging.error(f"IOError while loading configuration from {self._path}: {e}")
-            except Exception as e:
-                logging.error(f"Unexpected error loading configuration from {self._path}: {e}")
-
-            return {}
+    def get_json(self):
+        """
+        Returns the raw configuration of the current snapshot as loaded from the file.
+        """
+        return self._config_json or {}
 
-    def _calculate_file_hash(self):
+    def _read_file(self):
         """
-        Calculate the MD5 hash of a file's contents.
+        Reads the configuration file.
+
+        Returns:
+            bytes: The content of the file, None if it cannot be read.
         """
-        hash_md5 = hashlib.md5()
+        if not os.path.exists(self._path):
+            logging.error(f"Configuration file not found at {self._path}")
+            return None
+
         try:
-            with open(self._path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_md5.update(chunk)
-            return hash_md5.hexdigest()
+            with open(self._path, 'rb') as file:
+                return file.read()
         except IOError as e:
-            logging.error(f"Error reading file for hashing: {e}")
+            logging.error(f"IOError while loading configuration from {self._path}: {e}")
             return None
 
+    def _calculate_file_hash(self, content):
+        """
+        Calculate the MD5 hash of a file's contents.
+        """
+        return hashlib.md5(content).hexdigest()
+
     def _reload_config(self):
         """
-        Reload the configuration file.
+        Reload the configuration file if its content changed. The new snapshot replaces the
+        current one only if it parses and validates.
+
+        Returns:
+            bool: True if a new snapshot was installed.
         """
         with self._lock:
-            self._config_json = self.get_json()
+            content = self._read_file()
+            if not content:
+                # Missing, or truncated by a writer that is not done yet; the next event reloads it
+                return False
+
+            new_hash = self._calculate_file_hash(content)
+            if new_hash == self.config_file_hash:
+                logging.info("Configuration file metadata changed, no content change detected.")
+                return False
+
+            try:
+                config_json = json.loads(content)
+                app_config = AppConfig(**config_json)
+            except json.JSONDecodeError as e:
+                logging.error(f"Error decoding JSON from configuration file {self._path}, keeping the current configuration: {e}")
+                return False
+            except ValidationError as e:
+                logging.error(f"Invalid configuration in {self._path}, keeping the current configuration: {e}")
+                return False
+
+            # Single reference assignments, readers see either the old or the new snapshot
+            self._config_json = config_json
+            self._app_config = app_config
+            self.config_file_hash = new_hash
+            logging.info("Configuration loaded from %s.", self._path)
+            return True
 
     def _start_watching_config(self):
         """
         Start the Watchdog observer to monitor configuration file changes.
         """
-        # Convert to absolute path if it's not already
-        dirname = os.path.abspath(self._path) or '.'
+        # Editors often replace the file, so watch the directory containing it
+        dirname = os.path.dirname(self._abspath) or '.'
         if not os.path.exists(dirname):
             logging.error(f"Directory for config file does not exist: {dirname}")
             return
 
-        self._observer.schedule(self, path=dirname, recursive=False)
         try:
-            return
-            # TODO AttributeError: 'ConfigFileHandler' object has no attribute 'dispatch'
-            # self._observer.start()
-
-        except FileNotFoundError as e:
+            from watchdog.observers import Observer
+            self._observer = Observer()
+            self._observer.daemon = True
+            self._observer.schedule(self, path=dirname, recursive=False)
+            self._observer.start()
+        except (FileNotFoundError, OSError) as e:
             logging.error(f"Failed to start observer: {e}")
+            self._observer = None
 
     def _stop_watching_config(self):
         """
@@ -122,16 +164,34 @@ class ConfigFileHandler:
             self._observer.join()
             self._observer = None
 
+    def dispatch(self, event):
+        """
+        Entry point called by the watchdog observer for every event in the watched directory.
+        """
+        handler = {
+            'modified': self.on_modified,
+            'created': self.on_created,
+            'moved': self.on_moved,
+        }.get(event.event_type)
+        if handler is not None:
+            handler(event)
+
+    def _is_config_file(self, path):
+        return bool(path) and os.path.abspath(path) == self._abspath
+
     def on_modified(self, event):
         """
         Watchdog event handler for file modifications.
         """
-        with self._lock:
-            if event.src_path.endswith(self._path):
-                new_hash = self._calculate_file_hash()
-                if new_hash != self.config_file_hash:
-                    logging.info("Configuration file content changed, reloading...")
-                    self._reload_config()
-                    self.config_file_hash = new_hash
-                else:
-                    logging.info("Configuration file metadata changed, no content change detected.")
+        if self._is_config_file(event.src_path) and self._reload_config():
+            logging.info("Configuration file content changed, reloaded.")
+
+    def on_created(self, event):
+        self.on_modified(event)
+
+    def on_moved(self, event):
+        """
+        Watchdog event handler for a file renamed over the configuration file (atomic saves).
+        """
+        if self._is_config_file(getattr(event, 'dest_path', None)) and self._reload_config():
+            logging.info("Configuration file replaced, reloaded.")
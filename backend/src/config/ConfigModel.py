@@ -1,9 +1,11 @@
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl
 import json
-from typing import Optional
+from typing import Literal, Optional, Tuple
 
 
 class DatabaseConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     db_type: Optional[str]
     db_user: Optional[str]
     db_password: Optional[str]
@@ -13,12 +15,115 @@ class DatabaseConfig(BaseModel):
 
 
 class APIConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     api_host: str = "0.0.0.0"
     api_port: int = 8000
     api_log_level: str = "info"
 
 
+class ScanConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    autotune: bool = True
+    workers: Optional[int] = None  # initial hashing concurrency, derived from the CPU limit if not set
+    min_workers: int = 1
+    max_workers: int = 32
+    min_batch_size: int = 50
+    max_batch_size: int = 5000
+    target_batch_seconds: float = 0.25
+    window_seconds: float = 2.0
+    file_timeout: float = 30.0  # seconds a single file may take before its hash worker is replaced
+    max_retries: int = 3  # failed attempts after which a file is skipped until released from the quarantine
+    checkpoint_interval: float = 30.0  # seconds between commits of the scan position, see --resume
+    # sample: size and three small blocks, full: sequential SHA-1, tree: parallel SHA-256 of fixed ranges.
+    # Hashes of different modes never match, rescan into a new index after changing the mode. With
+    # full and tree, file_timeout has to cover reading the largest file.
+    hash_mode: Literal["sample", "full", "tree"] = "sample"
+    hash_range_size: int = 67108864  # bytes per range of the tree hash, recorded with every hash
+    hash_range_threads: int = 4  # ranges of one file hashed at the same time
+
+
+class WatchConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    debounce_seconds: float = 2.0  # a path is indexed once it had no events for this long
+    max_delay_seconds: float = 30.0  # ... or at the latest this long after its first event
+    batch_size: int = 256  # files hashed per round
+    initial_scan: bool = True  # index the files changed while nobody was watching before watching
+
+
+class DistributedConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    # Directories above this depth are work units with their own files, those at it with their subtrees
+    split_depth: int = 2
+    lease_seconds: float = 60.0  # a unit whose worker sent no heartbeat for this long is handed out again
+    heartbeat_seconds: float = 15.0
+    max_attempts: int = 3  # expired leases after which a unit is given up
+    result_batch_size: int = 1000  # files per result batch sent back to the coordinator
+    local_workers: int = 4  # worker processes started by the coordinator, 0 to only use other hosts
+    poll_seconds: float = 1.0  # wait of an idle worker before it asks for work again
+
+
+class RulesConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    # Applied while walking: excluded files are never opened, pruned directories never listed. The
+    # defaults skip every file or directory whose name contains .DS_Store or @__thumb.
+    exclude: Tuple[str, ...] = ("*.DS_Store*", "*@__thumb*")  # glob patterns on file names
+    include: Tuple[str, ...] = ()  # glob patterns on file names, if set only matching files are indexed
+    prune: Tuple[str, ...] = ("*.DS_Store*", "*@__thumb*")  # glob patterns on directory names, e.g. thumbnail caches
+    exclude_regex: Tuple[str, ...] = ()  # regular expressions searched in the paths of files and directories
+    min_size: int = 0
+    max_size: Optional[int] = None
+    min_age_days: Optional[float] = None  # skip files modified more recently, e.g. still being written
+    max_age_days: Optional[float] = None
+
+
+class PrefilterConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    # Bloom filters of the indexed paths and hashes in <index>.bloom, instead of loading all paths per scan
+    enabled: bool = False
+    capacity: int = 1000000  # files the filters are sized for at least, they grow with the index
+    error_rate: float = 0.01  # share of the new files that still cost a point query
+
+
+class HashCacheConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    enabled: bool = False  # share hashes in Redis with other scanners of the same file systems
+    ttl_seconds: int = 2592000
+    batch_size: int = 5000  # keys per pipelined round trip
+
+
+class ChunkingConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    # Chunking reads every byte of the files: some 40 MB/s per worker with numpy, 7 MB/s without
+    enabled: bool = False  # split large files into chunks after dedupe, see the chunk command
+    min_file_size: int = 1048576  # smaller files are only compared by their whole hash
+    min_size: int = 16384
+    avg_size: int = 65536  # a power of two
+    max_size: int = 262144
+    workers: Optional[int] = None  # derived from the CPU limit if not set
+    max_bytes: Optional[int] = None  # bytes of files chunked per run, the next runs take the rest
+
+
+class ImagesConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    enabled: bool = False  # find near duplicate images after dedupe, see the images command (requires Pillow)
+    max_distance: int = 6  # differing bits of two 64 bit fingerprints that still count as the same image
+    extensions: Tuple[str, ...] = (".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tif", ".tiff", ".webp")
+    workers: Optional[int] = None  # derived from the CPU limit if not set
+
+
 class AppConfig(BaseModel):
+    # Snapshots are shared between threads and replaced as a whole on reload, never changed in place
+    model_config = ConfigDict(frozen=True)
+
     source: Optional[str]
     destination: Optional[str]
     batch_size: Optional[int]
@@ -26,6 +131,15 @@ class AppConfig(BaseModel):
     api_token: Optional[str]
     Database: Optional[DatabaseConfig]
     API: Optional[APIConfig]
+    max_concurrent_jobs: Optional[int] = 2
+    Scan: Optional[ScanConfig] = ScanConfig()
+    Watch: Optional[WatchConfig] = WatchConfig()
+    Distributed: Optional[DistributedConfig] = DistributedConfig()
+    Rules: Optional[RulesConfig] = RulesConfig()
+    Prefilter: Optional[PrefilterConfig] = PrefilterConfig()
+    HashCache: Optional[HashCacheConfig] = HashCacheConfig()
+    Chunking: Optional[ChunkingConfig] = ChunkingConfig()
+    Images: Optional[ImagesConfig] = ImagesConfig()
 
 
 class ArgsConfig(BaseModel):
@@ -35,6 +149,7 @@ class ArgsConfig(BaseModel):
     api_endpoint: Optional[HttpUrl] = None
     api_token: Optional[str] = None
     db_url: Optional[str] = None
+    config: Optional[str] = None
 
 
 def load_config(file_path: str) -> AppConfig:
@@ -0,0 +1,183 @@
+import logging
+import math
+import os
+import time
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+
+
+def _read_first_line(path):
+    try:
+        with open(path, 'r') as f:
+            return f.readline().strip()
+    except OSError:
+        return None
+
+
+def available_cpus():
+    """
+    Returns the number of CPUs the process may use: the CPU affinity, further limited by a
+    cgroup CPU quota (containers often see all host CPUs but get a fraction of them).
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    # cgroup v2: "<quota> <period>" or "max <period>"
+    cpu_max = _read_first_line(os.path.join(CGROUP_ROOT, "cpu.max"))
+    if cpu_max:
+        quota, _, period = cpu_max.partition(" ")
+        if quota != "max" and period:
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+        return cpus
+
+    # cgroup v1
+    quota = _read_first_line(os.path.join(CGROUP_ROOT, "cpu", "cpu.cfs_quota_us"))
+    period = _read_first_line(os.path.join(CGROUP_ROOT, "cpu", "cpu.cfs_period_us"))
+    if quota and period and int(quota) > 0:
+        cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    return cpus
+
+
+def io_throttled():
+    """
+    Returns True if a cgroup v2 I/O limit (read bandwidth or IOPS) applies to the process.
+    """
+    io_max = os.path.join(CGROUP_ROOT, "io.max")
+    try:
+        with open(io_max, 'r') as f:
+            for line in f:
+                for limit in line.split()[1:]:
+                    key, _, value = limit.partition("=")
+                    if key in ("rbps", "riops") and value != "max":
+                        return True
+    except OSError:
+        pass
+    return False
+
+
+class ConcurrencyTuner:
+    """
+    Hill climbing controller for the number of files hashed concurrently.
+
+    Completed items are counted over sliding windows. After each window the throughput is
+    compared to the previous one: while it improves the tuner keeps moving the concurrency
+    in the same direction, when it drops the direction is reversed. The value stays within
+    the configured bounds.
+    """
+
+    def __init__(self, initial, minimum, maximum, window_seconds=2.0, tolerance=0.05):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.target = min(max(initial, self.minimum), self.maximum)
+        self.window_seconds = window_seconds
+        self.tolerance = tolerance
+        self._direction = 1
+        self._last_throughput = None
+        self._window_items = 0
+        self._window_started = time.monotonic()
+
+    def record(self, items=1):
+        """
+        Records completed items and adjusts the target at the end of a window.
+
+        Returns:
+            int: The current concurrency target.
+        """
+        self._window_items += items
+        now = time.monotonic()
+        elapsed = now - self._window_started
+        if elapsed < self.window_seconds:
+            return self.target
+
+        throughput = self._window_items / elapsed
+        if self._last_throughput is not None and throughput < self._last_throughput * (1 - self.tolerance):
+            self._direction = -self._direction
+        self._last_throughput = throughput
+
+        step = max(1, self.target // 4)
+        new_target = min(max(self.target + self._direction * step, self.minimum), self.maximum)
+        if new_target == self.target:
+            # Reached a bound, probe the other direction next
+            self._direction = -self._direction
+        else:
+            logging.debug("Concurrency %s -> %s at %.1f items/s", self.target, new_target, throughput)
+        self.target = new_target
+
+        self._window_items = 0
+        self._window_started = now
+        return self.target
+
+
+class BatchSizeTuner:
+    """
+    Controller for the number of rows written to the index per batch.
+
+    Larger batches amortize the per statement and per transaction cost, but hold the
+    database longer. The batch size grows while a batch write stays below the target
+    latency and shrinks proportionally when it exceeds it.
+    """
+
+    def __init__(self, initial, minimum, maximum, target_seconds=0.25):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.size = min(max(initial, self.minimum), self.maximum)
+        self.target_seconds = target_seconds
+
+    def record(self, rows, seconds):
+        """
+        Records the latency of a batch write and adjusts the batch size.
+
+        Returns:
+            int: The batch size to use next.
+        """
+        if rows < self.size or seconds <= 0:
+            # Partial batches (the tail of a scan) say little about the cost of a full one
+            return self.size
+
+        if seconds > self.target_seconds:
+            new_size = int(self.size * self.target_seconds / seconds)
+        elif seconds < self.target_seconds / 2:
+            new_size = self.size * 2
+        else:
+            new_size = self.size
+        new_size = min(max(new_size, self.minimum), self.maximum)
+        if new_size != self.size:
+            logging.debug("Batch size %s -> %s after a write of %.3fs", self.size, new_size, seconds)
+        self.size = new_size
+        return self.size
+
+
+def create_scan_tuners(scan_config, batch_size=None):
+    """
+    Creates the controllers for a scan. Without autotuning both start and stay at their
+    initial value.
+
+    Args:
+        scan_config (ScanConfig): The bounds and settings of the controllers.
+        batch_size (int): The initial batch size, AppConfig.batch_size.
+
+    Returns:
+        tuple: (ConcurrencyTuner, BatchSizeTuner)
+    """
+    cpus = available_cpus()
+    # Hashing samples small parts of each file and mostly waits for I/O, start above the CPU count
+    # unless the device is throttled, where more concurrency only queues up.
+    initial_workers = cpus if io_throttled() else 2 * cpus
+    initial_workers = scan_config.workers or initial_workers
+    initial_batch = batch_size or scan_config.min_batch_size
+
+    if not scan_config.autotune:
+        return (ConcurrencyTuner(initial_workers, initial_workers, initial_workers),
+                BatchSizeTuner(initial_batch, initial_batch, initial_batch))
+
+    concurrency = ConcurrencyTuner(initial_workers, scan_config.min_workers, scan_config.max_workers,
+                                   window_seconds=scan_config.window_seconds)
+    batching = BatchSizeTuner(initial_batch, scan_config.min_batch_size, scan_config.max_batch_size,
+                              target_seconds=scan_config.target_batch_seconds)
+    logging.info("Scan autotuning from %s workers (%s CPUs available) and batches of %s rows.",
+                 concurrency.target, cpus, batching.size)
+    return concurrency, batching
@@ -0,0 +1,118 @@
+import json
+import logging
+import redis
+from src.core.redis_connector import RedisConnector
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class SummaryCache:
+    """
+    Caches computed duplicate summaries and aggregates in Redis.
+
+    Every entry is tagged with the scan generation it was computed for. The generation is a
+    counter that is bumped whenever a processing stage commits changes to the index, which
+    invalidates all entries at once without scanning or deleting keys. Stale entries expire
+    through their TTL.
+
+    Redis errors are logged and treated as cache misses, so a missing cache never breaks a scan.
+    """
+
+    def __init__(self, redis_connector: RedisConnector = None, namespace="matr", default_ttl=300):
+        """
+        Args:
+            redis_connector (RedisConnector): Connector to use. A pooled default connector is created if None.
+            namespace (str): Prefix for all keys written by the cache.
+            default_ttl (int): Time to live of an entry in seconds.
+        """
+        self.redis = redis_connector or RedisConnector()
+        self.namespace = namespace
+        self.default_ttl = default_ttl
+
+    def _key(self, key):
+        return f"{self.namespace}:cache:{key}"
+
+    def _generation_key(self):
+        return f"{self.namespace}:generation"
+
+    def generation(self):
+        """
+        Returns the current scan generation, or None if Redis is unavailable.
+        """
+        try:
+            return int(self.redis.get(self._generation_key()) or 0)
+        except redis.RedisError as e:
+            logging.warning("Cache unavailable, cannot read generation: %s", e)
+            return None
+
+    def bump_generation(self):
+        """
+        Invalidates all cached entries by incrementing the scan generation.
+        """
+        try:
+            generation = self.redis.incr(self._generation_key())
+            logging.info("Cache generation bumped to %s.", generation)
+            return generation
+        except redis.RedisError as e:
+            logging.warning("Cache unavailable, cannot bump generation: %s", e)
+            return None
+
+    def get(self, key):
+        """
+        Returns the cached value for the key if it belongs to the current generation, otherwise None.
+        The generation and the entry are read in a single round trip.
+        """
+        return self.get_many([key])[0]
+
+    def get_many(self, keys):
+        """
+        Returns the cached values for several keys, fetched with one pipelined round trip.
+        Missing or stale entries are returned as None.
+        """
+        keys = list(keys)
+        try:
+            values = self.redis.get_many([self._generation_key()] + [self._key(key) for key in keys])
+        except redis.RedisError as e:
+            logging.warning("Cache unavailable, reading %s keys failed: %s", len(keys), e)
+            return [None] * len(keys)
+
+        generation = int(values[0] or 0)
+        results = []
+        for raw in values[1:]:
+            entry = json.loads(raw) if raw else None
+            results.append(entry['value'] if entry and entry['generation'] == generation else None)
+        return results
+
+    def set(self, key, value, generation, ttl=None):
+        """
+        Stores a JSON serializable value computed for the given generation.
+        """
+        self.set_many({key: value}, generation, ttl)
+
+    def set_many(self, mapping, generation, ttl=None):
+        """
+        Stores several JSON serializable values computed for the given generation in one round trip.
+        """
+        if generation is None:
+            return
+        entries = {self._key(key): json.dumps({'generation': generation, 'value': value})
+                   for key, value in mapping.items()}
+        try:
+            self.redis.set_many(entries, ttl or self.default_ttl)
+        except redis.RedisError as e:
+            logging.warning("Cache unavailable, writing %s keys failed: %s", len(entries), e)
+
+    def get_or_compute(self, key, compute, ttl=None):
+        """
+        Returns the cached value for the key, or computes, stores and returns it.
+        The generation is read before computing, so a result that races with an index
+        change is stored under the old generation and never served as current.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        generation = self.generation()
+        value = compute()
+        self.set(key, value, generation, ttl)
+        return value
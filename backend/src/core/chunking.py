@@ -0,0 +1,164 @@
+import hashlib
+import time
+
+try:
+    import numpy
+except ImportError:  # optional, the boundaries are then searched byte by byte in Python
+    numpy = None
+
+# Size of a chunk digest: blake2b truncated to 16 bytes, a fixed width binary key in the chunk store
+DIGEST_SIZE = 16
+
+_MASK_64 = (1 << 64) - 1
+
+# Random but fixed value per byte, so boundaries are the same on every host and in every run
+GEAR = tuple(int.from_bytes(hashlib.blake2b(bytes([value]), digest_size=8).digest(), "big") for value in range(256))
+_GEAR_ARRAY = numpy.array(GEAR, dtype=numpy.uint64) if numpy is not None else None
+
+# The fingerprint shifts one bit per byte, after 64 bytes a byte no longer affects it
+_WINDOW = 64
+
+
+def _mask(bits):
+    # The gear hash shifts left, its high bits depend on the most bytes, so the mask tests those
+    return ((1 << bits) - 1) << (64 - bits)
+
+
+def _find_boundary(data, start, end, min_size, avg_size, max_size, mask_small, mask_large):
+    """
+    Returns the end of the chunk that starts at start, FastCDC style: nothing is cut before
+    min_size, up to avg_size a boundary needs more zero bits (mask_small) and after it fewer
+    (mask_large), which pulls the chunk sizes towards the average, and max_size always cuts.
+    """
+    available = end - start
+    if available <= min_size:
+        return end
+    available = min(available, max_size)
+    normal = min(avg_size, available)
+
+    gear = GEAR
+    fingerprint = 0
+    position = start + min_size
+    limit = start + normal
+    while position < limit:
+        fingerprint = ((fingerprint << 1) + gear[data[position]]) & _MASK_64
+        position += 1
+        if not fingerprint & mask_small:
+            return position
+    limit = start + available
+    while position < limit:
+        fingerprint = ((fingerprint << 1) + gear[data[position]]) & _MASK_64
+        position += 1
+        if not fingerprint & mask_large:
+            return position
+    return limit
+
+
+class _Candidates:
+    """
+    The boundary search of _find_boundary with numpy, with the same boundaries. The pure Python
+    loop hashes about 7 MB/s per core, some 40 core hours per TB, this about six times as much.
+
+    The fingerprint after a byte only depends on the 64 bytes up to it, so it is computed for
+    every position of a buffer at once, in 6 doubling steps over the window, and the positions
+    whose fingerprint passes a mask are listed up front. A chunk takes the first listed position
+    in its range. Only the first 63 bytes hashed for a chunk see a shorter window, they are hashed
+    one by one as in _find_boundary.
+    """
+
+    def __init__(self, data, mask_small, mask_large):
+        fingerprints = numpy.take(_GEAR_ARRAY, numpy.frombuffer(data, dtype=numpy.uint8))
+        shifted = numpy.empty_like(fingerprints)
+        width = 1
+        while width < min(_WINDOW, len(fingerprints)):
+            # Adds the fingerprint of the preceding window of the same width, uint64 wraps like _MASK_64
+            count = len(fingerprints) - width
+            numpy.left_shift(fingerprints[:count], numpy.uint64(width), out=shifted[:count])
+            numpy.add(fingerprints[width:], shifted[:count], out=fingerprints[width:])
+            width *= 2
+        # mask_small has the bits of mask_large and more, its positions are among those of mask_large
+        self.large = numpy.flatnonzero((fingerprints & numpy.uint64(mask_large)) == 0)
+        self.small = self.large[(fingerprints[self.large] & numpy.uint64(mask_small)) == 0]
+
+    @staticmethod
+    def _first(candidates, low, high):
+        # The first listed position in [low, high), None if there is none
+        index = numpy.searchsorted(candidates, low)
+        if index < len(candidates) and candidates[index] < high:
+            return int(candidates[index])
+        return None
+
+    def find_boundary(self, data, start, end, min_size, avg_size, max_size, mask_small, mask_large):
+        """
+        Returns the same chunk end as _find_boundary.
+        """
+        available = end - start
+        if available <= min_size:
+            return end
+        available = min(available, max_size)
+        normal = start + min(avg_size, available)
+        limit = start + available
+
+        gear = GEAR
+        fingerprint = 0
+        position = start + min_size
+        head = min(position + _WINDOW - 1, limit)
+        while position < head:
+            mask = mask_small if position < normal else mask_large
+            fingerprint = ((fingerprint << 1) + gear[data[position]]) & _MASK_64
+            position += 1
+            if not fingerprint & mask:
+                return position
+
+        found = self._first(self.small, position, normal)
+        if found is None:
+            found = self._first(self.large, max(position, normal), limit)
+        return found + 1 if found is not None else limit
+
+
+def chunk_file(filepath, min_size=16384, avg_size=65536, max_size=262144):
+    """
+    Splits a file into content-defined chunks with a gear rolling hash. Boundaries depend only
+    on the bytes around them, so data inserted or removed in one place shifts the boundaries
+    there and the chunks elsewhere stay the same: files that share most of their content share
+    most of their chunks, unlike their whole file hashes.
+
+    Module level, so it can run in a worker process.
+
+    Args:
+        filepath (str): The file to split.
+        min_size (int): Smallest chunk, except the last one of a file.
+        avg_size (int): Chunk size aimed at, a power of two.
+        max_size (int): Largest chunk.
+
+    Returns:
+        tuple: (filepath, list of (size, digest) in file order, seconds taken)
+    """
+    started = time.perf_counter()
+    bits = max(avg_size.bit_length() - 1, 2)
+    mask_small, mask_large = _mask(bits + 2), _mask(bits - 2)
+
+    chunks = []
+    buffer = b""
+    eof = False
+    with open(filepath, "rb") as f:
+        while buffer or not eof:
+            # Keep at least one maximal chunk in the buffer, except at the end of the file
+            if not eof and len(buffer) < max_size:
+                data = f.read(max(4 * max_size, 1 << 20))
+                eof = not data
+                buffer = buffer + data if buffer else data
+                continue
+
+            start = 0
+            find_boundary = (_Candidates(buffer, mask_small, mask_large).find_boundary if numpy is not None
+                             else _find_boundary)
+            while len(buffer) - start >= max_size or (eof and start < len(buffer)):
+                end = find_boundary(buffer, start, len(buffer), min_size, avg_size, max_size,
+                                    mask_small, mask_large)
+                chunk = buffer[start:end]
+                chunks.append((len(chunk), hashlib.blake2b(chunk, digest_size=DIGEST_SIZE).digest()))
+                start = end
+            buffer = buffer[start:]
+
+    return filepath, chunks, time.perf_counter() - started
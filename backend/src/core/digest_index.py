@@ -0,0 +1,171 @@
+import logging
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from src.core.shards import record_algorithm
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+MAGIC = b"MATRDIGX"
+VERSION = 1
+
+# Magic, version, digest width in bytes, number of digests, hash algorithm, padded to 64 bytes
+_HEADER = struct.Struct("<8sHHQ32s12x")
+_ROW = struct.Struct("<Q")
+
+# Below this many candidates the search is binary, interpolation would not save a probe
+_INTERPOLATION_MIN_RANGE = 16
+_INTERPOLATION_STEPS = 8
+
+
+def write_digest_index(db_operations, path, algorithm):
+    """
+    Writes the hashes of the live files of an index into a digest index file: the header, the
+    digests sorted as fixed-width binary values, then the row id of the file of each digest in
+    the same order. The file is written next to path and renamed over it when complete, so
+    readers that mapped the previous version keep reading it.
+
+    Args:
+        db_operations (DatabaseOperations): The index.
+        path (str): The digest index file.
+        algorithm (str): Only the files hashed with this algorithm are written.
+
+    Returns:
+        int: The number of digests written.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    count = 0
+    width = None
+    with tempfile.NamedTemporaryFile("wb", dir=directory, delete=False) as output, \
+            tempfile.TemporaryFile(dir=directory) as rows:
+        try:
+            output.write(b"\x00" * _HEADER.size)
+            for file_id, _, file_hash, _, hash_algorithm, hash_range_size in db_operations.iter_live_files_by_hash():
+                if record_algorithm(hash_algorithm, hash_range_size) != algorithm:
+                    continue
+                digest = bytes.fromhex(file_hash)
+                if width is None:
+                    width = len(digest)
+                elif len(digest) != width:
+                    raise ValueError(f"Hash of file {file_id} has {len(digest)} bytes, expected {width}")
+                output.write(digest)
+                rows.write(_ROW.pack(file_id))
+                count += 1
+
+            rows.seek(0)
+            shutil.copyfileobj(rows, output)
+            output.seek(0)
+            output.write(_HEADER.pack(MAGIC, VERSION, width or 0, count, algorithm.encode()))
+            output.flush()
+            os.fsync(output.fileno())
+        except BaseException:
+            output.close()
+            os.unlink(output.name)
+            raise
+    os.chmod(output.name, 0o644)  # the temporary file is private, other tools read the index
+    os.replace(output.name, path)
+    logging.info("Wrote %s digests into %s.", count, path)
+    return count
+
+
+class DigestIndex:
+    """
+    Answers "is this content known?" from a digest index file, without a database connection.
+
+    The file is memory mapped read-only. Every process that opens it shares the same pages
+    through the page cache, and a lookup touches only a few of them. Cryptographic digests are
+    uniformly distributed, so an interpolation search on their leading 8 bytes narrows millions
+    of entries down to a dozen in three or four probes. A binary search finishes the range,
+    and takes over after a few steps if the digests are skewed and interpolation crawls.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.width, self.count, algorithm = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a digest index")
+        if version != VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is a digest index of version {version}, only {VERSION} is supported")
+        self.algorithm = algorithm.rstrip(b"\x00").decode()
+        self._digests = _HEADER.size
+        self._rows = self._digests + self.width * self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, digest):
+        return self._search(self._digest(digest)) >= 0
+
+    def _digest(self, digest):
+        digest = bytes.fromhex(digest) if isinstance(digest, str) else digest
+        if self.count and len(digest) != self.width:
+            raise ValueError(f"Expected a digest of {self.width} bytes, got {len(digest)}")
+        return digest
+
+    def _at(self, index):
+        offset = self._digests + index * self.width
+        return self._map[offset:offset + self.width]
+
+    def _search(self, digest):
+        """
+        Returns the index of the first entry equal to digest, -1 if there is none.
+        """
+        low, high = 0, self.count  # the first entry >= digest lies in [low, high]
+        if not high:
+            return -1
+        key = int.from_bytes(digest[:8], "big")
+        # The leading 8 bytes of the entries in [low, high) lie in [low_key, high_key), as does key
+        low_key, high_key = 0, 1 << 64
+
+        # Skewed digests could make interpolation crawl, a few steps are enough for uniform ones
+        for _ in range(_INTERPOLATION_STEPS):
+            if high - low <= _INTERPOLATION_MIN_RANGE:
+                break
+            guess = low + (key - low_key) * (high - low) // (high_key - low_key)
+            guess = min(max(guess, low), high - 1)
+            value = self._at(guess)
+            if value < digest:
+                low, low_key = guess + 1, int.from_bytes(value[:8], "big")
+            else:
+                high, high_key = guess, int.from_bytes(value[:8], "big") + 1
+
+        while low < high:
+            middle = (low + high) // 2
+            if self._at(middle) < digest:
+                low = middle + 1
+            else:
+                high = middle
+        return low if low < self.count and self._at(low) == digest else -1
+
+    def find(self, digest):
+        """
+        Looks a digest up.
+
+        Args:
+            digest (bytes or str): The binary digest or its hex form.
+
+        Returns:
+            list: The row ids of the files with that digest in the exported index, empty if unknown.
+        """
+        digest = self._digest(digest)
+        index = self._search(digest)
+        found = []
+        while 0 <= index < self.count and self._at(index) == digest:
+            found.append(_ROW.unpack_from(self._map, self._rows + index * _ROW.size)[0])
+            index += 1
+        return found
+
+    def close(self):
+        self._map.close()
@@ -0,0 +1,472 @@
+import json
+import logging
+import os
+import socket
+import threading
+import uuid
+from itertools import islice
+import redis
+from src.config.ConfigModel import AppConfig, DistributedConfig, ScanConfig
+from src.core.file_operations import FileOperations
+from src.core.hash_cache import HashCache
+from src.core.metrics import HASH_ERRORS, HASH_CACHE_LOOKUPS, WORK_UNITS
+from src.core.redis_connector import RedisConnector
+from src.core.rules import RuleSet
+from src.core.walker import list_files, walk_files
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Takes the next unit and leases it to a worker until the given expiry
+_CLAIM = """
+local unit = redis.call('LPOP', KEYS[1])
+if not unit then
+    return false
+end
+redis.call('ZADD', KEYS[2], ARGV[2], unit)
+redis.call('HSET', KEYS[3], unit, ARGV[1])
+return unit
+"""
+
+# Moves the expiry of a lease, only for the worker that holds it
+_EXTEND = """
+if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1])
+return 1
+"""
+
+# Appends a result batch, only for the worker that holds the lease of its unit
+_PUSH = """
+if redis.call('HGET', KEYS[1], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+redis.call('RPUSH', KEYS[2], ARGV[3])
+return 1
+"""
+
+# Marks a unit done and forgets it, only for the worker that holds its lease
+_COMPLETE = """
+if redis.call('HGET', KEYS[1], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+redis.call('HDEL', KEYS[1], ARGV[1])
+redis.call('ZREM', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[3], ARGV[1])
+redis.call('HDEL', KEYS[4], ARGV[1])
+redis.call('SADD', KEYS[5], ARGV[1])
+return 1
+"""
+
+# Takes the expired leases from their workers and queues the units again, at the front, unless
+# they ran out of attempts. Returns the number of expired leases and the units given up.
+_REAP = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+local failed = {}
+for _, unit in ipairs(expired) do
+    redis.call('ZREM', KEYS[1], unit)
+    redis.call('HDEL', KEYS[2], unit)
+    if redis.call('HINCRBY', KEYS[4], unit, 1) < tonumber(ARGV[2]) then
+        redis.call('LPUSH', KEYS[3], unit)
+    else
+        table.insert(failed, unit)
+    end
+end
+return {#expired, failed}
+"""
+
+
+class WorkQueue:
+    """
+    Work units of distributed scans in Redis, shared by the coordinators and the workers of all hosts.
+
+    A unit is a directory, with or without its subtree. Pending units wait in a list. A worker
+    that takes one holds a lease on it: an expiry time in a sorted set, which it moves ahead
+    with heartbeats while it works. Result batches are appended to a list per scan, read by the
+    coordinator of the scan. The coordinators reap the leases whose expiry passed, the worker
+    died or lost its connection, and queue their units again for another worker.
+
+    Every step that depends on who holds a lease is a Lua script, so it is atomic on the server.
+    Once a lease was reaped its former worker can no longer extend it, append results or
+    complete the unit. Batches it appended before are not taken back, the coordinator drops the
+    files it already merged. Expiry times come from the clock of the Redis server, the hosts do
+    not have to agree on the time.
+    """
+
+    def __init__(self, redis_connector: RedisConnector = None, namespace="matr", lease_seconds=60.0, max_attempts=3):
+        """
+        Args:
+            redis_connector (RedisConnector): Connector to use. A pooled default connector is created if None.
+            namespace (str): Prefix for all keys written by the queue.
+            lease_seconds (float): Time a unit stays with a worker without a heartbeat.
+            max_attempts (int): Expired leases after which a unit is given up.
+        """
+        self.redis = redis_connector or RedisConnector()
+        self.namespace = namespace
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        client = self.redis.client
+        self._claim = client.register_script(_CLAIM)
+        self._extend = client.register_script(_EXTEND)
+        self._push = client.register_script(_PUSH)
+        self._complete = client.register_script(_COMPLETE)
+        self._reap = client.register_script(_REAP)
+
+    def _key(self, name):
+        return f"{self.namespace}:work:{name}"
+
+    def _scan_key(self, scan_id, name):
+        return f"{self.namespace}:scan:{scan_id}:{name}"
+
+    def _now(self):
+        seconds, microseconds = self.redis.client.time()
+        return seconds + microseconds / 1e6
+
+    def publish(self, scan_id, units):
+        """
+        Queues the work units of a scan.
+
+        Args:
+            scan_id (str): Id of the scan, names its result list.
+            units (list): Tuples (directory, recursive), see split_work_units.
+
+        Returns:
+            list: The ids of the units.
+        """
+        unit_ids = [f"{scan_id}:{index}" for index in range(len(units))]
+        pipe = self.redis.pipeline()
+        for start in range(0, len(units), 1000):
+            chunk = range(start, min(start + 1000, len(units)))
+            pipe.hset(self._key("units"), mapping={
+                unit_ids[index]: json.dumps({'scan': scan_id, 'directory': units[index][0],
+                                             'recursive': units[index][1]})
+                for index in chunk})
+            pipe.rpush(self._key("pending"), *(unit_ids[index] for index in chunk))
+        pipe.execute()
+        return unit_ids
+
+    def claim(self, worker_id):
+        """
+        Takes the next pending unit and leases it to a worker.
+
+        Returns:
+            tuple: (unit id, unit) with the unit a dict of scan, directory and recursive, or None
+            if no unit is pending.
+        """
+        while True:
+            unit_id = self._claim(keys=[self._key("pending"), self._key("leases"), self._key("owners")],
+                                  args=[worker_id, self._now() + self.lease_seconds])
+            if unit_id is None:
+                return None
+            unit = self.redis.client.hget(self._key("units"), unit_id)
+            if unit is not None:
+                return unit_id, json.loads(unit)
+            # The scan was cancelled meanwhile, its units are forgotten
+            self.redis.client.zrem(self._key("leases"), unit_id)
+            self.redis.client.hdel(self._key("owners"), unit_id)
+
+    def heartbeat(self, unit_id, worker_id):
+        """
+        Extends the lease of a unit.
+
+        Returns:
+            bool: False if the worker no longer holds the lease.
+        """
+        return bool(self._extend(keys=[self._key("leases"), self._key("owners")],
+                                 args=[unit_id, worker_id, self._now() + self.lease_seconds]))
+
+    def release(self, unit_id, worker_id):
+        """
+        Gives a unit back before its lease expires, the next reap queues it again as an attempt.
+        """
+        self._extend(keys=[self._key("leases"), self._key("owners")], args=[unit_id, worker_id, 0])
+
+    def push_results(self, unit_id, worker_id, scan_id, payload):
+        """
+        Appends a result batch of a unit for the coordinator of its scan.
+
+        Returns:
+            bool: False if the worker no longer holds the lease, the batch was not appended.
+        """
+        return bool(self._push(keys=[self._key("owners"), self._scan_key(scan_id, "results")],
+                               args=[unit_id, worker_id, payload]))
+
+    def complete(self, unit_id, worker_id, scan_id):
+        """
+        Marks a unit done after all its result batches were appended.
+
+        Returns:
+            bool: False if the worker no longer holds the lease.
+        """
+        return bool(self._complete(keys=[self._key("owners"), self._key("leases"), self._key("units"),
+                                         self._key("attempts"), self._scan_key(scan_id, "done")],
+                                   args=[unit_id, worker_id]))
+
+    def reap(self):
+        """
+        Queues the units of the expired leases again, of every scan.
+
+        Returns:
+            tuple: (number of units queued again, number of units given up)
+        """
+        expired, failed = self._reap(keys=[self._key("leases"), self._key("owners"), self._key("pending"),
+                                           self._key("attempts")],
+                                     args=[self._now(), self.max_attempts])
+        for unit_id in failed:
+            unit = self.redis.client.hget(self._key("units"), unit_id)
+            if unit is not None:
+                unit = json.loads(unit)
+                logging.error("Giving up work unit %s (%s) after %s expired leases.", unit_id, unit['directory'],
+                              self.max_attempts)
+                self.redis.client.sadd(self._scan_key(unit['scan'], "failed"), unit_id)
+            self.redis.client.hdel(self._key("units"), unit_id)
+            self.redis.client.hdel(self._key("attempts"), unit_id)
+        return expired - len(failed), len(failed)
+
+    def pop_results(self, scan_id, timeout=1.0, count=100):
+        """
+        Takes the next result batches of a scan, waiting up to timeout seconds for the first one.
+
+        Returns:
+            list: The payloads, oldest first.
+        """
+        key = self._scan_key(scan_id, "results")
+        first = self.redis.client.blpop([key], timeout=timeout)
+        if first is None:
+            return []
+        return [first[1]] + (self.redis.client.lpop(key, count - 1) or [])
+
+    def finished_units(self, scan_id):
+        """
+        Returns:
+            tuple: (units done, units given up) of a scan.
+        """
+        pipe = self.redis.pipeline()
+        pipe.scard(self._scan_key(scan_id, "done"))
+        pipe.scard(self._scan_key(scan_id, "failed"))
+        done, failed = pipe.execute()
+        return done, failed
+
+    def failed_units(self, scan_id):
+        return sorted(self.redis.client.smembers(self._scan_key(scan_id, "failed")))
+
+    def clear(self, scan_id, unit_ids):
+        """
+        Forgets a scan: its units that are still pending or leased and its result list. Workers
+        still busy with one of its units lose their lease.
+        """
+        pipe = self.redis.pipeline()
+        for start in range(0, len(unit_ids), 1000):
+            chunk = unit_ids[start:start + 1000]
+            for unit_id in chunk:
+                pipe.lrem(self._key("pending"), 0, unit_id)
+            pipe.hdel(self._key("units"), *chunk)
+            pipe.hdel(self._key("attempts"), *chunk)
+            pipe.hdel(self._key("owners"), *chunk)
+            pipe.zrem(self._key("leases"), *chunk)
+        pipe.delete(*(self._scan_key(scan_id, name) for name in ("results", "done", "failed")))
+        pipe.execute()
+
+
+class _Heartbeat:
+    """
+    Extends the lease of a unit from a thread while the worker processes it, so a slow file
+    does not cost the lease, only a dead worker does.
+    """
+
+    def __init__(self, work_queue: WorkQueue, unit_id, worker_id, interval):
+        self.work_queue = work_queue
+        self.unit_id = unit_id
+        self.worker_id = worker_id
+        self.interval = interval
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="lease-heartbeat", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                if not self.work_queue.heartbeat(self.unit_id, self.worker_id):
+                    self.lost.set()
+                    return
+            except redis.RedisError as e:
+                # The lease survives a short outage, it expires only after lease_seconds
+                logging.warning("Heartbeat for work unit %s failed: %s", self.unit_id, e)
+
+
+class ScanWorker:
+    """
+    Takes work units from the queue, walks and hashes their files and sends the results back
+    in compact batches: one header per batch and per file a row of its path relative to the
+    unit directory, hash, size and times, instead of one dictionary per file.
+
+    Workers keep no index, they hash every file of a unit. The coordinator drops the files that
+    are already in its index. The file systems have to be mounted under the same paths on all
+    hosts. With the shared hash cache enabled in the configuration of the worker, the files of a
+    unit are looked up in batches before any is read, and only the misses are hashed and stored.
+    The walk follows the rules of the configuration of the worker.
+    """
+
+    def __init__(self, config: AppConfig = None, work_queue: WorkQueue = None, worker_id=None,
+                 hash_cache: HashCache = None):
+        """
+        Args:
+            config (AppConfig): The configuration of the worker.
+            work_queue (WorkQueue): The queue of the work units, a default one if None.
+            worker_id (str): Id of the worker in the leases, host, process and a random suffix if None.
+            hash_cache (HashCache): The shared hash cache, a default one if it is enabled in the configuration.
+        """
+        self.distributed_config = config.Distributed if config and config.Distributed else DistributedConfig()
+        scan_config = config.Scan if config and config.Scan else ScanConfig()
+        self.file_operations = FileOperations(hash_mode=scan_config.hash_mode,
+                                              hash_range_size=scan_config.hash_range_size,
+                                              hash_range_threads=scan_config.hash_range_threads)
+        self.work_queue = work_queue or WorkQueue(lease_seconds=self.distributed_config.lease_seconds,
+                                                  max_attempts=self.distributed_config.max_attempts)
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.rules = RuleSet.from_config(config.Rules if config else None)
+        hash_cache_config = config.HashCache if config else None
+        if hash_cache is None and hash_cache_config and hash_cache_config.enabled:
+            hash_cache = HashCache(ttl=hash_cache_config.ttl_seconds, batch_size=hash_cache_config.batch_size,
+                                   algorithm=self.file_operations.hash_algorithm)
+        self.hash_cache = hash_cache
+
+    def run(self, stop_event: threading.Event):
+        """
+        Processes units until the stop event is set.
+        """
+        logging.info("Worker %s waiting for work units.", self.worker_id)
+        while not stop_event.is_set():
+            try:
+                claimed = self.work_queue.claim(self.worker_id)
+                if claimed is None:
+                    stop_event.wait(self.distributed_config.poll_seconds)
+                    continue
+                self.process_unit(*claimed)
+            except redis.RedisError as e:
+                logging.warning("Work queue unavailable: %s", e)
+                stop_event.wait(self.distributed_config.poll_seconds)
+        logging.info("Worker %s stopped.", self.worker_id)
+
+    def process_unit(self, unit_id, unit):
+        """
+        Walks and hashes the files of a unit and completes it.
+
+        Returns:
+            bool: False if the unit was given back or its lease was lost.
+        """
+        directory = unit['directory']
+        if not os.path.isdir(directory):
+            logging.error("Work unit %s: %s is not a directory on this host.", unit_id, directory)
+            self.work_queue.release(unit_id, self.worker_id)
+            WORK_UNITS.inc(status="released")
+            return False
+
+        filepaths = (walk_files(directory, rules=self.rules) if unit['recursive']
+                     else list_files(directory, rules=self.rules))
+        with _Heartbeat(self.work_queue, unit_id, self.worker_id, self.distributed_config.heartbeat_seconds) as heartbeat:
+            rows = []
+            header = None
+            for data in self._iter_metadata(filepaths):
+                if heartbeat.lost.is_set():
+                    break
+                header = header or {'unit': unit_id, 'directory': directory, 'hash_algorithm': data['hash_algorithm'],
+                                    'hash_range_size': data['hash_range_size']}
+                rows.append([os.path.relpath(data['path'], directory), data['hash'], data['size'],
+                             data['modification_time'], data['access_time'], data['creation_time']])
+                if len(rows) >= self.distributed_config.result_batch_size:
+                    if not self._push(unit_id, unit['scan'], header, rows):
+                        break
+                    rows = []
+            else:
+                if (not rows or self._push(unit_id, unit['scan'], header, rows)) and \
+                        self.work_queue.complete(unit_id, self.worker_id, unit['scan']):
+                    WORK_UNITS.inc(status="completed")
+                    return True
+
+        logging.warning("Worker %s lost the lease of work unit %s (%s).", self.worker_id, unit_id, directory)
+        WORK_UNITS.inc(status="lost")
+        return False
+
+    def _iter_metadata(self, filepaths):
+        """
+        Yields the metadata of the files that could be read, with the hashes found in the hash
+        cache instead of reading the files. The hashes computed here are stored after every
+        batch, under the stat taken before the file was read, unless the file changed meanwhile.
+        """
+        filepaths = iter(filepaths)
+        batch_size = self.hash_cache.batch_size if self.hash_cache else 1
+        while True:
+            chunk = list(islice(filepaths, batch_size))
+            if not chunk:
+                return
+            stats = {}
+            cached = {}
+            if self.hash_cache:
+                for filepath in chunk:
+                    try:
+                        stats[filepath] = os.stat(filepath)
+                    except OSError:
+                        pass  # reported when it is hashed
+                cached = self.hash_cache.lookup(stats)
+                HASH_CACHE_LOOKUPS.inc(len(cached), result="hit")
+                HASH_CACHE_LOOKUPS.inc(len(chunk) - len(cached), result="miss")
+
+            hashed = []
+            for filepath in chunk:
+                stat_result = stats.get(filepath)
+                try:
+                    data = self.file_operations.get_file_metadata(filepath, stat_result, cached.get(filepath))
+                    if stat_result is not None and filepath not in cached:
+                        current = os.stat(filepath)
+                        if (current.st_size, current.st_mtime_ns) == (stat_result.st_size, stat_result.st_mtime_ns):
+                            hashed.append((filepath, stat_result, data['hash']))
+                except OSError as e:
+                    HASH_ERRORS.inc()
+                    logging.error("Error processing file %s: %s", filepath, e)
+                    continue
+                yield data
+            if hashed:
+                self.hash_cache.store(hashed)
+
+    def _push(self, unit_id, scan_id, header, rows):
+        return self.work_queue.push_results(unit_id, self.worker_id, scan_id, json.dumps(dict(header, files=rows)))
+
+
+def iter_result_files(payload):
+    """
+    Unpacks a result batch into the file metadata of the index.
+
+    Yields:
+        dict: The metadata of each file, as returned by FileOperations.get_file_metadata.
+    """
+    batch = json.loads(payload)
+    directory = batch['directory']
+    for path, file_hash, size, modification_time, access_time, creation_time in batch['files']:
+        yield {
+            'path': os.path.join(directory, path),
+            'hash': file_hash,
+            'size': size,
+            'modification_time': modification_time,
+            'access_time': access_time,
+            'creation_time': creation_time,
+            'hash_algorithm': batch['hash_algorithm'],
+            'hash_range_size': batch['hash_range_size']
+        }
+
+
+def run_worker(config: AppConfig, stop_event):
+    """
+    Runs a scan worker until the stop event is set. Module level so it can be the target of a
+    worker process started by the coordinator.
+    """
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    ScanWorker(config).run(stop_event)
@@ -5,8 +5,10 @@ import filecmp
 import datetime
 import shutil
 import re
-from concurrent.futures import ProcessPoolExecutor
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from tqdm import tqdm
+from src.core.metrics import FILES_HASHED, BYTES_HASHED, HASH_SECONDS, size_bucket
 
 # Setting up logging configuration
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -15,8 +17,31 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 class FileOperations:
     """Class provides all filesystem operations"""
 
-    def __init__(self):
-        None
+    # Block size read at the start, middle and end of a file by the sample hash
+    SAMPLE_SIZE = 256
+
+    # Name of the algorithm of each hash mode, recorded with every hash in the index
+    HASH_ALGORITHMS = {"sample": "sha256-sample", "full": "sha1", "tree": "sha256-tree"}
+
+    # Block size of a single pread while hashing a range
+    READ_SIZE = 1 << 20
+
+    def __init__(self, hash_mode="sample", hash_range_size=64 << 20, hash_range_threads=4):
+        """
+        Args:
+            hash_mode (str): How file contents are hashed: "sample" (size and three small blocks),
+                "full" (sequential SHA-1 of the content) or "tree" (SHA-256 of fixed ranges hashed
+                in parallel, combined into a root digest).
+            hash_range_size (int): Range size of the tree hash.
+            hash_range_threads (int): Ranges of one file hashed at the same time by the tree hash.
+        """
+        if hash_mode not in self.HASH_ALGORITHMS:
+            raise ValueError(f"Unknown hash mode {hash_mode!r}, expected one of {', '.join(self.HASH_ALGORITHMS)}.")
+        if hash_mode == "tree" and not hasattr(os, "pread"):
+            raise ValueError("The tree hash requires os.pread, which this platform does not provide.")
+        self.hash_mode = hash_mode
+        self.hash_range_size = hash_range_size
+        self.hash_range_threads = hash_range_threads
 
     def _get_file_content_hash_full(self, filepath):
         hasher = hashlib.sha1()
@@ -34,8 +59,8 @@ class FileOperations:
         """
         file_size = os.path.getsize(filepath)
         hash_obj = hashlib.sha256()
-        sample_size = 256
-        
+        sample_size = self.SAMPLE_SIZE
+
         with open(filepath, 'rb') as f:
             # Include file size in the hash
             hash_obj.update(str(file_size).encode())
@@ -54,16 +79,87 @@ class FileOperations:
 
         return hash_obj.hexdigest()
     
+    def _get_file_content_hash_tree(self, filepath):
+        """
+        Generates a tree hash: the file is split into ranges of hash_range_size bytes, each range
+        is hashed on its own with positional reads, several at a time, and the root digest covers
+        the file size, the range size and the range digests in order. hashlib and os.pread release
+        the GIL, so the threads use several cores and keep several reads in flight, and a single
+        large file no longer hashes on one core. The result depends only on the content and the
+        range size, not on the number of threads.
+        """
+        range_size = self.hash_range_size
+        fd = os.open(filepath, os.O_RDONLY)
+        try:
+            file_size = os.fstat(fd).st_size
+            ranges = [(offset, min(range_size, file_size - offset)) for offset in range(0, file_size, range_size)]
+            if len(ranges) > 1 and self.hash_range_threads > 1:
+                with ThreadPoolExecutor(max_workers=min(self.hash_range_threads, len(ranges))) as executor:
+                    leaves = list(executor.map(lambda file_range: self._hash_range(fd, *file_range), ranges))
+            else:
+                leaves = [self._hash_range(fd, offset, length) for offset, length in ranges]
+        finally:
+            os.close(fd)
+
+        # Prefixes keep range digests and root digests apart
+        root = hashlib.sha256(b"\x01")
+        root.update(file_size.to_bytes(8, "big"))
+        root.update(range_size.to_bytes(8, "big"))
+        for leaf in leaves:
+            root.update(leaf)
+        return root.hexdigest()
+
+    def _hash_range(self, fd, offset, length):
+        hasher = hashlib.sha256(b"\x00")
+        end = offset + length
+        while offset < end:
+            block = os.pread(fd, min(self.READ_SIZE, end - offset), offset)
+            if not block:
+                break  # the file was truncated meanwhile
+            hasher.update(block)
+            offset += len(block)
+        return hasher.digest()
+
+    def _get_file_content_hash(self, filepath):
+        if self.hash_mode == "tree":
+            return self._get_file_content_hash_tree(filepath)
+        if self.hash_mode == "full":
+            return self._get_file_content_hash_full(filepath)
+        return self._get_file_content_hash_sample(filepath)
+
     def get_file_metadata_hash(self, filepath):
         metadata = self.get_file_metadata(filepath)  # Assuming get_file_metadata is also a static method
         combined_hash = str(str(metadata['hash']) + str(metadata['size']) + metadata['creation_time'])
         return hashlib.sha1(combined_hash.encode()).hexdigest()
     
-    def get_file_metadata(self, filepath):
-        """Prepare file data for further processing or storage."""
+    def record_hash_metrics(self, size, seconds):
+        """Records a hashed file, also called by the parent of the worker processes that hashed it."""
+        FILES_HASHED.inc()
+        BYTES_HASHED.inc(min(size, 3 * self.SAMPLE_SIZE) if self.hash_mode == "sample" else size)
+        HASH_SECONDS.observe(seconds, size_bucket=size_bucket(size))
+
+    @property
+    def hash_algorithm(self):
+        """The algorithm of the hashes, with the range size of the tree hash."""
+        algorithm = self.HASH_ALGORITHMS[self.hash_mode]
+        return f"{algorithm}-{self.hash_range_size}" if self.hash_mode == "tree" else algorithm
+
+    def get_file_metadata(self, filepath, stat_result=None, content_hash=None):
+        """
+        Prepare file data for further processing or storage.
+
+        With the content hash of the file version described by stat_result, e.g. from the hash
+        cache, the file content is not read.
+        """
+        started = time.perf_counter()
         # Get file size, modification time, and other relevant metadata
-        metadata = os.stat(filepath)
-        hash = self._get_file_content_hash_sample(filepath)
+        metadata = stat_result or os.stat(filepath)
+        if content_hash is not None:
+            hash = content_hash
+        else:
+            hash = self._get_file_content_hash(filepath)
+            self.record_hash_metrics(metadata.st_size, time.perf_counter() - started)
+
         mtime = datetime.datetime.fromtimestamp(metadata.st_mtime).isoformat()
         atime = datetime.datetime.fromtimestamp(metadata.st_atime).isoformat()
         ctime = datetime.datetime.fromtimestamp(metadata.st_ctime).isoformat()
@@ -75,7 +171,9 @@ class FileOperations:
             'size': metadata.st_size,
             'modification_time': mtime,
             'access_time': atime,
-            'creation_time': ctime
+            'creation_time': ctime,
+            'hash_algorithm': self.HASH_ALGORITHMS[self.hash_mode],
+            'hash_range_size': self.hash_range_size if self.hash_mode == "tree" else None
         }
 
         return file_data
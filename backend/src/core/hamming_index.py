@@ -0,0 +1,70 @@
+from itertools import combinations
+
+
+def hamming_distance(a, b):
+    """
+    Number of differing bits of two integer fingerprints.
+    """
+    return (a ^ b).bit_count()
+
+
+class MultiIndexHash:
+    """
+    Index of integer fingerprints for Hamming radius searches (multi-index hashing).
+
+    The fingerprint is cut into blocks, and every block is a key of its own hash table. Two
+    fingerprints within radius r differ in at most r // blocks bits in at least one block
+    (pigeonhole), so a search looks up the few block values within that smaller radius in each
+    table and verifies only the fingerprints found there, instead of comparing the query with
+    every fingerprint. With 64 bit fingerprints in 4 blocks and a radius up to 7, that is 17
+    lookups per block.
+    """
+
+    def __init__(self, bits=64, blocks=4):
+        self.bits = bits
+        self.blocks = blocks
+        self._width = -(-bits // blocks)
+        self._mask = (1 << self._width) - 1
+        self._tables = [{} for _ in range(blocks)]
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _block(self, fingerprint, index):
+        return (fingerprint >> (index * self._width)) & self._mask
+
+    def add(self, fingerprint, value):
+        """
+        Adds a value under a fingerprint.
+        """
+        entry = (fingerprint, value)
+        for index, table in enumerate(self._tables):
+            table.setdefault(self._block(fingerprint, index), []).append(entry)
+        self._size += 1
+
+    def search(self, fingerprint, radius):
+        """
+        Finds the values whose fingerprints are within a Hamming radius of a fingerprint.
+
+        Returns:
+            list: Tuples (distance, value).
+        """
+        block_radius = radius // self.blocks
+        flips = [0]
+        for count in range(1, block_radius + 1):
+            flips.extend(sum(1 << bit for bit in bits) for bits in combinations(range(self._width), count))
+
+        seen = set()
+        found = []
+        for index, table in enumerate(self._tables):
+            block = self._block(fingerprint, index)
+            for flip in flips:
+                for entry in table.get(block ^ flip, ()):
+                    if id(entry) in seen:
+                        continue
+                    seen.add(id(entry))
+                    distance = (fingerprint ^ entry[0]).bit_count()
+                    if distance <= radius:
+                        found.append((distance, entry[1]))
+        return found
@@ -0,0 +1,119 @@
+import logging
+import os
+import threading
+import redis
+from src.core.redis_connector import RedisConnector
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class HashCache:
+    """
+    Content hashes shared in Redis by all scanners that mount the same file systems.
+
+    A hash is stored under the identity of the file version it was computed from: the file
+    system UUID, the inode, the size and the modification time in nanoseconds, and the hash
+    algorithm. Another host that sees the same identity takes the hash instead of reading the
+    file. Renames keep the inode, so a moved file is not read again either. Any write changes
+    the modification time, which makes the old entry unreachable until it expires.
+
+    Lookups and stores are pipelined, thousands of keys per round trip. Redis errors are logged
+    and treated as misses, so a missing cache never breaks a scan.
+    """
+
+    _device_uuids = None  # st_rdev of the block devices below /dev/disk/by-uuid -> UUID, read once
+    _device_uuids_lock = threading.Lock()
+
+    def __init__(self, redis_connector: RedisConnector = None, namespace="matr", ttl=2592000, batch_size=5000,
+                 algorithm="sha256-sample"):
+        """
+        Args:
+            redis_connector (RedisConnector): Connector to use. A pooled default connector is created if None.
+            namespace (str): Prefix for all keys written by the cache.
+            ttl (int): Time to live of an entry in seconds.
+            batch_size (int): Keys per pipelined round trip.
+            algorithm (str): The hash algorithm (and range size) of the hashes, part of every key.
+        """
+        self.redis = redis_connector or RedisConnector()
+        self.namespace = namespace
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self.algorithm = algorithm
+        self._filesystem_ids = {}  # st_dev -> file system id
+
+    @classmethod
+    def _uuid_of_device(cls, device):
+        with cls._device_uuids_lock:
+            if cls._device_uuids is None:
+                cls._device_uuids = {}
+                try:
+                    with os.scandir("/dev/disk/by-uuid") as entries:
+                        for entry in entries:
+                            try:
+                                cls._device_uuids[os.stat(entry.path).st_rdev] = entry.name
+                            except OSError:
+                                continue
+                except OSError:
+                    pass  # not Linux or no udev
+        return cls._device_uuids.get(device)
+
+    def filesystem_id(self, path, stat_result):
+        """
+        Returns an id of the file system of a file that is the same on every host mounting it:
+        the UUID of a local block device, otherwise the file system id reported by statvfs,
+        which network file systems take from the server.
+        """
+        filesystem_id = self._filesystem_ids.get(stat_result.st_dev)
+        if filesystem_id is None:
+            filesystem_id = self._uuid_of_device(stat_result.st_dev)
+            if filesystem_id is None:
+                try:
+                    fsid = os.statvfs(path).f_fsid
+                except (OSError, AttributeError):
+                    fsid = 0
+                # Without either, the device number only identifies the file system on this host
+                filesystem_id = "fsid-%x" % fsid if fsid else "dev-%x" % stat_result.st_dev
+            self._filesystem_ids[stat_result.st_dev] = filesystem_id
+        return filesystem_id
+
+    def _key(self, path, stat_result):
+        return "{0}:hash:{1}:{2}:{3}:{4}:{5}".format(
+            self.namespace, self.algorithm, self.filesystem_id(path, stat_result), stat_result.st_ino,
+            stat_result.st_size, stat_result.st_mtime_ns)
+
+    def lookup(self, stats):
+        """
+        Looks up the hashes of several files.
+
+        Args:
+            stats (dict): The os.stat result per path.
+
+        Returns:
+            dict: The cached hash per path, only for the paths that were found.
+        """
+        paths = list(stats)
+        found = {}
+        try:
+            for start in range(0, len(paths), self.batch_size):
+                chunk = paths[start:start + self.batch_size]
+                values = self.redis.get_many([self._key(path, stats[path]) for path in chunk])
+                found.update((path, value) for path, value in zip(chunk, values) if value is not None)
+        except redis.RedisError as e:
+            logging.warning("Hash cache unavailable, reading %s keys failed: %s", len(paths), e)
+        return found
+
+    def store(self, entries):
+        """
+        Stores the hashes of several files.
+
+        Args:
+            entries (list): Tuples (path, stat_result, hash), the stat taken before the file was read.
+        """
+        entries = list(entries)
+        try:
+            for start in range(0, len(entries), self.batch_size):
+                self.redis.set_many({self._key(path, stat_result): file_hash
+                                     for path, stat_result, file_hash in entries[start:start + self.batch_size]},
+                                    ttl=self.ttl)
+        except redis.RedisError as e:
+            logging.warning("Hash cache unavailable, storing %s keys failed: %s", len(entries), e)
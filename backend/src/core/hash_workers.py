@@ -0,0 +1,215 @@
+import logging
+import multiprocessing
+import time
+from collections import deque, namedtuple
+from multiprocessing.connection import wait
+from src.core.metrics import HASH_TIMEOUTS, HASH_WORKERS_REPLACED
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# status of a HashResult
+HASH_OK = "ok"
+HASH_ERROR = "error"        # the file could not be read, e.g. removed or permission denied
+HASH_TIMEOUT = "timeout"    # the file did not finish within the deadline, its worker was killed
+HASH_CRASHED = "crashed"    # the worker died while hashing the file
+HASH_CACHED = "cached"      # not read, the hash came from the hash cache (set by the caller, not by a worker)
+
+HashResult = namedtuple("HashResult", ["filepath", "data", "status", "error", "seconds"])
+
+
+def _hash_worker(connection, hash_options=None):
+    """
+    Loop of a worker process: receives file paths, returns their metadata. Module level so it
+    can be started with the spawn method.
+    """
+    from src.core.file_operations import FileOperations
+
+    file_operations = FileOperations(**(hash_options or {}))
+    while True:
+        try:
+            filepath = connection.recv()
+        except EOFError:
+            return
+        if filepath is None:
+            return
+
+        started = time.perf_counter()
+        try:
+            data = file_operations.get_file_metadata(filepath)
+            connection.send((filepath, data, HASH_OK, None, time.perf_counter() - started))
+        except Exception as e:
+            connection.send((filepath, None, HASH_ERROR, str(e), time.perf_counter() - started))
+
+
+def default_context():
+    """
+    The forkserver starts once with the hashing code imported, every worker is then forked from
+    it in milliseconds, and never from the caller, which may run threads (API server, watchdog)
+    that must not be forked. Platforms without fork use spawn.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(["src.core.file_operations"])
+    return context
+
+
+class _Worker:
+    def __init__(self, context, hash_options=None):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=_hash_worker, args=(child_connection, hash_options), daemon=True)
+        self.process.start()
+        child_connection.close()
+        self.pending = deque()  # files sent to the worker, the first one is being hashed
+        self.started = None  # when the worker started on its first pending file
+
+    def send(self, filepath):
+        if not self.pending:
+            self.started = time.monotonic()
+        self.connection.send(filepath)
+        self.pending.append(filepath)
+
+
+class HashWorkerPool:
+    """
+    Pool of worker processes that compute file metadata.
+
+    Each worker gets a few files queued ahead, so it never waits for a round trip to the
+    parent, and answers file by file. Every file gets a deadline counted from when its worker
+    started on it. A worker that does not answer in time (e.g. blocked on a stale NFS handle or
+    a failing disk) is killed, the file is reported as timed out and the files queued behind it
+    go to a new worker. A thread blocked in such a read can never be stopped, a process can, so
+    a handful of bad files no longer stalls the scan or the final batch flush.
+    """
+
+    def __init__(self, file_timeout=30.0, max_workers=4, prefetch=8, mp_context=None, hash_options=None):
+        """
+        Args:
+            file_timeout (float): Seconds a single file may take before its worker is replaced.
+            max_workers (int): Maximum number of worker processes, started on demand.
+            prefetch (int): Files queued per worker.
+            mp_context: The multiprocessing context, see default_context.
+            hash_options (dict): Keyword arguments of the FileOperations of the workers (hash mode).
+        """
+        self.file_timeout = file_timeout
+        self.hash_options = hash_options
+        self.max_workers = max_workers
+        self.prefetch = prefetch
+        self._context = mp_context or default_context()
+        self._workers = []
+        self._abandoned = []
+
+    @property
+    def in_flight(self):
+        return sum(len(worker.pending) for worker in self._workers)
+
+    def submit(self, filepath):
+        """
+        Queues a file at the least busy worker, starting a new worker if all queues are full.
+
+        Returns:
+            bool: False if the queues of all max_workers workers are full.
+        """
+        worker = min(self._workers, key=lambda worker: len(worker.pending), default=None)
+        if worker is None or len(worker.pending) >= self.prefetch:
+            if len(self._workers) >= self.max_workers:
+                return False
+            worker = _Worker(self._context, self.hash_options)
+            self._workers.append(worker)
+
+        worker.send(filepath)
+        return True
+
+    def results(self, timeout=1.0):
+        """
+        Waits until at least one file is done, a deadline passes or the timeout expires.
+
+        Returns:
+            list: HashResult for every finished, failed or timed out file.
+        """
+        busy = [worker for worker in self._workers if worker.pending]
+        if not busy:
+            return []
+
+        now = time.monotonic()
+        next_deadline = min(worker.started + self.file_timeout for worker in busy)
+        by_connection = {worker.connection: worker for worker in busy}
+        ready = wait(list(by_connection), timeout=max(0.0, min(timeout, next_deadline - now)))
+
+        results = []
+        for connection in ready:
+            worker = by_connection[connection]
+            try:
+                # Collect every answer that arrived, the worker keeps going on its queue meanwhile
+                while worker.pending and connection.poll():
+                    results.append(HashResult(*connection.recv()))
+                    worker.pending.popleft()
+                    worker.started = time.monotonic()
+            except (EOFError, OSError):
+                HASH_WORKERS_REPLACED.inc()
+                logging.error("Hash worker died while hashing %s, replacing it.", worker.pending[0])
+                results.append(HashResult(worker.pending[0], None, HASH_CRASHED, "worker process died",
+                                          time.monotonic() - worker.started))
+                self._replace(worker)
+
+        now = time.monotonic()
+        for worker in busy:
+            if worker not in self._workers or not worker.pending:
+                continue
+            if now - worker.started >= self.file_timeout:
+                HASH_TIMEOUTS.inc()
+                HASH_WORKERS_REPLACED.inc()
+                logging.error("Hashing %s exceeded %.1fs, replacing its worker.", worker.pending[0], self.file_timeout)
+                results.append(HashResult(worker.pending[0], None, HASH_TIMEOUT,
+                                          f"no result within {self.file_timeout}s", now - worker.started))
+                self._replace(worker)
+        return results
+
+    def _replace(self, worker):
+        """
+        Kills a worker without waiting for it (a process stuck in uninterruptible I/O only exits
+        once the I/O returns, it is reaped when the pool is closed) and hands the files queued
+        behind its current file to a new worker.
+        """
+        self._workers.remove(worker)
+        worker.process.kill()
+        worker.connection.close()
+        self._abandoned.append(worker.process)
+
+        queued = list(worker.pending)[1:]
+        if queued:
+            replacement = _Worker(self._context, self.hash_options)
+            self._workers.append(replacement)
+            for filepath in queued:
+                replacement.send(filepath)
+
+    def close(self):
+        """
+        Stops idle workers, kills busy ones and reaps the processes that already exited.
+        """
+        for worker in self._workers:
+            try:
+                if not worker.pending:
+                    worker.connection.send(None)
+                else:
+                    worker.process.kill()
+            except OSError:
+                worker.process.kill()
+        for worker in self._workers:
+            worker.process.join(timeout=1.0)
+            if worker.process.is_alive():
+                worker.process.kill()
+                self._abandoned.append(worker.process)
+            worker.connection.close()
+        self._workers = []
+
+        still_running = [process for process in self._abandoned if process.join(timeout=0.1) or process.is_alive()]
+        if still_running:
+            logging.warning("%s hash workers are still blocked in I/O and could not be reaped.", len(still_running))
+        self._abandoned = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,85 @@
+import logging
+from src.core.hamming_index import MultiIndexHash
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Width and height of the difference hash grid, 8 gives a 64 bit fingerprint
+HASH_SIZE = 8
+
+
+def pillow_available():
+    """
+    True if Pillow can be imported. It is an optional dependency, only needed for near duplicate images.
+    """
+    try:
+        import PIL.Image  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def dhash(filepath, hash_size=HASH_SIZE):
+    """
+    Computes the difference hash of an image: the image is reduced to a grey (hash_size + 1) x
+    hash_size grid and every bit tells whether a cell is brighter than its right neighbour.
+    Re-encoding, resizing and small colour or brightness changes keep the gradients and so
+    almost all bits, unlike the bytes of the file.
+
+    Module level, so it can run in a worker process.
+
+    Args:
+        filepath (str): The image file.
+        hash_size (int): Height of the grid, the fingerprint has hash_size * hash_size bits.
+
+    Returns:
+        tuple: (filepath, fingerprint as int)
+    """
+    from PIL import Image
+
+    with Image.open(filepath) as image:
+        image.draft("L", (4 * (hash_size + 1), 4 * hash_size))  # JPEG: decode at a reduced scale
+        pixels = list(image.convert("L").resize((hash_size + 1, hash_size), Image.LANCZOS).getdata())
+
+    fingerprint = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for column in range(hash_size):
+            fingerprint = (fingerprint << 1) | (pixels[offset + column] > pixels[offset + column + 1])
+    return filepath, fingerprint
+
+
+def cluster_fingerprints(fingerprints, max_distance):
+    """
+    Clusters images whose fingerprints are within max_distance bits of each other, transitively:
+    a multi-index hash answers one radius search per image, and a union-find joins the matches,
+    so the images are not compared pairwise.
+
+    Args:
+        fingerprints (dict): The fingerprint per key, e.g. per content hash.
+        max_distance (int): Largest Hamming distance of two near duplicates.
+
+    Returns:
+        list: The clusters of two or more keys, each a list of keys.
+    """
+    index = MultiIndexHash(bits=HASH_SIZE * HASH_SIZE)
+    parents = {key: key for key in fingerprints}
+
+    def find(key):
+        while parents[key] != key:
+            parents[key] = parents[parents[key]]  # path halving
+            key = parents[key]
+        return key
+
+    # The distance is symmetric: searching among the fingerprints added before finds every pair once
+    for key, fingerprint in fingerprints.items():
+        root = find(key)
+        for _, other in index.search(fingerprint, max_distance):
+            other_root = find(other)
+            if other_root != root:
+                parents[other_root] = root
+        index.add(fingerprint, key)
+
+    clusters = {}
+    for key in fingerprints:
+        clusters.setdefault(find(key), []).append(key)
+    return [keys for keys in clusters.values() if len(keys) > 1]
@@ -0,0 +1,184 @@
+import logging
+import os
+import threading
+import time
+from src.config.ConfigModel import WatchConfig
+from src.core.hash_workers import HashWorkerPool
+from src.core.metrics import WATCH_EVENTS, QUEUE_DEPTH
+from src.core.processor import Processor
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class EventCoalescer:
+    """
+    Collects the file system events of the observer thread until the indexer takes them.
+
+    Any number of events for a path collapse into one entry, the indexer looks at the file
+    as it is then. A path is ready once it had no events for the debounce time, so a file
+    that is still being written is hashed once when it is done, or at the latest after the
+    maximum delay, so a file that is written continuously is still picked up. Moves are kept
+    in order and handed out right away, they only rename entries.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._files = {}  # path -> (time of the first event, time of the last event)
+        self._directories = {}
+        self._moves = []  # (source, destination) in event order
+
+    def __len__(self):
+        with self._lock:
+            return len(self._files) + len(self._directories) + len(self._moves)
+
+    def touch_file(self, path):
+        self._touch(self._files, path)
+
+    def touch_directory(self, path):
+        self._touch(self._directories, path)
+
+    def _touch(self, pending, path):
+        now = time.monotonic()
+        with self._lock:
+            first, _ = pending.get(path, (now, now))
+            pending[path] = (first, now)
+
+    def add_move(self, source, destination):
+        with self._lock:
+            self._moves.append((source, destination))
+
+    def pop_ready(self, debounce_seconds, max_delay_seconds, limit=None):
+        """
+        Takes the moves and the paths that are ready.
+
+        Args:
+            debounce_seconds (float): Time without events after which a path is ready.
+            max_delay_seconds (float): Time after its first event after which a path is ready anyway.
+            limit (int): Maximum number of files to take, the rest stays for the next call.
+
+        Returns:
+            tuple: (moves, directories, files)
+        """
+        now = time.monotonic()
+        with self._lock:
+            moves, self._moves = self._moves, []
+            directories = self._pop(self._directories, now, debounce_seconds, max_delay_seconds)
+            files = self._pop(self._files, now, debounce_seconds, max_delay_seconds, limit)
+        return moves, directories, files
+
+    @staticmethod
+    def _pop(pending, now, debounce_seconds, max_delay_seconds, limit=None):
+        ready = [path for path, (first, last) in pending.items()
+                 if now - last >= debounce_seconds or now - first >= max_delay_seconds]
+        ready = ready[:limit] if limit else ready
+        for path in ready:
+            del pending[path]
+        return ready
+
+
+class ContinuousIndexer:
+    """
+    Keeps the index of one or more source directories up to date from file system events.
+
+    A watchdog observer reports created, modified, moved and deleted files under the roots.
+    The events are coalesced per path and debounced, then the changed files go through the
+    same hashing and batch writes as a scan in small rounds, and only the duplicate groups
+    of the affected hashes are rebuilt. Hot directories stay fresh without full rescans.
+
+    The class implements the watchdog event handler interface (dispatch) itself, like the
+    configuration watcher, so watchdog is only imported when the indexer runs.
+    """
+
+    def __init__(self, processor: Processor, roots, config: WatchConfig = None, ignored=()):
+        """
+        Args:
+            processor (Processor): Processor of the index to update.
+            roots (list): The directories to watch, as passed to scans, so paths match their entries.
+            config (WatchConfig): Debouncing and batching, the defaults if not set.
+            ignored (list): Paths whose events are ignored, e.g. the index database and its journals.
+        """
+        self.processor = processor
+        self.roots = list(roots)
+        processor.add_source_roots(self.roots)
+        self.config = config or WatchConfig()
+        self.coalescer = EventCoalescer()
+        self._ignored = tuple(os.path.abspath(path) for path in ignored)
+        self._observer = None
+
+    def dispatch(self, event):
+        """
+        Entry point called by the watchdog observer thread for every event below the roots.
+        """
+        if event.event_type not in ('created', 'modified', 'closed', 'deleted', 'moved'):
+            return  # opened, closed_no_write: nothing changed
+        if self._ignored and os.path.abspath(event.src_path).startswith(self._ignored):
+            return
+        WATCH_EVENTS.inc(event=event.event_type)
+
+        touch = self.coalescer.touch_directory if event.is_directory else self.coalescer.touch_file
+        if event.event_type == 'moved':
+            self.coalescer.add_move(event.src_path, event.dest_path)
+            # Verified once it settled, e.g. a file renamed into place while still being written
+            touch(event.dest_path)
+        elif not (event.is_directory and event.event_type == 'modified'):
+            # The modification of a directory is one of its entries, which has its own event
+            touch(event.src_path)
+
+    def start(self):
+        """
+        Starts watching the roots.
+        """
+        from watchdog.observers import Observer
+
+        self._observer = Observer()
+        self._observer.daemon = True
+        for root in self.roots:
+            self._observer.schedule(self, path=root, recursive=True)
+        self._observer.start()
+        logging.info("Watching %s for changes.", ", ".join(self.roots))
+
+    def stop(self):
+        if self._observer:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+
+    def process_ready(self, pool: HashWorkerPool = None):
+        """
+        Applies the changes whose paths are ready to the index.
+
+        Returns:
+            int: The number of files whose entries changed.
+        """
+        moves, directories, files = self.coalescer.pop_ready(
+            self.config.debounce_seconds, self.config.max_delay_seconds, self.config.batch_size)
+        QUEUE_DEPTH.set(len(self.coalescer), queue="watch")
+        if not (moves or directories or files):
+            return 0
+
+        changed = self.processor.update_index(files, moves, directories, pool=pool)
+        if changed:
+            logging.info("Updated %s index entries.", changed)
+        return changed
+
+    def run(self, stop_event: threading.Event = None):
+        """
+        Watches the roots and updates the index until the stop event is set or the process is interrupted.
+
+        With initial_scan, the files that changed since the index was built are indexed first.
+        The observer already runs meanwhile, so nothing that happens during the scan is missed.
+        """
+        stop_event = stop_event or threading.Event()
+        interval = max(0.1, min(1.0, self.config.debounce_seconds / 2))
+
+        self.start()
+        try:
+            # Workers stay up between rounds, a round of a few files does not pay for their start
+            with self.processor.create_hash_pool() as pool:
+                if self.config.initial_scan:
+                    self.processor.update_index(directories=self.roots, pool=pool)
+
+                while not stop_event.wait(interval):
+                    self.process_ready(pool)
+        finally:
+            self.stop()
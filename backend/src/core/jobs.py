@@ -0,0 +1,187 @@
+import logging
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, CancelledError
+from src.core.progress import Progress, JobCancelled
+from src.core.metrics import METRICS
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+JOB_KINDS = ("scan", "dedupe", "move")
+
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"
+FINISHED_STATUSES = (STATUS_COMPLETED, STATUS_FAILED, STATUS_CANCELLED)
+
+
+def _run_job(kind, params, state, cancel_event, config=None):
+    """
+    Runs one processing stage in a worker process. Module level so it can be pickled.
+    The Processor is created inside the worker, it owns its own database connection.
+    """
+    # Imported here, the parent process only needs the job bookkeeping.
+    from src.core.processor import Processor
+    from src.core.cache import SummaryCache
+
+    state['status'] = STATUS_RUNNING
+    state['started_at'] = time.time()
+
+    # Worker processes are reused, every job starts with fresh metrics
+    METRICS.reset()
+    try:
+        progress = Progress(kind, state=state, cancel_event=cancel_event, show_bar=False)
+        progress.check_cancelled()
+
+        processor = Processor(cache=SummaryCache(), config=config)
+        if kind == "scan":
+            processor.add_files(params['source'], progress=progress, resume=params.get('resume', False))
+        elif kind == "dedupe":
+            processor.add_duplicates(progress=progress)
+        elif kind == "move":
+            processor.move_duplicates(params['destination'], progress=progress)
+        else:
+            raise ValueError(f"Unknown job kind '{kind}'")
+    finally:
+        state['metrics'] = METRICS.summary()
+        # Raw values, merged into the metrics of the API process when the job is done
+        state['metrics_export'] = METRICS.export()
+
+
+class JobManager:
+    """
+    Singleton that runs processing stages as background jobs in a pool of worker processes,
+    so long running scans never block the API event loop.
+
+    Job state lives in a multiprocessing.Manager dict per job. Workers publish their progress
+    into it and the API reads it from there. Jobs beyond the configured limit wait in the
+    pool queue with status 'pending'.
+    """
+    _instance = None
+    _initialized = False
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super(JobManager, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self, max_concurrent_jobs=2):
+        if self._initialized:
+            return
+
+        # spawn instead of fork: the API process runs threads (uvicorn, watchdog) that must not be forked.
+        context = multiprocessing.get_context("spawn")
+        self._manager = context.Manager()
+        self._executor = ProcessPoolExecutor(max_workers=max_concurrent_jobs, mp_context=context)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self._initialized = True
+        logging.info("Job manager started with up to %s concurrent jobs.", max_concurrent_jobs)
+
+    def submit(self, kind, params=None, config=None):
+        """
+        Queues a processing stage as a job.
+
+        Args:
+            kind (str): One of JOB_KINDS.
+            params (dict): Arguments of the stage, e.g. 'source' or 'destination'.
+            config (AppConfig): Configuration snapshot the stage runs with, not part of the job state.
+
+        Returns:
+            str: The id of the new job.
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind '{kind}'")
+
+        job_id = uuid.uuid4().hex
+        state = self._manager.dict({
+            'id': job_id,
+            'kind': kind,
+            'params': dict(params or {}),
+            'status': STATUS_PENDING,
+            'created_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'progress': None,
+            'error': None,
+            'metrics': None,
+        })
+        cancel_event = self._manager.Event()
+
+        future = self._executor.submit(_run_job, kind, dict(params or {}), state, cancel_event, config)
+        with self._lock:
+            self._jobs[job_id] = (state, cancel_event, future)
+        future.add_done_callback(lambda f: self._on_job_done(state, f))
+
+        logging.info("Job %s (%s) submitted.", job_id, kind)
+        return job_id
+
+    @staticmethod
+    def _on_job_done(state, future):
+        try:
+            future.result()
+            state['status'] = STATUS_COMPLETED
+        except (JobCancelled, CancelledError):
+            state['status'] = STATUS_CANCELLED
+        except Exception as e:
+            state['status'] = STATUS_FAILED
+            state['error'] = str(e)
+            logging.error("Job %s failed: %s", state['id'], e)
+        state['finished_at'] = time.time()
+        METRICS.merge(state.pop('metrics_export', None) or {})
+
+    def get(self, job_id):
+        """
+        Returns a snapshot of the job state, or None if the job is unknown.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return dict(job[0]) if job else None
+
+    def list(self):
+        """
+        Returns snapshots of all jobs, most recent first.
+        """
+        with self._lock:
+            states = [state for state, _, _ in self._jobs.values()]
+        return sorted((dict(state) for state in states), key=lambda job: job['created_at'], reverse=True)
+
+    def cancel(self, job_id):
+        """
+        Cancels a job. A pending job is removed from the queue, a running job stops
+        at its next progress update and keeps the work committed so far.
+
+        Returns:
+            bool: False if the job is unknown or already finished.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return False
+
+        state, cancel_event, future = job
+        if state['status'] in FINISHED_STATUSES:
+            return False
+
+        cancel_event.set()
+        future.cancel()
+        logging.info("Job %s cancellation requested.", job_id)
+        return True
+
+    def shutdown(self):
+        """
+        Cancels all jobs and stops the worker processes.
+        """
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for _, cancel_event, _ in jobs:
+            cancel_event.set()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._manager.shutdown()
+        JobManager._instance = None
+        self._initialized = False
@@ -0,0 +1,107 @@
+import hashlib
+import os
+
+
+def compute_directory_hashes(files):
+    """
+    Computes a Merkle hash for every directory containing the given files, bottom-up: the hash
+    of a directory covers the names and content hashes of its files and the names and hashes
+    of its subdirectories, so two directories have the same hash exactly when their subtrees
+    hold the same names with the same content.
+
+    Args:
+        files (iterable): Tuples (path, hash, size, creation_time) of the indexed files.
+
+    Returns:
+        dict: Per directory path a tuple (hash, file_count, size, creation_time) where
+        file_count and size cover the whole subtree and creation_time is the oldest one in it.
+    """
+    entries = {}  # directory -> [(name, kind, hash)]
+    totals = {}  # directory -> [file_count, size, creation_time]
+    for path, file_hash, size, creation_time in files:
+        directory, name = os.path.split(path)
+        entries.setdefault(directory, []).append((name, "f", file_hash))
+        _add_totals(totals, directory, 1, size or 0, creation_time)
+
+    # Directories without files of their own still get a hash from their subdirectories
+    for directory in list(entries):
+        parent = os.path.dirname(directory)
+        while parent != directory and parent not in entries:
+            entries[parent] = []
+            directory, parent = parent, os.path.dirname(parent)
+
+    hashes = {}
+    # Deepest first, so every subdirectory is done before its parent
+    for directory in sorted(entries, key=lambda path: path.count(os.sep), reverse=True):
+        digest = hashlib.sha256()
+        for name, kind, child_hash in sorted(entries[directory]):
+            digest.update(b"%s\0%s\0%s\n" % (kind.encode(), os.fsencode(name), child_hash.encode()))
+        directory_hash = digest.hexdigest()
+
+        file_count, size, creation_time = totals.get(directory, (0, 0, None))
+        hashes[directory] = (directory_hash, file_count, size, creation_time)
+
+        parent = os.path.dirname(directory)
+        if parent != directory and parent in entries:
+            entries[parent].append((os.path.basename(directory), "d", directory_hash))
+            _add_totals(totals, parent, file_count, size, creation_time)
+    return hashes
+
+
+def _add_totals(totals, directory, file_count, size, creation_time):
+    current = totals.get(directory)
+    if current is None:
+        totals[directory] = [file_count, size, creation_time]
+        return
+    current[0] += file_count
+    current[1] += size
+    if creation_time is not None and (current[2] is None or creation_time < current[2]):
+        current[2] = creation_time
+
+
+def find_duplicate_directories(directory_hashes):
+    """
+    Groups the directories with identical subtrees. Only maximal subtrees are reported: the
+    largest groups are formed first, and a directory inside a duplicate of an earlier group
+    is left out of later ones, it goes along with its ancestor. The oldest directory of a
+    group is its original, like for files.
+
+    Args:
+        directory_hashes (dict): As returned by compute_directory_hashes.
+
+    Returns:
+        list: Tuples (hash, original_path, duplicate_paths, file_count, size).
+    """
+    by_hash = {}
+    for directory, (directory_hash, file_count, _, _) in directory_hashes.items():
+        if file_count:
+            by_hash.setdefault(directory_hash, []).append(directory)
+
+    candidates = [(directory_hash, directories) for directory_hash, directories in by_hash.items()
+                  if len(directories) > 1]
+    # An ancestor has at least as many files as its descendants and lies less deep
+    candidates.sort(key=lambda candidate: (-directory_hashes[candidate[1][0]][1],
+                                           min(directory.count(os.sep) for directory in candidate[1])))
+
+    covered = set()
+    groups = []
+    for directory_hash, directories in candidates:
+        directories = [directory for directory in directories if not _is_covered(directory, covered)]
+        if len(directories) < 2:
+            continue
+
+        directories.sort(key=lambda directory: (directory_hashes[directory][3] or "", directory))
+        _, file_count, size, _ = directory_hashes[directories[0]]
+        groups.append((directory_hash, directories[0], directories[1:], file_count, size))
+        covered.update(directories[1:])
+    return groups
+
+
+def _is_covered(directory, covered):
+    while True:
+        if directory in covered:
+            return True
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return False
+        directory = parent
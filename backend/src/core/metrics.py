@@ -0,0 +1,246 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+
+class _Metric:
+    """Base class of the metric types. Values are kept per label set and guarded by a lock."""
+
+    type_name = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Metric {self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _format_labels(self, key, extra=None):
+        pairs = list(zip(self.labelnames, key)) + list(extra or [])
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+    def _summary_key(self, key):
+        return ",".join(f"{name}={value}" for name, value in zip(self.labelnames, key)) or "total"
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        with self._lock:
+            return [f"{self.name}{self._format_labels(key)} {value}" for key, value in self._values.items()]
+
+    def export(self):
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    def merge(self, exported):
+        with self._lock:
+            for key, value in exported:
+                key = tuple(key)
+                self._values[key] = self._values.get(key, 0) + value
+
+    def summary(self):
+        with self._lock:
+            return {self._summary_key(key): value for key, value in self._values.items()}
+
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def merge(self, exported):
+        # A gauge describes the state of the process that set it, there is nothing to add up.
+        pass
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    DEFAULT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total, count = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0, 0))
+            counts[index] += 1
+            self._values[key] = (counts, total + value, count + 1)
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the enclosed block in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for key, (counts, total, count) in self._values.items():
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{self.name}_bucket{self._format_labels(key, [('le', bound)])} {cumulative}")
+                lines.append(f"{self.name}_bucket{self._format_labels(key, [('le', '+Inf')])} {count}")
+                lines.append(f"{self.name}_sum{self._format_labels(key)} {total}")
+                lines.append(f"{self.name}_count{self._format_labels(key)} {count}")
+        return lines
+
+    def export(self):
+        with self._lock:
+            return [[list(key), list(counts), total, count] for key, (counts, total, count) in self._values.items()]
+
+    def merge(self, exported):
+        with self._lock:
+            for key, counts, total, count in exported:
+                key = tuple(key)
+                own_counts, own_total, own_count = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0, 0))
+                self._values[key] = ([a + b for a, b in zip(own_counts, counts)], own_total + total, own_count + count)
+
+    def _quantile(self, counts, count, q):
+        """Upper bound of the bucket holding the q-quantile."""
+        rank = q * count
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                return bound
+        return float("inf")
+
+    def summary(self):
+        with self._lock:
+            return {
+                self._summary_key(key): {
+                    'count': count,
+                    'sum': round(total, 6),
+                    'mean': round(total / count, 6) if count else None,
+                    'p50_le': self._quantile(counts, count, 0.5),
+                    'p95_le': self._quantile(counts, count, 0.95),
+                }
+                for key, (counts, total, count) in self._values.items()
+            }
+
+
+class MetricsRegistry:
+    """
+    Process wide collection of counters, gauges and histograms.
+    Renders the Prometheus text exposition format and a JSON friendly summary.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=Histogram.DEFAULT_BUCKETS):
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def render_prometheus(self):
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        return {name: metric.summary() for name, metric in self._metrics.items() if metric.summary()}
+
+    def export(self):
+        """Raw values of all metrics as JSON serializable lists, to be merged into the registry of another process."""
+        return {name: metric.export() for name, metric in self._metrics.items()}
+
+    def merge(self, exported):
+        for name, values in exported.items():
+            metric = self._metrics.get(name)
+            if metric is not None:
+                metric.merge(values)
+
+    def reset(self):
+        for metric in self._metrics.values():
+            metric.reset()
+
+
+def size_bucket(size):
+    """Label for the size class of a file, used to split latencies by file size."""
+    for limit, label in ((4 << 10, "lt_4KiB"), (64 << 10, "lt_64KiB"), (1 << 20, "lt_1MiB"),
+                         (16 << 20, "lt_16MiB"), (256 << 20, "lt_256MiB")):
+        if size < limit:
+            return label
+    return "ge_256MiB"
+
+
+METRICS = MetricsRegistry()
+
+FILES_WALKED = METRICS.counter("matr_files_walked_total", "Files found while walking the source tree.")
+DIRECTORIES_WALKED = METRICS.counter("matr_directories_walked_total", "Directories visited while walking.")
+ENTRIES_EXCLUDED = METRICS.counter("matr_walk_excluded_total", "Files and directories skipped by the rules while walking.",
+                                  labelnames=("kind",))
+FILES_HASHED = METRICS.counter("matr_files_hashed_total", "Files whose content hash was computed.")
+BYTES_HASHED = METRICS.counter("matr_bytes_hashed_total", "Bytes read to compute content hashes.")
+BYTES_CHUNKED = METRICS.counter("matr_bytes_chunked_total", "Bytes split into content-defined chunks.")
+HASH_CACHE_LOOKUPS = METRICS.counter("matr_hash_cache_lookups_total", "Files looked up in the shared hash cache.",
+                                    labelnames=("result",))
+PREFILTER_LOOKUPS = METRICS.counter("matr_prefilter_lookups_total", "Paths looked up in the Bloom filter of the index.",
+                                   labelnames=("result",))
+HASH_ERRORS = METRICS.counter("matr_hash_errors_total", "Files that could not be hashed.")
+HASH_TIMEOUTS = METRICS.counter("matr_hash_timeouts_total", "Files whose hashing exceeded the per file deadline.")
+HASH_WORKERS_REPLACED = METRICS.counter("matr_hash_workers_replaced_total",
+                                        "Hash worker processes killed or lost and replaced.")
+HASH_SECONDS = METRICS.histogram("matr_hash_duration_seconds", "Time to stat and hash one file.",
+                                 labelnames=("size_bucket",))
+DB_BATCH_SECONDS = METRICS.histogram("matr_db_batch_insert_duration_seconds",
+                                     "Time to write one batch of rows into the index.", labelnames=("table",))
+DB_ROWS_WRITTEN = METRICS.counter("matr_db_rows_written_total", "Rows written into the index.", labelnames=("table",))
+FILES_MOVED = METRICS.counter("matr_files_moved_total", "Duplicate files moved to the destination.")
+BYTES_MOVED = METRICS.counter("matr_bytes_moved_total", "Bytes of duplicate files moved to the destination.")
+MOVE_SECONDS = METRICS.histogram("matr_move_duration_seconds", "Time to move one duplicate file.")
+QUEUE_DEPTH = METRICS.gauge("matr_queue_depth", "Items waiting between two stages.", labelnames=("queue",))
+AUTOTUNE_VALUE = METRICS.gauge("matr_autotune_value", "Current value of a tuned scan setting.", labelnames=("knob",))
+WORK_UNITS = METRICS.counter("matr_work_units_total", "Work units of distributed scans by outcome.",
+                            labelnames=("status",))
+WATCH_EVENTS = METRICS.counter("matr_watch_events_total", "File system events received by the indexer.",
+                               labelnames=("event",))
+STAGE_SECONDS = METRICS.histogram("matr_stage_duration_seconds", "Duration of a processing stage.",
+                                  labelnames=("stage",),
+                                  buckets=(1, 10, 60, 300, 900, 1800, 3600, 7200, 14400, 28800, 86400))
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import logging
+import math
+import os
+import struct
+import tempfile
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+MAGIC = b"MATRBLOM"
+VERSION = 1
+
+# Magic, version, length of the JSON metadata that follows, then the bits of every filter
+_HEADER = struct.Struct("<8sHI")
+
+
+class BloomFilter:
+    """
+    Set membership in a fixed bit array: "no" is certain, "yes" is wrong with the configured
+    probability. An item sets k bits derived from one 128 bit BLAKE2b digest by double hashing.
+    """
+
+    def __init__(self, capacity, error_rate=0.01, bits=None, count=0):
+        """
+        Args:
+            capacity (int): Items the filter holds at the given false positive rate.
+            error_rate (float): False positive rate at capacity.
+            bits (bytearray): The bit array of a saved filter, a new empty one if None.
+            count (int): Items added to the saved filter.
+        """
+        self.capacity = max(int(capacity), 1)
+        self.error_rate = error_rate
+        self.size = max(int(math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)), 8)
+        self.hashes = max(int(round(self.size / self.capacity * math.log(2))), 1)
+        self.bits = bits if bits is not None else bytearray((self.size + 7) // 8)
+        self.count = count
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item, digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return [(first + index * second) % self.size for index in range(self.hashes)]
+
+    def add(self, item: bytes):
+        bits = self.bits
+        for position in self._positions(item):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: bytes):
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    @property
+    def saturated(self):
+        """True once more items were added than the filter was sized for, its error rate rises from there."""
+        return self.count > self.capacity
+
+    def describe(self):
+        return {'capacity': self.capacity, 'error_rate': self.error_rate, 'count': self.count}
+
+
+class IndexPrefilter:
+    """
+    Bloom filters of the paths and of the content hashes in the index, kept in a file next to
+    the database so a scan does not load every path of the index to find the new files. A
+    lookup that says "no" needs no database access, one that says "yes" is confirmed with a
+    point query on the path index.
+
+    The file records up to which file ID and which change ID (see the file_changes table) the
+    filters are complete. On refresh they catch up with the files inserted, moved or modified
+    since, by whatever process. If the changes they would need were already trimmed by another
+    process, or if the filters are over capacity, they are rebuilt from the index.
+    """
+
+    def __init__(self, db_operations, path, capacity=1000000, error_rate=0.01):
+        """
+        Args:
+            db_operations (DatabaseOperations): The index.
+            path (str): The filter file.
+            capacity (int): Minimum number of files the filters are sized for.
+            error_rate (float): False positive rate of a lookup.
+        """
+        self.db_operations = db_operations
+        self.path = path
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.paths = None
+        self.hashes = None
+        self.file_id = 0  # the filters hold every file up to this ID
+        self.change_id = 0  # ... and every change up to this ID
+
+    def may_contain_path(self, path):
+        return os.fsencode(path) in self.paths
+
+    def may_contain_hash(self, file_hash):
+        return file_hash.encode() in self.hashes
+
+    def _add(self, path, file_hash):
+        self.paths.add(os.fsencode(path))
+        if file_hash is not None:
+            self.hashes.add(file_hash.encode())
+
+    def refresh(self):
+        """
+        Loads or builds the filters and brings them up to date with the index.
+        """
+        if self.paths is None and not self._load():
+            self._rebuild(self.capacity)
+            return
+
+        lowest, highest = self.db_operations.get_file_change_bounds()
+        if (lowest if lowest is not None else (highest or 0) + 1) > self.change_id + 1:
+            logging.info("Changes the index prefilter has not seen were trimmed, rebuilding it.")
+            self._rebuild(max(self.capacity, self.paths.capacity))
+            return
+
+        for change_id, path, file_hash in self.db_operations.iter_file_changes_after(self.change_id):
+            self._add(path, file_hash)
+            self.change_id = change_id
+        for file_id, path, file_hash in self.db_operations.iter_files_after(self.file_id):
+            self._add(path, file_hash)
+            self.file_id = file_id
+
+        if self.paths.saturated:
+            self._rebuild(2 * self.paths.count)
+
+    def _rebuild(self, capacity):
+        self.paths = BloomFilter(capacity, self.error_rate)
+        self.hashes = BloomFilter(capacity, self.error_rate)
+        self.file_id = 0
+        # The rows read below already reflect all changes written so far
+        _, highest = self.db_operations.get_file_change_bounds()
+        self.change_id = highest or 0
+        for file_id, path, file_hash in self.db_operations.iter_files_after(0):
+            self._add(path, file_hash)
+            self.file_id = file_id
+        logging.info("Index prefilter built for %s files, %s KiB.", self.paths.count,
+                     (len(self.paths.bits) + len(self.hashes.bits)) // 1024)
+
+    def _load(self):
+        try:
+            with open(self.path, "rb") as file:
+                magic, version, length = _HEADER.unpack(file.read(_HEADER.size))
+                if magic != MAGIC or version != VERSION:
+                    raise ValueError("not an index prefilter of version %s" % VERSION)
+                metadata = json.loads(file.read(length))
+                filters = []
+                for description in (metadata['paths'], metadata['hashes']):
+                    bloom = BloomFilter(description['capacity'], description['error_rate'], count=description['count'])
+                    bits = file.read(len(bloom.bits))
+                    if len(bits) != len(bloom.bits):
+                        raise ValueError("truncated")
+                    bloom.bits = bytearray(bits)
+                    filters.append(bloom)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, KeyError, struct.error) as e:
+            logging.warning("Ignoring the index prefilter %s: %s", self.path, e)
+            return False
+
+        if filters[0].error_rate != self.error_rate or filters[0].capacity < self.capacity:
+            return False  # the configuration changed
+        self.paths, self.hashes = filters
+        self.file_id = metadata['file_id']
+        self.change_id = metadata['change_id']
+        return True
+
+    def save(self):
+        """
+        Writes the filters next to the database and trims the changes they hold from the index,
+        the caller commits. The file is replaced atomically.
+        """
+        metadata = json.dumps({'file_id': self.file_id, 'change_id': self.change_id,
+                               'paths': self.paths.describe(), 'hashes': self.hashes.describe()}).encode()
+        directory = os.path.dirname(os.path.abspath(self.path))
+        with tempfile.NamedTemporaryFile("wb", dir=directory, delete=False) as file:
+            try:
+                file.write(_HEADER.pack(MAGIC, VERSION, len(metadata)) + metadata)
+                file.write(self.paths.bits)
+                file.write(self.hashes.bits)
+            except BaseException:
+                file.close()
+                os.unlink(file.name)
+                raise
+        os.replace(file.name, self.path)
+        self.db_operations.trim_file_changes(self.change_id)
@@ -1,40 +1,350 @@
 import os
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import time
+import datetime
+import stat
+from typing import TYPE_CHECKING
 import shutil
+import socket
+import uuid
+import multiprocessing
+from collections import Counter, deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
 from tqdm import tqdm
 from database.operations.db_operations import DatabaseOperations
 from src.core.file_operations import FileOperations
 from src.common.Utilities import Utilities
+from src.core.progress import Progress
+from src.core.autotune import create_scan_tuners, available_cpus
+from src.core.hash_workers import (HashWorkerPool, HashResult, HASH_OK, HASH_TIMEOUT, HASH_CRASHED, HASH_CACHED,
+                                   default_context)
+from src.core.chunking import chunk_file
+from src.core.image_hash import dhash, cluster_fingerprints, pillow_available
+from src.core.hamming_index import hamming_distance
+from src.core.walker import walk_files, path_key, split_work_units, CommitWatermark
+from src.core.merkle import compute_directory_hashes, find_duplicate_directories
+from src.core.shards import export_shard
+from src.core.digest_index import write_digest_index
+from src.core.prefilter import IndexPrefilter
+from src.core.rules import RuleSet
+from src.config.ConfigModel import AppConfig, ScanConfig, DistributedConfig, ChunkingConfig, ImagesConfig
+from src.core.metrics import (HASH_ERRORS, HASH_CACHE_LOOKUPS, PREFILTER_LOOKUPS, BYTES_CHUNKED, DB_BATCH_SECONDS, DB_ROWS_WRITTEN, FILES_MOVED, BYTES_MOVED,
+                              MOVE_SECONDS, QUEUE_DEPTH, STAGE_SECONDS, AUTOTUNE_VALUE, WORK_UNITS)
+
+if TYPE_CHECKING:
+    # Only for the annotation, the cache is created by the caller and imports the redis client
+    from src.core.cache import SummaryCache
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 
+def _matches_entry(stat_result, entry):
+    """
+    True if size and modification time of a file equal those of its index entry, so its hash is still valid.
+    """
+    return (entry['size'] == stat_result.st_size and
+            entry['modification_time'] == datetime.datetime.fromtimestamp(stat_result.st_mtime).isoformat())
+
+
+def _map_in_processes(function, items, arguments, workers):
+    """
+    Runs function(*arguments(item)) for every item in a pool of worker processes, with a few
+    items per worker in flight instead of one future per item.
+
+    Yields:
+        tuple: (item, future) in the order of the items, the future is done.
+    """
+    items = iter(items)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=default_context()) as executor:
+        in_flight = deque()
+        while True:
+            while len(in_flight) < 4 * workers:
+                item = next(items, None)
+                if item is None:
+                    break
+                in_flight.append((item, executor.submit(function, *arguments(item))))
+            if not in_flight:
+                return
+            item, future = in_flight.popleft()
+            future.exception()  # waits
+            yield item, future
+
+
 class Processor:
     """Class processess all operations for fils and database"""
 
-    def __init__(self):
-        self.db_operations = DatabaseOperations()
-        self.file_operations = FileOperations()
+    def __init__(self, cache: "SummaryCache" = None, db_name="duplicates.db", config: AppConfig = None):
+        self.db_operations = DatabaseOperations(db_name)
+        self.cache = cache
+        self.config = config
+        self.file_operations = FileOperations(**self._hash_options())
+        self._hash_cache = None
+        self._prefilter = None
+        self._rules = None
+        self._roots = set()  # directories scanned or watched by this processor, see _source_roots
+        self._prefilter_path = f"{db_name}.bloom"
+        self._prefilter_saved = time.monotonic()
+
+    def _scan_config(self) -> ScanConfig:
+        return self.config.Scan if self.config and self.config.Scan else ScanConfig()
+
+    def _hash_options(self):
+        """
+        The hash mode of the scan configuration, as keyword arguments of FileOperations.
+        """
+        scan_config = self._scan_config()
+        return {'hash_mode': scan_config.hash_mode, 'hash_range_size': scan_config.hash_range_size,
+                'hash_range_threads': scan_config.hash_range_threads}
+
+    def _get_hash_cache(self):
+        """
+        Returns the shared hash cache if it is enabled in the configuration, otherwise None.
+        """
+        hash_cache_config = self.config.HashCache if self.config else None
+        if not hash_cache_config or not hash_cache_config.enabled:
+            return None
+        if self._hash_cache is None:
+            # Imports the Redis client only when the cache is used
+            from src.core.hash_cache import HashCache
+            self._hash_cache = HashCache(ttl=hash_cache_config.ttl_seconds, batch_size=hash_cache_config.batch_size,
+                                         algorithm=self.file_operations.hash_algorithm)
+        return self._hash_cache
+
+    def _get_rules(self) -> RuleSet:
+        """
+        Returns the rules of the configuration, compiled once, that decide which files are indexed.
+        """
+        if self._rules is None:
+            self._rules = RuleSet.from_config(self.config.Rules if self.config else None)
+        return self._rules
+
+    def add_source_roots(self, roots):
+        """
+        Registers directories whose files are indexed without a scan here, e.g. the roots of a
+        watcher, see _source_roots.
+        """
+        self._roots.update(os.path.normpath(root) for root in roots)
+
+    def _source_roots(self):
+        """
+        Returns the directories the index was scanned from, as passed and as absolute paths. The
+        rules apply below them only, a walk never prunes its root (see RuleSet.excludes_path).
+        """
+        roots = set(self._roots) | set(self.db_operations.get_scanned_sources())
+        if self.config and self.config.source:
+            roots.add(os.path.normpath(self.config.source))
+        return roots | {os.path.abspath(root) for root in roots}
+
+    def _get_prefilter(self):
+        """
+        Returns the prefilter of the index if it is enabled in the configuration, otherwise None.
+        """
+        prefilter_config = self.config.Prefilter if self.config else None
+        if not prefilter_config or not prefilter_config.enabled:
+            return None
+        if self._prefilter is None:
+            self._prefilter = IndexPrefilter(self.db_operations, self._prefilter_path,
+                                             capacity=prefilter_config.capacity,
+                                             error_rate=prefilter_config.error_rate)
+        return self._prefilter
+
+    def _existing_paths_lookup(self):
+        """
+        Returns a function that takes a list of paths and returns the set of those in the index.
 
-    def _get_all_filepaths(self, dataSourceDirectory):
+        With the prefilter, only the paths it may contain are looked up with point queries, new
+        files never reach the database. Without it, all paths of the index are loaded once.
+        """
+        prefilter = self._get_prefilter()
+        if prefilter is None:
+            existing_paths = self.db_operations.get_existing_paths()
+            return lambda paths: existing_paths.intersection(paths)
+
+        prefilter.refresh()
+
+        def lookup(paths):
+            candidates = [path for path in paths if prefilter.may_contain_path(path)]
+            found = self.db_operations.get_existing_paths_among(candidates) if candidates else set()
+            PREFILTER_LOOKUPS.inc(len(paths) - len(candidates), result="negative")
+            PREFILTER_LOOKUPS.inc(len(found), result="positive")
+            PREFILTER_LOOKUPS.inc(len(candidates) - len(found), result="false_positive")
+            return found
+        return lookup
+
+    def _save_prefilter(self, interval=0.0):
+        """
+        Brings the prefilter up to date with the files written here and saves it, if it was used
+        and the last save is more than interval seconds ago. The caller commits.
+        """
+        if self._prefilter is None or self._prefilter.paths is None:
+            return
+        if time.monotonic() - self._prefilter_saved < interval:
+            return
+        try:
+            self._prefilter.refresh()
+            self._prefilter.save()
+        except OSError as e:
+            # The next run catches up from the previous file or rebuilds it
+            logging.warning("Could not save the index prefilter %s: %s", self._prefilter_path, e)
+        self._prefilter_saved = time.monotonic()
+
+    def _iter_cached(self, filepaths, hash_cache, stats):
+        """
+        Looks the files up in the hash cache, a batch per round trip, before any of them is read.
+
+        Args:
+            filepaths (iterable): The files to hash.
+            hash_cache (HashCache): The shared hash cache.
+            stats (dict): Receives the stat of every file that has to be hashed, taken before it
+                is read, under which its hash is stored afterwards (see _store_hashes).
+
+        Yields:
+            tuple: (filepath, metadata) with the metadata built from the cached hash, or None if
+            the file has to be hashed.
+        """
+        filepaths = iter(filepaths)
+        while True:
+            chunk = list(islice(filepaths, hash_cache.batch_size))
+            if not chunk:
+                return
+            chunk_stats = {}
+            for filepath in chunk:
+                try:
+                    chunk_stats[filepath] = os.stat(filepath)
+                except OSError:
+                    pass  # reported by the worker that tries to hash it
+            cached = hash_cache.lookup(chunk_stats)
+            HASH_CACHE_LOOKUPS.inc(len(cached), result="hit")
+            HASH_CACHE_LOOKUPS.inc(len(chunk) - len(cached), result="miss")
+
+            for filepath in chunk:
+                if filepath in cached:
+                    yield filepath, self.file_operations.get_file_metadata(filepath, chunk_stats[filepath],
+                                                                           cached[filepath])
+                else:
+                    if filepath in chunk_stats:
+                        stats[filepath] = chunk_stats[filepath]
+                    yield filepath, None
+
+    @staticmethod
+    def _store_hashes(hash_cache, stats, hashed):
+        """
+        Stores the hashes computed by the workers in the hash cache, under the stat taken before the
+        file was read, and only if the worker saw the same size and modification time.
+        """
+        entries = []
+        for data in hashed:
+            stat_result = stats.pop(data['path'], None)
+            if stat_result is not None and _matches_entry(stat_result, data):
+                entries.append((data['path'], stat_result, data['hash']))
+        hash_cache.store(entries)
+
+    def _distributed_config(self) -> DistributedConfig:
+        return self.config.Distributed if self.config and self.config.Distributed else DistributedConfig()
+
+    def _chunking_config(self) -> ChunkingConfig:
+        return self.config.Chunking if self.config and self.config.Chunking else ChunkingConfig()
+
+    def _images_config(self) -> ImagesConfig:
+        return self.config.Images if self.config and self.config.Images else ImagesConfig()
+
+    def _commit_index_changes(self):
+        """
+        Commits the changes of a stage and invalidates cached summaries.
+        """
+        self.db_operations.commit()
+        if self.cache:
+            self.cache.bump_generation()
+
+    def _get_all_filepaths(self, dataSourceDirectory, resume_after=None):
         # Initialize the progress bar
         progress_bar = tqdm(desc="Walking through directories", unit="dir")
 
-        # Walk through the directory structure once and store all file paths
-        filepaths = []
-        for dirpath, _, filenames in os.walk(dataSourceDirectory):
-            for filename in filenames:
-                filepaths.append(os.path.join(dirpath, filename))
-            progress_bar.update(1)  # Update progress for each directory
+        # Walk through the directory structure once and store all file paths in walk order,
+        # skipping the part of the tree before resume_after
+        filepaths = list(walk_files(dataSourceDirectory, resume_after,
+                                    on_directory=lambda _: progress_bar.update(1), rules=self._get_rules()))
 
         progress_bar.close()
         return filepaths
 
-    def add_duplicates(self):
+    def _save_checkpoint(self, source, dataSourceDirectory, filepaths, watermark, checkpoint):
+        """
+        Records the last file of the processed prefix of filepaths as the resume position of the
+        source and commits it together with the files written so far. Only called when no hashed
+        file is waiting in a batch, so everything up to the position is in the index.
+        """
+        last = watermark.advance()
+        position = path_key(dataSourceDirectory, filepaths[last]) if last >= 0 else checkpoint['position']
+        self.db_operations.save_scan_checkpoint(source, position, checkpoint['files_done'] + last + 1,
+                                                completed=watermark.complete)
+        self.db_operations.commit()
+
+    def _write_batch(self, batch):
+        """
+        Writes a batch of file metadata into the index and records the write latency.
+
+        Returns:
+            float: The seconds the write took.
+        """
+        started = time.perf_counter()
+        self.db_operations.add_files(batch)
+        seconds = time.perf_counter() - started
+        DB_BATCH_SECONDS.observe(seconds, table="files")
+        DB_ROWS_WRITTEN.inc(len(batch), table="files")
+        return seconds
+
+    def add_duplicates(self, progress: Progress = None):
         """
         Goes through all files in the database, identifies duplicates, and processes them using in-memory calculations.
         """
+        with STAGE_SECONDS.time(stage="dedupe"):
+            self._add_duplicates(progress)
+        self.add_directory_duplicates()
+        if self._chunking_config().enabled:
+            self.add_chunks()
+        if self._images_config().enabled:
+            self.add_near_duplicates()
+
+    def add_directory_duplicates(self):
+        """
+        Computes the Merkle hash of every directory from the hashes of its files and subdirectories
+        and groups the directories with identical subtrees. A duplicate directory is one group
+        instead of one group per file: its files are taken out of the file level groups, and the
+        move handles it as a whole.
+
+        Returns:
+            int: The number of directory duplicate groups.
+        """
+        with STAGE_SECONDS.time(stage="directories"):
+            return self._add_directory_duplicates()
+
+    def _add_directory_duplicates(self):
+        directory_hashes = compute_directory_hashes(self.db_operations.iter_live_files())
+        groups = find_duplicate_directories(directory_hashes)
+        self.db_operations.save_directory_duplicates(directory_hashes, groups)
+
+        # Rebuild the file level groups of the affected hashes without the files of the duplicate directories
+        covered_ids, hashes = set(), set()
+        for _, _, duplicate_paths, _, _ in groups:
+            for duplicate_path in duplicate_paths:
+                for entry in self.db_operations.get_files_below(duplicate_path).values():
+                    covered_ids.add(entry['id'])
+                    hashes.add(entry['hash'])
+        if hashes:
+            self.db_operations.detach_duplicate_groups(hashes)
+            self.db_operations.attach_duplicate_groups(hashes, covered_ids)
+        self._commit_index_changes()
+
+        logging.info("Hashed %s directories, found %s directory duplicate groups covering %s files.",
+                     len(directory_hashes), len(groups), len(covered_ids))
+        return len(groups)
+
+    def _add_duplicates(self, progress: Progress = None):
+        # Groups whose original was deleted would overlap the groups built below
+        self.db_operations.regroup_deleted_originals()
+
         # Step 1: Retrieve all file entries and store them in memory.
         all_files = self.db_operations.fetch_all_files()
 
@@ -46,7 +356,8 @@ class Processor:
             files_by_hash[file_hash].append((file_id, creation_time))
 
         # Initialize the progress bar
-        progress_bar = tqdm(total=len(files_by_hash), desc="Processing duplicates", unit="hash")
+        progress = progress or Progress("Processing duplicates", unit="hash")
+        progress.set_total(len(files_by_hash))
 
         # Step 3: Process each group to determine the original and duplicate files.
         for file_hash, files in files_by_hash.items():
@@ -60,110 +371,866 @@ class Processor:
                 self.db_operations.process_duplicates(original_id, duplicate_ids)
 
             # Update the progress bar
-            progress_bar.update(1)
+            progress.update(1)
 
         # Finalize the progress bar
-        progress_bar.close()
+        progress.close()
+
+        # Rollups follow every group change incrementally, build them once for older indexes
+        self.db_operations.ensure_rollups()
+        self._commit_index_changes()
 
         print("Processed all files for duplicates in memory.")
 
-    def add_files(self, dataSourceDirectory):
+    def add_chunks(self, progress: Progress = None, batch_rows=50000):
+        """
+        Splits the large files of the index into content-defined chunks, for the files that share
+        part of their content (see get_similar_files). Only files whose current content was not
+        chunked yet are read, in worker processes, and their chunks are written in batches.
+
+        Args:
+            progress (Progress): Receives the number of files chunked.
+            batch_rows (int): Chunk rows written per transaction.
+
+        Returns:
+            int: The number of files chunked.
+        """
+        with STAGE_SECONDS.time(stage="chunk"):
+            return self._add_chunks(progress, batch_rows)
+
+    def _add_chunks(self, progress: Progress = None, batch_rows=50000):
+        chunking = self._chunking_config()
+        self.db_operations.remove_stale_chunks()
+        pending = self.db_operations.get_files_to_chunk(chunking.min_file_size)
+        if chunking.max_bytes is not None:
+            # Files are only chunked once, a capped run leaves the others to the next runs
+            total, count = 0, 0
+            for _, _, _, size in pending:
+                if total >= chunking.max_bytes:
+                    break
+                total += size
+                count += 1
+            if count < len(pending):
+                logging.info("Chunking %s of %s files, %s bytes, in this run (Chunking.max_bytes).", count,
+                             len(pending), total)
+            pending = pending[:count]
+
+        progress = progress or Progress("Chunking files", unit="file")
+        progress.set_total(len(pending))
+
+        batch, rows, chunked = [], 0, 0
+        try:
+            for (file_id, path, file_hash, size), future in _map_in_processes(
+                    chunk_file, pending, lambda file: (file[1], chunking.min_size, chunking.avg_size, chunking.max_size),
+                    chunking.workers or available_cpus()):
+                try:
+                    _, chunks, _ = future.result()
+                except OSError as e:
+                    logging.error("Error chunking file %s: %s", path, e)
+                    HASH_ERRORS.inc()
+                    progress.update(1)
+                    continue
+
+                batch.append((file_id, file_hash, chunks))
+                rows += len(chunks)
+                BYTES_CHUNKED.inc(sum(chunk_size for chunk_size, _ in chunks))
+                progress.update(1, bytes=size)
+                if rows >= batch_rows:
+                    chunked += self._write_chunk_batch(batch)
+                    batch, rows = [], 0
+            if batch:
+                chunked += self._write_chunk_batch(batch)
+        finally:
+            progress.close()
+            self._commit_index_changes()
+
+        summary = self.db_operations.get_chunk_summary()
+        logging.info("Chunked %s files. %s chunked files hold %s bytes in %s bytes of distinct chunks.",
+                     chunked, summary['files'], summary['bytes'], summary['unique_bytes'])
+        return chunked
+
+    def _write_chunk_batch(self, batch):
+        started = time.perf_counter()
+        rows = self.db_operations.save_file_chunks(batch)
+        self.db_operations.commit()
+        DB_BATCH_SECONDS.observe(time.perf_counter() - started, table="file_chunks")
+        DB_ROWS_WRITTEN.inc(rows, table="file_chunks")
+        return len(batch)
+
+    def add_near_duplicates(self, progress: Progress = None, batch_size=1000):
+        """
+        Finds images that look the same but differ in their bytes, e.g. re-encodings and resizes.
+        Every image content gets a perceptual fingerprint (difference hash), computed in worker
+        processes and only for contents that have none yet. Images whose fingerprints are within
+        the configured Hamming distance are clustered with a multi-index hash, and each cluster is stored
+        as a group like the exact duplicates. Exact copies stay in their file level groups: a
+        cluster holds one file per content, the largest being the original.
+
+        Requires Pillow, without it the stage is skipped.
+
+        Returns:
+            int: The number of near duplicate groups.
+        """
+        if not pillow_available():
+            logging.error("Near duplicate images require Pillow (pip install Pillow), skipping them.")
+            return 0
+        with STAGE_SECONDS.time(stage="images"):
+            return self._add_near_duplicates(progress, batch_size)
+
+    def _add_near_duplicates(self, progress: Progress = None, batch_size=1000):
+        images = self._images_config()
+        self.db_operations.remove_stale_image_fingerprints()
+        pending = self.db_operations.get_images_to_fingerprint([extension.lower() for extension in images.extensions])
+
+        progress = progress or Progress("Fingerprinting images", unit="file")
+        progress.set_total(len(pending))
+        batch = []
+        try:
+            for (file_hash, path), future in _map_in_processes(
+                    dhash, pending, lambda image: (image[1],), images.workers or available_cpus()):
+                try:
+                    _, fingerprint = future.result()
+                except Exception as e:  # decoder errors of Pillow have no common base class
+                    logging.error("Error fingerprinting image %s: %s", path, e)
+                    HASH_ERRORS.inc()
+                    fingerprint = None
+                batch.append((file_hash, fingerprint))
+                progress.update(1)
+                if len(batch) >= batch_size:
+                    self.db_operations.save_image_fingerprints(batch)
+                    self.db_operations.commit()
+                    batch = []
+            if batch:
+                self.db_operations.save_image_fingerprints(batch)
+        finally:
+            progress.close()
+            self.db_operations.commit()
+
+        # One file per content, the oldest one like the original of its exact duplicate group
+        files_by_hash = {}
+        for file_id, file_hash, size, creation_time, fingerprint in self.db_operations.get_image_fingerprints():
+            current = files_by_hash.get(file_hash)
+            if current is None or (creation_time or "", file_id) < (current[2] or "", current[0]):
+                files_by_hash[file_hash] = (file_id, size, creation_time, fingerprint)
+
+        fingerprints = {file_hash: file[3] for file_hash, file in files_by_hash.items()}
+        groups = []
+        for cluster in cluster_fingerprints(fingerprints, images.max_distance):
+            # The largest file keeps the most detail, the smaller ones are its resizes and re-encodings
+            cluster.sort(key=lambda file_hash: (-(files_by_hash[file_hash][1] or 0),
+                                                files_by_hash[file_hash][2] or "", files_by_hash[file_hash][0]))
+            original = files_by_hash[cluster[0]]
+            max_distance = max(hamming_distance(original[3], files_by_hash[file_hash][3]) for file_hash in cluster[1:])
+            groups.append((original[0], [files_by_hash[file_hash][0] for file_hash in cluster[1:]], max_distance))
+
+        self.db_operations.save_near_duplicate_groups(groups)
+        self._commit_index_changes()
+        logging.info("Fingerprinted %s images, found %s near duplicate groups among %s distinct images.",
+                     len(pending), len(groups), len(fingerprints))
+        return len(groups)
+
+    def update_rollups(self, rebuild=False):
+        """
+        Builds the storage rollups (reclaimable bytes per directory and extension, largest groups).
+        With rebuild, they are recomputed from scratch instead of only when missing.
+        """
+        if rebuild:
+            self.db_operations.rebuild_rollups()
+        else:
+            self.db_operations.ensure_rollups()
+        self._commit_index_changes()
+
+    def add_files(self, dataSourceDirectory, progress: Progress = None, resume=False):
+        """
+        Hashes the files below a directory that are not in the index yet and adds them.
+
+        Args:
+            dataSourceDirectory (str): The directory to scan.
+            progress (Progress): Reports the progress, a console progress bar if not set.
+            resume (bool): Continue after the checkpoint of an interrupted scan of the directory
+                instead of walking it from the start.
+        """
+        with STAGE_SECONDS.time(stage="scan"):
+            self._add_files(dataSourceDirectory, progress, resume)
+
+    def _add_files(self, dataSourceDirectory, progress: Progress = None, resume=False):
         logging.info("Storing all files into the database...")
 
-        filepaths = sorted(list(self._get_all_filepaths(dataSourceDirectory)))
-        existing_paths = self.db_operations.get_existing_paths()
+        scan_config = self._scan_config()
+        source = os.path.abspath(dataSourceDirectory)
+        self.add_source_roots([dataSourceDirectory])
+
+        # The checkpoint is the position in the walk order up to which every file is committed
+        checkpoint = {'position': None, 'files_done': 0}
+        if resume:
+            previous = self.db_operations.get_scan_checkpoint(source)
+            if previous and previous['position'] and not previous['completed']:
+                checkpoint = previous
+                logging.info("Resuming the scan of %s after %s, %s files were done at %s.", source,
+                             os.path.join(*previous['position']), previous['files_done'], previous['updated_at'])
+            else:
+                logging.info("No interrupted scan of %s to resume, scanning all files.", source)
+
+        filepaths = self._get_all_filepaths(dataSourceDirectory, checkpoint['position'])
+        existing_paths = self._existing_paths_lookup()(filepaths)
+
+        # Files that timed out too often are skipped until they are released from the quarantine
+        quarantine = self.db_operations.get_quarantine()
+        skipped = {path for path, attempts in quarantine.items() if attempts >= scan_config.max_retries}
+        if skipped:
+            logging.warning("Skipping %s quarantined files.", len(skipped))
+
+        # Files already in the index are not hashed again
+        filepaths = [filepath for filepath in filepaths if filepath not in existing_paths and filepath not in skipped]
+
+        # Files complete out of order, the checkpoint only moves over the prefix that is done
+        index_of = {filepath: index for index, filepath in enumerate(filepaths)}
+        watermark = CommitWatermark(len(filepaths))
+        last_checkpoint = time.monotonic()
 
-        # Define the batch size for database writes
-        batch_size = 100  # Adjust this size as needed
+        # Hashing concurrency and batch size start from the CPU limit and the configured batch size,
+        # then follow the measured throughput and write latency within the configured bounds
+        concurrency, batching = create_scan_tuners(scan_config, self.config.batch_size if self.config else None)
 
         # Initialize a list to collect file data for the current batch
         current_batch = []
         total_written = 0  # Counter for the total number of files written to the database
+        remaining = len(filepaths)
+        recovered = []  # quarantined files that were hashed successfully on retry
 
-        # Use ThreadPoolExecutor to parallelize the file data preparation
-        with ThreadPoolExecutor(max_workers=4) as executor:
+        # With the shared hash cache, files hashed by another scanner are not read again
+        hash_cache = self._get_hash_cache()
+        hash_stats = {}
+        hashed = []  # metadata of the files read here, stored in the hash cache in batches
+        queued_files = (self._iter_cached(filepaths, hash_cache, hash_stats) if hash_cache
+                        else ((filepath, None) for filepath in filepaths))
+        cached = []  # results taken from the hash cache, handled like the results of the workers
+        held = None  # a file the workers had no room for, submitted before the next one is taken
+
+        # Hash in worker processes with a deadline per file, a worker stuck on a bad file is replaced.
+        # Only as many files as the current concurrency target of workers can queue are handed out.
+        with HashWorkerPool(file_timeout=scan_config.file_timeout, max_workers=concurrency.maximum,
+                            hash_options=self._hash_options()) as pool:
             # Prepare a progress bar to track file processing
-            progress_bar = tqdm(total=len(filepaths), desc="Processing files", unit="file")
+            progress = progress or Progress("Processing files", unit="file")
+            progress.set_total(len(filepaths))
 
-            # Map the filepaths to future objects, and store them in a dictionary
-            future_to_filepath = {executor.submit(self.file_operations.get_file_metadata, filepath): filepath for
-                                  filepath in filepaths}
+            try:
+                while True:
+                    while len(cached) < batching.size and pool.in_flight < concurrency.target * pool.prefetch:
+                        queued, held = held or next(queued_files, None), None
+                        if queued is None:
+                            break
+                        filepath, data = queued
+                        if data is not None:
+                            cached.append(HashResult(filepath, data, HASH_CACHED, None, 0.0))
+                        elif not pool.submit(filepath):
+                            held = queued
+                            break
+                    if not pool.in_flight and not cached and held is None:
+                        break
 
-            # Iterate over the future objects as they complete
-            for future in as_completed(future_to_filepath):
-                filepath = future_to_filepath[future]
-                try:
-                    data = future.result()
-                    if filepath not in existing_paths:
+                    # Iterate over the files as they complete or time out, and those found in the hash cache
+                    results, cached = cached + pool.results(timeout=0.0 if cached else 1.0), []
+                    for result in results:
+                        remaining -= 1
+                        watermark.done(index_of[result.filepath])
+                        size = 0
+                        if result.status in (HASH_OK, HASH_CACHED):
+                            data = result.data
+                            size = data['size']
+                            if result.status == HASH_OK:
+                                self.file_operations.record_hash_metrics(size, result.seconds)
+                                if hash_cache:
+                                    hashed.append(data)
+                            if result.filepath in quarantine:
+                                recovered.append(result.filepath)
+                            current_batch.append(data)
+                            if len(current_batch) >= batching.size:
+                                # Write the current batch to the database
+                                seconds = self._write_batch(current_batch)
+                                batching.record(len(current_batch), seconds)
+                                total_written += len(current_batch)  # Update the total written counter
+                                current_batch = []  # Reset the batch list after writing
+
+                                if time.monotonic() - last_checkpoint >= scan_config.checkpoint_interval:
+                                    self._save_checkpoint(source, dataSourceDirectory, filepaths, watermark, checkpoint)
+                                    last_checkpoint = time.monotonic()
+                        elif result.status in (HASH_TIMEOUT, HASH_CRASHED):
+                            HASH_ERRORS.inc()
+                            self.db_operations.quarantine_file(result.filepath, result.error)
+                        else:
+                            HASH_ERRORS.inc()
+                            logging.error("Error processing file %s: %s", result.filepath, result.error)
+
+                        concurrency.record(1)
+                        # Update progress bar each time a file is completed
+                        progress.update(1, bytes=size)
+
+                    if hash_cache and len(hashed) >= hash_cache.batch_size:
+                        self._store_hashes(hash_cache, hash_stats, hashed)
+                        hashed = []
+
+                    # A file may take until its deadline, do not wait for it to notice a cancellation
+                    progress.check_cancelled()
+                    QUEUE_DEPTH.set(remaining, queue="hash")
+                    AUTOTUNE_VALUE.set(concurrency.target, knob="workers")
+                    AUTOTUNE_VALUE.set(batching.size, knob="batch_size")
+
+            finally:
+                # Make sure to write any remaining files that didn't make up a full batch
+                if current_batch:
+                    self._write_batch(current_batch)
+                    total_written += len(current_batch)
+                if recovered:
+                    self.db_operations.release_quarantined_files(recovered)
+                if hashed:
+                    self._store_hashes(hash_cache, hash_stats, hashed)
+                # Also on cancellation or errors, a resumed scan continues where this one stopped
+                self._save_checkpoint(source, dataSourceDirectory, filepaths, watermark, checkpoint)
+                self._save_prefilter()
+
+                QUEUE_DEPTH.set(0, queue="hash")
+                progress.close()
+                self._commit_index_changes()
+
+        logging.info("Finished storing files into the database. %s new files were added.", total_written)
+
+    def add_files_distributed(self, dataSourceDirectory, progress: Progress = None, local_workers=None):
+        """
+        Scans a directory with workers on one or many hosts and merges their results into the index.
+
+        The tree is split into directory work units that are queued in Redis (see WorkQueue).
+        Workers started here and those running on other hosts (the worker command) take the
+        units, walk and hash them and send back result batches, which are merged here. The units
+        of workers that stop sending heartbeats are handed to another worker.
+
+        Args:
+            dataSourceDirectory (str): The directory to scan, mounted under the same path on all worker hosts.
+            progress (Progress): Reports the finished units, a console progress bar if not set.
+            local_workers (int): Worker processes to start on this host, from the configuration if None.
+        """
+        with STAGE_SECONDS.time(stage="distributed_scan"):
+            self._add_files_distributed(dataSourceDirectory, progress, local_workers)
+
+    def _add_files_distributed(self, dataSourceDirectory, progress: Progress = None, local_workers=None):
+        # Imports the Redis client only for distributed scans
+        from src.core.distributed import WorkQueue, iter_result_files, run_worker
+
+        distributed_config = self._distributed_config()
+        scan_config = self._scan_config()
+        local_workers = distributed_config.local_workers if local_workers is None else local_workers
+        work_queue = WorkQueue(lease_seconds=distributed_config.lease_seconds,
+                               max_attempts=distributed_config.max_attempts)
+
+        source = os.path.abspath(dataSourceDirectory)
+        self.add_source_roots([dataSourceDirectory])
+        units = split_work_units(source, distributed_config.split_depth, self._get_rules())
+        scan_id = uuid.uuid4().hex
+        unit_ids = work_queue.publish(scan_id, units)
+        logging.info("Distributed scan %s of %s: %s work units queued.", scan_id, source, len(units))
+
+        # Files already in the index are dropped, so are those of a unit that was processed twice
+        existing_paths = self._existing_paths_lookup()
+        merged_paths = set()
+
+        context = multiprocessing.get_context("spawn")
+        stop_event = context.Event()
+        workers = [context.Process(target=run_worker, args=(self.config, stop_event), daemon=True)
+                   for _ in range(local_workers)]
+        for worker in workers:
+            worker.start()
+
+        progress = progress or Progress("Distributed scan", unit="unit")
+        progress.set_total(len(units))
+        current_batch = []
+        total_written = 0
+        finished = 0
+        last_commit = time.monotonic()
+        try:
+            while True:
+                requeued, failed = work_queue.reap()
+                WORK_UNITS.inc(requeued, status="requeued")
+                WORK_UNITS.inc(failed, status="failed")
+
+                # All results of a finished unit were appended before it was marked done
+                done = sum(work_queue.finished_units(scan_id))
+                payloads = work_queue.pop_results(scan_id, timeout=distributed_config.poll_seconds)
+                size = 0
+                for payload in payloads:
+                    files = list(iter_result_files(payload))
+                    merged_paths.update(existing_paths([data['path'] for data in files]))
+                    for data in files:
+                        if data['path'] in merged_paths:
+                            continue
+                        merged_paths.add(data['path'])
+                        size += data['size']
                         current_batch.append(data)
-                        if len(current_batch) >= batch_size:
-                            # Write the current batch to the database
-                            self.db_operations.add_files(current_batch)
-                            total_written += len(current_batch)  # Update the total written counter
-                            current_batch = []  # Reset the batch list after writing
-                except Exception as e:
-                    logging.error("Error processing file {filepath}: %s", e)
-
-                # Update progress bar each time a future is completed
-                progress_bar.update(1)
-
-            # Make sure to write any remaining files that didn't make up a full batch
+                        if len(current_batch) >= scan_config.max_batch_size:
+                            self._write_batch(current_batch)
+                            total_written += len(current_batch)
+                            current_batch = []
+
+                if time.monotonic() - last_commit >= scan_config.checkpoint_interval:
+                    self.db_operations.commit()
+                    last_commit = time.monotonic()
+
+                progress.update(done - finished, bytes=size)
+                finished = done
+                QUEUE_DEPTH.set(len(units) - done, queue="work_units")
+                if done >= len(units) and not payloads:
+                    break
+                progress.check_cancelled()
+        finally:
             if current_batch:
-                self.db_operations.add_files(current_batch)
+                self._write_batch(current_batch)
                 total_written += len(current_batch)
 
-            progress_bar.close()
+            failed_units = work_queue.failed_units(scan_id)
+            work_queue.clear(scan_id, unit_ids)
+            stop_event.set()
+            for worker in workers:
+                worker.join(timeout=distributed_config.lease_seconds)
+                if worker.is_alive():
+                    worker.terminate()
 
-        logging.info("Finished storing files into the database. %s new files were added.", total_written)
+            QUEUE_DEPTH.set(0, queue="work_units")
+            progress.close()
+            self._save_prefilter()
+            self._commit_index_changes()
 
-    def print_duplicates_summary(self):
-        duplicates = self.db_operations.get_files_and_duplicates()
+        if failed_units:
+            logging.error("%s work units of the scan were given up, their files are missing from the index: %s",
+                          len(failed_units), failed_units)
+        logging.info("Finished the distributed scan. %s new files were added.", total_written)
+
+    def export_shard(self, path, host_id=None):
+        """
+        Writes the files of the index into a shard that can be merged with the shards of other
+        hosts, see the merge and fleet commands.
+
+        Args:
+            path (str): The shard file.
+            host_id (str): Id of this host in the merged reports, the host name if not set.
+
+        Returns:
+            int: The number of files exported.
+        """
+        return export_shard(self.db_operations, path, host_id or socket.gethostname(),
+                            self.file_operations.hash_algorithm)
+
+    def export_digest_index(self, path):
+        """
+        Writes the hashes of the index into a sorted digest index file for lookups by other
+        tools without a database connection, see DigestIndex.
+
+        Returns:
+            int: The number of digests written.
+        """
+        return write_digest_index(self.db_operations, path, self.file_operations.hash_algorithm)
+
+    def update_index(self, paths=(), moves=(), directories=(), pool: HashWorkerPool = None):
+        """
+        Brings the index in line with the file system for a set of changed paths, e.g. reported
+        by file system events. Moved files keep their entries, new and modified files are hashed,
+        missing files are marked as deleted and only the duplicate groups of the affected hashes
+        are rebuilt, instead of scanning and deduplicating everything again.
+
+        Args:
+            paths (iterable): Files that may have been created, modified or deleted.
+            moves (list): (source, destination) pairs of moved files or directories, in order.
+            directories (iterable): Directories whose files may have changed, e.g. created or removed ones.
+            pool (HashWorkerPool): Hashes the files, a temporary pool if not set.
+
+        Returns:
+            int: The number of files whose entries changed.
+        """
+        changed = 0
+        for source, destination in moves:
+            changed += self._apply_move(source, destination)
+
+        paths = set(paths)
+        for directory in directories:
+            # Files on disk and entries in the index, the ones that differ are sorted out by _apply_changes
+            if os.path.isdir(directory):
+                paths.update(walk_files(directory, rules=self._get_rules()))
+            paths.update(self.db_operations.get_files_below(directory))
+
+        changed += self._apply_changes(paths, pool)
+        # A watcher updates the index in small rounds, the prefilter file is saved now and then
+        self._save_prefilter(interval=self._scan_config().checkpoint_interval)
+        self._commit_index_changes()
+        return changed
+
+    def _apply_move(self, source, destination):
+        """
+        Moves the entries of a file, or of all files below a directory, to the new path.
+        An entry that existed at a destination path was overwritten and is marked as deleted.
+        """
+        entries = self.db_operations.get_files_by_paths([source])
+        entries.update(self.db_operations.get_files_below(source))
+        if not entries:
+            return 0
+
+        paths_by_id = {entry['id']: destination + path[len(source):] for path, entry in entries.items()}
+        moved_ids = set(paths_by_id)
+        replaced = [entry for entry in self.db_operations.get_files_by_paths(paths_by_id.values()).values()
+                    if entry['id'] not in moved_ids]
+        hashes = {entry['hash'] for entry in entries.values()} | {entry['hash'] for entry in replaced}
+
+        # The rollups are per directory: take the groups out with the old paths, put them back with the new ones
+        self.db_operations.detach_duplicate_groups(hashes)
+        self.db_operations.mark_files_deleted([entry['id'] for entry in replaced])
+        self.db_operations.update_file_paths(paths_by_id)
+        self.db_operations.attach_duplicate_groups(hashes)
+        DB_ROWS_WRITTEN.inc(len(paths_by_id) + len(replaced), table="files")
+        return len(paths_by_id)
+
+    def _apply_changes(self, paths, pool: HashWorkerPool = None):
+        """
+        Hashes the given files that are new or whose size or modification time differ from their
+        entries, marks the entries of files that no longer exist as deleted and rebuilds the
+        duplicate groups of the old and new hashes.
+        """
+        scan_config = self._scan_config()
+        entries = self.db_operations.get_files_by_paths(paths)
+        quarantine = self.db_operations.get_quarantine()
+        rules = self._get_rules()
+        roots = self._source_roots()
+
+        deleted = []
+        to_hash = []
+        for path in paths:
+            entry = entries.get(path)
+            try:
+                stat_result = os.stat(path)
+            except OSError:
+                stat_result = None
+            if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+                if entry:
+                    deleted.append(entry)
+            elif entry is None and (rules.excludes_path(path, roots) or
+                                    (rules.checks_stat and rules.excludes_stat(stat_result))):
+                continue  # a scan would not index it either
+            elif entry is None or not _matches_entry(stat_result, entry):
+                if quarantine.get(path, 0) < scan_config.max_retries:
+                    to_hash.append(path)
+
+        hashed = self._hash_files(to_hash, pool)
+        if not deleted and not hashed:
+            return 0
 
-        # Print the paths of the duplicates
-        if duplicates:
-            for key, value in duplicates.items():
-                for item in value:
-                    print(f"{key}: {value}")
+        new_hashes = [data['hash'] for data in hashed]
+        prefilter = self._get_prefilter()
+        if prefilter is not None:
+            # A hash the index does not know and that only one file of this round has cannot form a group
+            prefilter.refresh()
+            counts = Counter(new_hashes)
+            new_hashes = [file_hash for file_hash in new_hashes
+                          if counts[file_hash] > 1 or prefilter.may_contain_hash(file_hash)]
+        hashes = {entry['hash'] for entry in deleted} | set(new_hashes)
+        hashes.update(entries[data['path']]['hash'] for data in hashed if data['path'] in entries)
 
-    def move_duplicates(self, dataDestinationDir):
-        duplicates = self.db_operations.get_files_and_duplicates()
-        filter_keywords = [".DS_Store", "@__thumb"]
+        self.db_operations.detach_duplicate_groups(hashes)
+        self.db_operations.mark_files_deleted([entry['id'] for entry in deleted])
+        self.db_operations.update_files([dict(data, id=entries[data['path']]['id'])
+                                         for data in hashed if data['path'] in entries])
+        inserts = [data for data in hashed if data['path'] not in entries]
+        if inserts:
+            self._write_batch(inserts)
+        self.db_operations.attach_duplicate_groups(hashes)
+        return len(deleted) + len(hashed)
 
-        for original_path, duplicate_list in duplicates.items():
-            # Filter out unwanted files
-            if any(keyword in original_path for keyword in filter_keywords):
+    def create_hash_pool(self):
+        """
+        Returns a HashWorkerPool for rounds of a few files, e.g. for update_index.
+        """
+        scan_config = self._scan_config()
+        return HashWorkerPool(file_timeout=scan_config.file_timeout,
+                              max_workers=scan_config.workers or available_cpus(),
+                              hash_options=self._hash_options())
+
+    def _hash_files(self, filepaths, pool: HashWorkerPool = None):
+        """
+        Hashes a small set of files in the worker pool, quarantining files that time out.
+
+        Returns:
+            list: The metadata of the files that were hashed.
+        """
+        if not filepaths:
+            return []
+
+        hashed = []
+        queued = list(filepaths)
+        hash_cache = self._get_hash_cache()
+        hash_stats = {}
+        if hash_cache:
+            queued = []
+            for filepath, data in self._iter_cached(filepaths, hash_cache, hash_stats):
+                if data is None:
+                    queued.append(filepath)
+                else:
+                    hashed.append(data)
+            if not queued:
+                return hashed
+
+        owned = pool is None
+        pool = pool or self.create_hash_pool()
+
+        recovered = []
+        read = []
+        try:
+            while queued or pool.in_flight:
+                while queued and pool.submit(queued[-1]):
+                    queued.pop()
+                for result in pool.results():
+                    if result.status == HASH_OK:
+                        self.file_operations.record_hash_metrics(result.data['size'], result.seconds)
+                        read.append(result.data)
+                        recovered.append(result.filepath)
+                    elif result.status in (HASH_TIMEOUT, HASH_CRASHED):
+                        HASH_ERRORS.inc()
+                        self.db_operations.quarantine_file(result.filepath, result.error)
+                    else:
+                        # Usually removed again right after the event, the next event for it cleans up
+                        HASH_ERRORS.inc()
+                        logging.warning("Could not hash %s: %s", result.filepath, result.error)
+        finally:
+            if owned:
+                pool.close()
+
+        if hash_cache:
+            self._store_hashes(hash_cache, hash_stats, read)
+        self.db_operations.release_quarantined_files(recovered)
+        return hashed + read
+
+    def reconcile_deletions(self, batch_size=10000):
+        """
+        Marks the indexed files that no longer exist as deleted and removes them from their
+        duplicate groups in bulk.
+
+        Instead of probing every file, the directories of the index are compared with their
+        listings. A directory whose modification time equals the one stored at its last check
+        had no entry created, deleted or renamed since, and is skipped without being listed.
+
+        Args:
+            batch_size (int): Number of missing files marked as deleted per statement batch.
+
+        Returns:
+            int: The number of files marked as deleted.
+        """
+        with STAGE_SECONDS.time(stage="reconcile"):
+            return self._reconcile_deletions(batch_size)
+
+    def _reconcile_deletions(self, batch_size=10000):
+        directories = self.db_operations.get_indexed_directories()
+        stored_mtimes = self.db_operations.get_directory_mtimes()
+
+        checked = {}  # directory -> modification time for the next run
+        gone_directories = []
+        missing_ids = []
+        deleted = 0
+        listed = 0
+        for directory in directories:
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns
+            except (FileNotFoundError, NotADirectoryError):
+                mtime_ns = None
+            except OSError as e:
+                # Unreadable is not gone, e.g. a stale network mount: keep its files
+                logging.warning("Cannot check directory %s: %s", directory, e)
                 continue
 
-            for duplicate in duplicate_list:
-                duplicate_id, duplicate_path, creation_time = duplicate
-                year = Utilities.extract_year_from_timestamp(creation_time)  # creation_time
+            if mtime_ns is not None and stored_mtimes.get(directory) == mtime_ns:
+                continue
 
-                if not os.path.exists(duplicate_path):
-                    logging.error("File not found: {duplicate_path}")
-                    self.db_operations.process_deleted_files(duplicate_id)
-                    self.db_operations.remove_duplicate_entry(duplicate_id)
+            entries = self.db_operations.get_files_in_directory(directory)
+            if mtime_ns is None:
+                gone_directories.append(directory)
+                missing_ids.extend(entries.values())
+            else:
+                try:
+                    names = set(os.listdir(directory))
+                except OSError as e:
+                    logging.warning("Cannot list directory %s: %s", directory, e)
                     continue
+                listed += 1
+                missing_ids.extend(file_id for path, file_id in entries.items() if os.path.basename(path) not in names)
+                # A change within the timestamp granularity of the file system would keep the
+                # modification time, so a directory changed just now is checked again next time
+                checked[directory] = mtime_ns if time.time_ns() - mtime_ns > 2_000_000_000 else None
 
-                # Create the target directory based on the year
-                target_dir = os.path.join(dataDestinationDir, str(year))
-                os.makedirs(target_dir, exist_ok=True)
+            if len(missing_ids) >= batch_size:
+                self.db_operations.process_deleted_files_batch(missing_ids)
+                deleted += len(missing_ids)
+                missing_ids = []
 
-                # Move the file
-                target_path = os.path.join(target_dir, os.path.basename(duplicate_path))
-                try:
-                    shutil.copy2(duplicate_path, target_path)  # Copy with metadata
-                    os.remove(duplicate_path)  # Remove the original file
+        if missing_ids:
+            self.db_operations.process_deleted_files_batch(missing_ids)
+            deleted += len(missing_ids)
+        self.db_operations.save_directory_mtimes(checked)
+        self.db_operations.remove_directories(gone_directories)
+        DB_ROWS_WRITTEN.inc(deleted, table="files")
+        self._commit_index_changes()
+
+        logging.info("Checked %s directories, listed %s, %s files no longer exist.", len(directories), listed, deleted)
+        return deleted
+
+    def print_duplicates_summary(self):
+        # Print the paths of the duplicates, one line per group, directories first
+        for group in self.db_operations.iter_directory_groups():
+            duplicate_paths = [duplicate['path'] for duplicate in group['duplicates']]
+            print(f"{group['original_path']}{os.sep} ({group['file_count']} files): {duplicate_paths}")
+        for group in self.db_operations.iter_duplicate_groups():
+            duplicate_paths = [duplicate['path'] for duplicate in group['duplicates']]
+            print(f"{group['original_path']}: {duplicate_paths}")
+
+    def move_duplicates(self, dataDestinationDir, progress: Progress = None):
+        with STAGE_SECONDS.time(stage="move"):
+            self._move_duplicates(dataDestinationDir, progress)
+
+    def _move_duplicates(self, dataDestinationDir, progress: Progress = None):
+        # Files deleted since the scan leave their groups in bulk instead of being found one by one
+        self.reconcile_deletions()
+        directory_groups = list(self.db_operations.iter_directory_groups())
+        rules = self._get_rules()
+        roots = self._source_roots()
 
-                    # Remove the empty folder if applicable
-                    folder_path = os.path.dirname(duplicate_path)
-                    if not os.listdir(folder_path):
-                        os.rmdir(folder_path)
+        progress = progress or Progress("Moving duplicates", unit="file")
+        progress.set_total(sum(group['file_count'] * len(group['duplicates']) for group in directory_groups))
 
-                    print(f"Moved File: {duplicate_path} -> {target_path}")
-                except Exception as e:
-                    logging.error("Error moving file {duplicate_path}: %s", e)
+        try:
+            # Whole duplicate directories first, one move each instead of one per file
+            for group in directory_groups:
+                with MOVE_SECONDS.time():
+                    moved_bytes = self._move_duplicate_directory_group(group, dataDestinationDir)
+                progress.update(group['file_count'] * len(group['duplicates']), bytes=moved_bytes)
+            self._commit_index_changes()
+
+            duplicates = self.db_operations.get_files_and_duplicates()
+            progress.set_total(progress.total + sum(len(duplicate_list) for duplicate_list in duplicates.values()))
+
+            for original_path, duplicate_list in duplicates.items():
+                # Scans skip excluded files, entries of indexes built with other rules are left in place
+                if rules.excludes_path(original_path, roots):
+                    progress.update(len(duplicate_list))
                     continue
 
-                # Update the database
-                # TODO does not remove the duplicate entry even if the file was already moved.
-                self.db_operations.remove_duplicate_entry(duplicate_id)
+                for duplicate in duplicate_list:
+                    with MOVE_SECONDS.time():
+                        moved_bytes = self._move_duplicate(duplicate, dataDestinationDir)
+                    progress.update(1, bytes=moved_bytes)
+        finally:
+            progress.close()
+            self._commit_index_changes()
+
+    def _move_duplicate_directory_group(self, group, dataDestinationDir):
+        """
+        Moves the duplicate directories of a group as a whole into a folder per year below the
+        destination directory. The group was computed from the index, so the original and each
+        duplicate are first compared with the disk: a directory whose files were added, removed
+        or changed since the scan is left in place.
+
+        Returns:
+            int: The number of bytes moved.
+        """
+        if not self._directory_matches_index(group['original_path']):
+            logging.warning("Directory %s changed since the scan, its duplicates are not moved.",
+                            group['original_path'])
+            return 0
+
+        moved_bytes = 0
+        for duplicate in group['duplicates']:
+            duplicate_path = duplicate['path']
+            if not self._directory_matches_index(duplicate_path):
+                logging.warning("Directory %s changed since the scan and is not moved.", duplicate_path)
+                continue
+
+            target_dir = os.path.join(dataDestinationDir,
+                                      str(Utilities.extract_year_from_timestamp(duplicate['creation_time'])))
+            os.makedirs(target_dir, exist_ok=True)
+            target_path = os.path.join(target_dir, os.path.basename(duplicate_path))
+            suffix = 1
+            while os.path.lexists(target_path):
+                target_path = os.path.join(target_dir, "%s (%s)" % (os.path.basename(duplicate_path), suffix))
+                suffix += 1
+
+            files = self.db_operations.get_files_below(duplicate_path)
+            try:
+                shutil.move(duplicate_path, target_path)
+                logging.info("Moved directory %s to %s", duplicate_path, target_path)
+            except (OSError, shutil.Error) as e:
+                logging.error("Error moving directory %s: %s", duplicate_path, e)
+                continue
+
+            self.db_operations.process_deleted_files_batch([entry['id'] for entry in files.values()])
+            size = sum(entry['size'] or 0 for entry in files.values())
+            moved_bytes += size
+            FILES_MOVED.inc(len(files))
+            BYTES_MOVED.inc(size)
+
+        self.db_operations.remove_directory_group(group['id'])
+        return moved_bytes
+
+    def _directory_matches_index(self, directory):
+        """
+        True if the files below a directory are exactly its indexed files, with unchanged size and modification time.
+        Files the rules exclude were not indexed and are not compared.
+        """
+        if not os.path.isdir(directory):
+            return False
+        indexed = self.db_operations.get_files_below(directory)
+        count = 0
+        for path in walk_files(directory, rules=self._get_rules()):
+            entry = indexed.get(path)
+            try:
+                if entry is None or not _matches_entry(os.stat(path), entry):
+                    return False
+            except OSError:
+                return False
+            count += 1
+        return count == len(indexed)
+
+    def _move_duplicate(self, duplicate, dataDestinationDir):
+        """
+        Moves a single duplicate into a folder per year below the destination directory.
+
+        Returns:
+            int: The number of bytes moved.
+        """
+        duplicate_id, duplicate_path, creation_time = duplicate
+        year = Utilities.extract_year_from_timestamp(creation_time)  # creation_time
+
+        if not os.path.exists(duplicate_path):
+            logging.error("File not found: %s", duplicate_path)
+            self.db_operations.process_deleted_files(duplicate_id)
+            self.db_operations.remove_duplicate_entry(duplicate_id)
+            return 0
+
+        # Create the target directory based on the year
+        target_dir = os.path.join(dataDestinationDir, str(year))
+        os.makedirs(target_dir, exist_ok=True)
+
+        # Move the file
+        target_path = os.path.join(target_dir, os.path.basename(duplicate_path))
+        try:
+            shutil.copy2(duplicate_path, target_path)  # Copy with metadata
+            os.remove(duplicate_path)  # Remove the original file
+
+            # Remove the empty folder if applicable
+            folder_path = os.path.dirname(duplicate_path)
+            if not os.listdir(folder_path):
+                os.rmdir(folder_path)
+
+            print(f"Moved File: {duplicate_path} -> {target_path}")
+        except Exception as e:
+            logging.error("Error moving file %s: %s", duplicate_path, e)
+            return 0
+
+        # Update the database
+        # TODO does not remove the duplicate entry even if the file was already moved.
+        self.db_operations.remove_duplicate_entry(duplicate_id)
+        moved_bytes = os.path.getsize(target_path)
+        FILES_MOVED.inc()
+        BYTES_MOVED.inc(moved_bytes)
+        return moved_bytes
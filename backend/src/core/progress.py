@@ -0,0 +1,99 @@
+import time
+from tqdm import tqdm
+
+
+class JobCancelled(Exception):
+    """Raised inside a processing stage when its job was cancelled."""
+
+
+class Progress:
+    """
+    Tracks the progress of a processing stage: processed items, processed bytes,
+    throughput and the estimated time to completion.
+
+    A stage running in the foreground shows a tqdm bar. A stage running as a background job
+    publishes snapshots into a shared mapping (e.g. a multiprocessing.Manager dict) and checks
+    a cancel event, so the job can be stopped between two items.
+    """
+
+    def __init__(self, desc, unit="file", total=None, state=None, cancel_event=None, show_bar=True,
+                 publish_interval=0.5):
+        """
+        Args:
+            desc (str): Name of the stage, shown in the bar and in the snapshots.
+            unit (str): Unit of the counted items.
+            total (int): Number of items expected, if known.
+            state (dict): Shared mapping to publish snapshots into under the key 'progress'.
+            cancel_event: Event that requests cancellation when set.
+            show_bar (bool): Whether to show a tqdm progress bar.
+            publish_interval (float): Minimum number of seconds between two published snapshots.
+        """
+        self.desc = desc
+        self.unit = unit
+        self.total = total
+        self.done = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+        self._state = state
+        self._cancel_event = cancel_event
+        self._publish_interval = publish_interval
+        self._last_publish = 0.0
+        self._bar = tqdm(total=total, desc=desc, unit=unit) if show_bar else None
+
+    def set_total(self, total):
+        self.total = total
+        if self._bar is not None:
+            self._bar.total = total
+            self._bar.refresh()
+        self._publish(force=True)
+
+    def update(self, count=1, bytes=0):
+        """
+        Record processed items and bytes.
+
+        Raises:
+            JobCancelled: If cancellation of the job was requested.
+        """
+        self.done += count
+        self.bytes += bytes
+        if self._bar is not None:
+            self._bar.update(count)
+        self._publish()
+        self.check_cancelled()
+
+    def check_cancelled(self):
+        if self._cancel_event is not None and self._cancel_event.is_set():
+            raise JobCancelled(f"{self.desc} cancelled after {self.done} {self.unit}s.")
+
+    def snapshot(self):
+        """
+        Returns the current counters and derived rates as a JSON serializable dictionary.
+        """
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        items_per_second = self.done / elapsed
+        eta = None
+        if self.total is not None and items_per_second > 0:
+            eta = max(self.total - self.done, 0) / items_per_second
+        return {
+            'stage': self.desc,
+            'done': self.done,
+            'total': self.total,
+            'bytes': self.bytes,
+            'elapsed_seconds': round(elapsed, 3),
+            'items_per_second': round(items_per_second, 3),
+            'bytes_per_second': round(self.bytes / elapsed, 3),
+            'eta_seconds': round(eta, 3) if eta is not None else None,
+        }
+
+    def _publish(self, force=False):
+        if self._state is None:
+            return
+        now = time.monotonic()
+        if force or now - self._last_publish >= self._publish_interval:
+            self._state['progress'] = self.snapshot()
+            self._last_publish = now
+
+    def close(self):
+        if self._bar is not None:
+            self._bar.close()
+        self._publish(force=True)
@@ -1,20 +1,66 @@
 import redis
 import os
+import threading
+
 
 class RedisConnector:
+    """Thin wrapper around a pooled Redis client."""
+
+    _pools = {}  # Connection pools shared by all connectors of a process, keyed by server
+    _pools_lock = threading.Lock()
+
     def __init__(self):
         self.redis_host = os.getenv('REDIS_HOST', 'localhost')
-        self.redis_port = os.getenv('REDIS_PORT', 6379)
+        self.redis_port = int(os.getenv('REDIS_PORT', 6379))
         self.redis_password = os.getenv('REDIS_PASSWORD', None)
         self.client = redis.Redis(
-            host=self.redis_host,
-            port=self.redis_port, 
-            password=self.redis_password,
-            decode_responses=True
+            connection_pool=self._get_pool(self.redis_host, self.redis_port, self.redis_password)
         )
 
-    def set(self, key, value):
-        self.client.set(key, value)
+    @classmethod
+    def _get_pool(cls, host, port, password):
+        """
+        Returns the connection pool for the given server, creating it on first use.
+        redis-py resets a pool on its own when it is used in a forked child process.
+        """
+        key = (host, port, password)
+        with cls._pools_lock:
+            pool = cls._pools.get(key)
+            if pool is None:
+                pool = redis.ConnectionPool(
+                    host=host,
+                    port=port,
+                    password=password,
+                    decode_responses=True,
+                    max_connections=int(os.getenv('REDIS_MAX_CONNECTIONS', 50)),
+                    socket_connect_timeout=float(os.getenv('REDIS_CONNECT_TIMEOUT', 1.0)),
+                    socket_timeout=float(os.getenv('REDIS_SOCKET_TIMEOUT', 2.0)),
+                )
+                cls._pools[key] = pool
+            return pool
+
+    def set(self, key, value, ttl=None):
+        self.client.set(key, value, ex=ttl)
 
     def get(self, key):
-        return self.client.get(key)
\ No newline at end of file
+        return self.client.get(key)
+
+    def get_many(self, keys):
+        """Fetch several keys in one round trip. Missing keys are returned as None."""
+        pipe = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.get(key)
+        return pipe.execute()
+
+    def set_many(self, mapping, ttl=None):
+        """Store several keys in one round trip."""
+        pipe = self.client.pipeline(transaction=False)
+        for key, value in mapping.items():
+            pipe.set(key, value, ex=ttl)
+        pipe.execute()
+
+    def incr(self, key):
+        return self.client.incr(key)
+
+    def pipeline(self, transaction=False):
+        return self.client.pipeline(transaction=transaction)
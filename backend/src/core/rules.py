@@ -0,0 +1,119 @@
+import fnmatch
+import os
+import re
+import time
+from src.config.ConfigModel import RulesConfig
+
+_DAY = 86400.0
+
+
+def _compile_globs(patterns):
+    """
+    Compiles glob patterns on names into a single regular expression, None if there are none.
+    """
+    patterns = list(patterns)
+    if not patterns:
+        return None
+    return re.compile("|".join("(?:%s)" % fnmatch.translate(pattern) for pattern in patterns))
+
+
+def _compile_regexes(patterns):
+    patterns = list(patterns)
+    if not patterns:
+        return None
+    try:
+        return re.compile("|".join("(?:%s)" % pattern for pattern in patterns))
+    except re.error as e:
+        raise ValueError(f"Invalid exclude_regex in the rules {patterns}: {e}") from e
+
+
+class RuleSet:
+    """
+    Decides which files and directories a walk takes, compiled once from the rules of the
+    configuration (see RulesConfig).
+
+    The glob patterns of each kind are translated into one regular expression and matched
+    against the name of an entry, the regular expressions are joined into one that is searched
+    in its path. Names and paths come from the directory listing, so a pruned directory is
+    never listed and an excluded file is never opened. Only the size and age limits need the
+    stat of a file, it is taken only if one of them is set.
+    """
+
+    def __init__(self, exclude=(), include=(), prune=(), exclude_regex=(), min_size=0, max_size=None,
+                 min_age_days=None, max_age_days=None):
+        """
+        Args:
+            exclude (iterable): Glob patterns on file names, matching files are skipped.
+            include (iterable): Glob patterns on file names, if any, only matching files are taken.
+            prune (iterable): Glob patterns on directory names, matching directories are skipped with their subtrees.
+            exclude_regex (iterable): Regular expressions searched in the paths of files and directories.
+            min_size (int): Smaller files are skipped.
+            max_size (int): Larger files are skipped, no limit if None.
+            min_age_days (float): Files modified more recently are skipped, e.g. ones still being written.
+            max_age_days (float): Files not modified for longer are skipped.
+        """
+        self._exclude = _compile_globs(exclude)
+        self._include = _compile_globs(include)
+        self._prune = _compile_globs(prune)
+        self._regex = _compile_regexes(exclude_regex)
+        self.min_size = min_size or 0
+        self.max_size = max_size
+        self.min_age = min_age_days * _DAY if min_age_days is not None else None
+        self.max_age = max_age_days * _DAY if max_age_days is not None else None
+        self.checks_stat = bool(self.min_size or self.max_size is not None or self.min_age is not None
+                                or self.max_age is not None)
+
+    @classmethod
+    def from_config(cls, rules_config: RulesConfig = None):
+        rules_config = rules_config or RulesConfig()
+        return cls(exclude=rules_config.exclude, include=rules_config.include, prune=rules_config.prune,
+                   exclude_regex=rules_config.exclude_regex, min_size=rules_config.min_size,
+                   max_size=rules_config.max_size, min_age_days=rules_config.min_age_days,
+                   max_age_days=rules_config.max_age_days)
+
+    def prunes(self, name, path):
+        """
+        True if the directory is skipped with everything below it.
+        """
+        return bool((self._prune and self._prune.match(name)) or (self._regex and self._regex.search(path)))
+
+    def excludes(self, name, path):
+        """
+        True if the file is skipped by its name or path, without looking at the file.
+        """
+        if self._include and not self._include.match(name):
+            return True
+        return bool((self._exclude and self._exclude.match(name)) or (self._regex and self._regex.search(path)))
+
+    def excludes_stat(self, stat_result, now=None):
+        """
+        True if the file is skipped by its size or modification time.
+        """
+        if stat_result.st_size < self.min_size or (self.max_size is not None and stat_result.st_size > self.max_size):
+            return True
+        if self.min_age is None and self.max_age is None:
+            return False
+        age = (now or time.time()) - stat_result.st_mtime
+        return bool((self.min_age is not None and age < self.min_age) or
+                    (self.max_age is not None and age > self.max_age))
+
+    def excludes_path(self, path, roots=()):
+        """
+        True if a walk would not take the file at path: it is excluded itself or lies below a
+        pruned directory. For paths that did not come from a walk, e.g. index entries or file
+        system events. The size and age limits are not checked.
+
+        A walk never prunes its root, so the directories are checked from the file up to the
+        first one in roots (the scanned directories), e.g. a source below /share/@__thumb_archive
+        is not pruned by the pattern @__thumb*. Without a matching root every ancestor is checked.
+        """
+        directory, name = os.path.split(path)
+        if self.excludes(name, path):
+            return True
+        if self._prune or self._regex:
+            while directory and directory != os.path.dirname(directory) and directory not in roots:
+                name = os.path.basename(directory)
+                if name and self.prunes(name, directory):
+                    return True
+                directory = os.path.dirname(directory)
+        return False
@@ -0,0 +1,246 @@
+import gzip
+import heapq
+import json
+import logging
+import struct
+import time
+from collections import namedtuple
+from itertools import groupby
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+MAGIC = b"MATRSHRD"
+VERSION = 1
+
+# Header: magic, version, length of the JSON metadata that follows
+_HEADER = struct.Struct("<8sHI")
+# Per record after the hash: size, file id, index of the host, length of the path
+_RECORD = struct.Struct("<QQHH")
+
+ShardRecord = namedtuple("ShardRecord", ["hash", "size", "host", "file_id", "path"])
+
+
+def record_algorithm(hash_algorithm, hash_range_size):
+    """
+    The algorithm of an index entry in the form of FileOperations.hash_algorithm. Entries
+    written before the algorithm was recorded hold sample hashes.
+    """
+    if hash_algorithm is None:
+        return "sha256-sample"
+    return f"{hash_algorithm}-{hash_range_size}" if hash_range_size else hash_algorithm
+
+
+class ShardWriter:
+    """
+    Writes an index shard: a gzip stream of a JSON header and of records sorted by hash and size.
+
+    A record holds the binary hash, size, id in the index of its host, the host and the path,
+    about 30 bytes plus the path before compression. The records have to be written in order,
+    which readers check, so shards of any number of hosts can be merged as streams.
+    """
+
+    def __init__(self, path, hosts, algorithm, metadata=None):
+        """
+        Args:
+            path (str): The shard file.
+            hosts (list): The host ids, records refer to them by index.
+            algorithm (str): The hash algorithm of all records, shards of different algorithms never match.
+            metadata (dict): More header fields, e.g. the source of the shard.
+        """
+        self.path = path
+        self.hosts = list(hosts)
+        self._host_index = {host: index for index, host in enumerate(self.hosts)}
+        self.algorithm = algorithm
+        self.count = 0
+        self._last = None
+        header = dict(metadata or {}, hosts=self.hosts, algorithm=algorithm, created_at=time.time())
+        encoded = json.dumps(header).encode()
+        self._file = gzip.open(path, "wb", compresslevel=6)
+        self._file.write(_HEADER.pack(MAGIC, VERSION, len(encoded)) + encoded)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None and self._file is not None:
+            # Without the end marker readers reject the incomplete shard
+            self._file.close()
+            self._file = None
+        self.close()
+
+    def write(self, record: ShardRecord):
+        key = (record.hash, record.size)
+        if self._last is not None and key < self._last:
+            raise ValueError(f"Shard records out of order at {record.path}")
+        self._last = key
+        path = record.path.encode()
+        self._file.write(bytes((len(record.hash),)) + record.hash +
+                         _RECORD.pack(record.size, record.file_id, self._host_index[record.host], len(path)) + path)
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.write(b"\x00")  # end marker: a hash of length 0
+            self._file.close()
+            self._file = None
+
+
+class ShardReader:
+    """
+    Reads the records of an index shard one at a time, see ShardWriter.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = gzip.open(path, "rb")
+        magic, version, length = _HEADER.unpack(self._file.read(_HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an index shard")
+        if version != VERSION:
+            raise ValueError(f"{path} is an index shard of version {version}, only {VERSION} is supported")
+        self.header = json.loads(self._file.read(length))
+        self.hosts = self.header['hosts']
+        self.algorithm = self.header['algorithm']
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __iter__(self):
+        read = self._file.read
+        hosts = self.hosts
+        last = None
+        while True:
+            length = read(1)
+            if not length:
+                raise ValueError(f"{self.path} is truncated")
+            length = length[0]
+            if not length:
+                return
+            file_hash = read(length)
+            size, file_id, host, path_length = _RECORD.unpack(read(_RECORD.size))
+            if last is not None and (file_hash, size) < last:
+                raise ValueError(f"{self.path} is not sorted at record {file_id}")
+            last = (file_hash, size)
+            yield ShardRecord(file_hash, size, hosts[host], file_id, read(path_length).decode())
+
+    def close(self):
+        self._file.close()
+
+
+def export_shard(db_operations, path, host_id, algorithm):
+    """
+    Writes the live files of an index into a shard.
+
+    Args:
+        db_operations (DatabaseOperations): The index.
+        path (str): The shard file.
+        host_id (str): Id of the host the index describes.
+        algorithm (str): Only the files hashed with this algorithm are exported.
+
+    Returns:
+        int: The number of records written.
+    """
+    skipped = 0
+    with ShardWriter(path, [host_id], algorithm) as writer:
+        for file_id, filepath, file_hash, size, hash_algorithm, hash_range_size in \
+                db_operations.iter_live_files_by_hash():
+            if record_algorithm(hash_algorithm, hash_range_size) != algorithm:
+                skipped += 1
+                continue
+            writer.write(ShardRecord(bytes.fromhex(file_hash), size, host_id, file_id, filepath))
+    if skipped:
+        logging.warning("%s files hashed with another algorithm than %s were not exported.", skipped, algorithm)
+    logging.info("Exported %s files of host %s into %s.", writer.count, host_id, path)
+    return writer.count
+
+
+def _open_shards(paths):
+    readers = [ShardReader(path) for path in paths]
+    algorithms = {reader.algorithm for reader in readers}
+    if len(algorithms) > 1:
+        for reader in readers:
+            reader.close()
+        raise ValueError(f"The shards were hashed with different algorithms: {sorted(algorithms)}")
+    return readers
+
+
+def merge_records(readers):
+    """
+    K-way merges the records of sorted shards: holds one record per shard, never a whole shard.
+
+    Yields:
+        ShardRecord: The records of all shards in order of hash and size.
+    """
+    return heapq.merge(*readers, key=lambda record: (record.hash, record.size))
+
+
+def merge_shards(paths, output):
+    """
+    Merges shards into a single shard that keeps the host of every record.
+
+    Returns:
+        int: The number of records written.
+    """
+    readers = _open_shards(paths)
+    try:
+        hosts = list(dict.fromkeys(host for reader in readers for host in reader.hosts))
+        with ShardWriter(output, hosts, readers[0].algorithm if readers else None,
+                         metadata={'merged_from': list(paths)}) as writer:
+            for record in merge_records(readers):
+                writer.write(record)
+    finally:
+        for reader in readers:
+            reader.close()
+    logging.info("Merged %s shards of %s hosts into %s with %s files.", len(paths), len(hosts), output, writer.count)
+    return writer.count
+
+
+def fleet_report(paths, limit=20, cross_host_only=False):
+    """
+    Finds the duplicates in shards of several hosts with a single pass over the merged records:
+    equal files are adjacent in the merged order, so a group is complete when the next key
+    starts. Memory holds one group at a time and the groups to return.
+
+    Args:
+        paths (list): The shard files.
+        limit (int): Number of groups to return, all groups are counted.
+        cross_host_only (bool): Only count groups with files on more than one host.
+
+    Returns:
+        dict: 'summary' with the counts over all groups, the reclaimable bytes and the files in
+        groups per host, 'groups' with the first limit groups in hash order.
+    """
+    readers = _open_shards(paths)
+    summary = {'shards': len(readers), 'files': 0, 'groups': 0, 'duplicates': 0, 'reclaimable_bytes': 0,
+               'cross_host_groups': 0, 'grouped_files_per_host': {}}
+    groups = []
+    try:
+        for (file_hash, size), records in groupby(merge_records(readers), key=lambda record: (record.hash,
+                                                                                           record.size)):
+            records = list(records)
+            summary['files'] += len(records)
+            if len(records) < 2:
+                continue
+            hosts = {record.host for record in records}
+            if cross_host_only and len(hosts) < 2:
+                continue
+
+            summary['groups'] += 1
+            summary['duplicates'] += len(records) - 1
+            summary['reclaimable_bytes'] += size * (len(records) - 1)
+            if len(hosts) > 1:
+                summary['cross_host_groups'] += 1
+            per_host = summary['grouped_files_per_host']
+            for record in records:
+                per_host[record.host] = per_host.get(record.host, 0) + 1
+            if len(groups) < limit:
+                groups.append({'hash': file_hash.hex(), 'size': size, 'hosts': sorted(hosts),
+                               'files': [{'host': record.host, 'id': record.file_id, 'path': record.path}
+                                         for record in records]})
+    finally:
+        for reader in readers:
+            reader.close()
+    return {'summary': summary, 'groups': groups}
@@ -0,0 +1,212 @@
+import logging
+import os
+from src.core.metrics import FILES_WALKED, DIRECTORIES_WALKED, ENTRIES_EXCLUDED
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def path_key(root, path):
+    """
+    Returns the position of a path in the walk order: the tuple of its components below root.
+    """
+    return tuple(os.path.relpath(path, root).split(os.sep))
+
+
+def _sorted_entries(directory):
+    try:
+        with os.scandir(directory) as entries:
+            return sorted(entries, key=lambda entry: entry.name)
+    except OSError as e:
+        logging.error("Cannot list directory %s: %s", directory, e)
+        return []
+
+
+def _takes_file(entry, rules):
+    """
+    True if the rules take a file of a listing: by name and path first, by the stat only if
+    they have size or age limits.
+    """
+    if rules is None:
+        return True
+    if rules.excludes(entry.name, entry.path):
+        ENTRIES_EXCLUDED.inc(kind="file")
+        return False
+    if rules.checks_stat:
+        try:
+            excluded = rules.excludes_stat(entry.stat())
+        except OSError:
+            return True  # hashing reports the error
+        if excluded:
+            ENTRIES_EXCLUDED.inc(kind="file")
+            return False
+    return True
+
+
+def _prunes_directory(entry, rules):
+    if rules is not None and rules.prunes(entry.name, entry.path):
+        ENTRIES_EXCLUDED.inc(kind="directory")
+        return True
+    return False
+
+
+def walk_files(root, resume_after=None, on_directory=None, rules=None):
+    """
+    Yields the files below root in a deterministic depth first order: the entries of every
+    directory sorted by name, so the paths come in the order of their component tuples.
+
+    With resume_after (the key of a file, see path_key) everything up to and including that
+    file is skipped. Whole directories that lie before it are pruned without being listed,
+    so a resumed scan does not walk the finished part of the tree again.
+
+    Like os.walk, symbolic links to directories are not followed and not yielded, and the
+    walk is iterative, so deep trees do not hit the recursion limit.
+
+    With rules, pruned directories are skipped without being listed and excluded files are
+    not yielded. The root itself is always walked.
+
+    Args:
+        root (str): The directory to walk.
+        resume_after (tuple): Key of the last file that was already processed.
+        on_directory (callable): Called with the path of every directory listed.
+        rules (RuleSet): The files and directories to skip, none if None.
+
+    Yields:
+        str: The path of each file.
+    """
+    resume_after = tuple(resume_after) if resume_after else None
+    DIRECTORIES_WALKED.inc()
+    if on_directory:
+        on_directory(root)
+    # Frames: (key of the directory, its remaining entries, the resume key if the directory contains it)
+    stack = [((), iter(_sorted_entries(root)), resume_after)]
+
+    while stack:
+        prefix, entries, bound = stack[-1]
+        entry = next(entries, None)
+        if entry is None:
+            stack.pop()
+            continue
+
+        key = prefix + (entry.name,)
+        try:
+            is_directory = entry.is_dir() and not entry.is_symlink()
+        except OSError:
+            is_directory = False
+
+        if is_directory:
+            child_bound = None
+            if bound is not None:
+                bound_prefix = bound[:len(key)]
+                if key < bound_prefix:
+                    continue  # the whole subtree lies before the resume position
+                if key == bound_prefix:
+                    child_bound = bound
+            if _prunes_directory(entry, rules):
+                continue
+            DIRECTORIES_WALKED.inc()
+            if on_directory:
+                on_directory(entry.path)
+            stack.append((key, iter(_sorted_entries(entry.path)), child_bound))
+        elif entry.is_symlink() and _is_directory_link(entry):
+            continue
+        else:
+            if bound is not None and key <= bound:
+                continue
+            if not _takes_file(entry, rules):
+                continue
+            FILES_WALKED.inc()
+            yield entry.path
+
+
+def list_files(directory, rules=None):
+    """
+    Yields the files directly in a directory, sorted by name, with the same rules as walk_files
+    but without descending into the subdirectories.
+    """
+    DIRECTORIES_WALKED.inc()
+    for entry in _sorted_entries(directory):
+        try:
+            is_directory = entry.is_dir() and not entry.is_symlink()
+        except OSError:
+            is_directory = False
+        if is_directory or (entry.is_symlink() and _is_directory_link(entry)):
+            continue
+        if not _takes_file(entry, rules):
+            continue
+        FILES_WALKED.inc()
+        yield entry.path
+
+
+def split_work_units(root, depth, rules=None):
+    """
+    Splits the tree below root into work units that together cover every file once: each
+    directory above the given depth with only its own files, and each directory at that depth
+    with its whole subtree.
+
+    Args:
+        root (str): The directory to split.
+        depth (int): Depth of the subtrees, 0 makes the whole tree a single unit.
+        rules (RuleSet): Pruned directories become no units, see walk_files.
+
+    Returns:
+        list: Tuples (directory, recursive) in walk order.
+    """
+    units = []
+    stack = [(root, 0)]
+    while stack:
+        directory, level = stack.pop()
+        if level >= depth:
+            units.append((directory, True))
+            continue
+
+        subdirectories = []
+        has_files = False
+        for entry in _sorted_entries(directory):
+            try:
+                is_directory = entry.is_dir() and not entry.is_symlink()
+            except OSError:
+                is_directory = False
+            if is_directory:
+                if not _prunes_directory(entry, rules):
+                    subdirectories.append(entry.path)
+            elif not (entry.is_symlink() and _is_directory_link(entry)):
+                has_files = True
+        if has_files:
+            units.append((directory, False))
+        stack.extend((subdirectory, level + 1) for subdirectory in reversed(subdirectories))
+    return units
+
+
+def _is_directory_link(entry):
+    try:
+        return entry.is_dir()
+    except OSError:
+        return False
+
+
+class CommitWatermark:
+    """
+    Tracks which of the submitted files are processed, in submission order, while they
+    complete out of order. The watermark is the last file of the contiguous processed
+    prefix: every file up to it is done, so a resumed scan can start after it.
+    """
+
+    def __init__(self, count):
+        self._done = bytearray(count)
+        self._next = 0  # index of the first file that is not done
+
+    def done(self, index):
+        self._done[index] = 1
+
+    def advance(self):
+        """
+        Returns:
+            int: Index of the last file of the processed prefix, -1 if there is none.
+        """
+        while self._next < len(self._done) and self._done[self._next]:
+            self._next += 1
+        return self._next - 1
+
+    @property
+    def complete(self):
+        return self.advance() == len(self._done) - 1
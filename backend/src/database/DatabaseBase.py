@@ -1,8 +1,12 @@
 from typing import Optional, Any, Sequence
+import asyncio
 import logging
 from sqlalchemy import Engine, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.exc import OperationalError, ProgrammingError, IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from src.config.Config import Config
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -17,19 +21,28 @@ class DatabaseBase:
     _initialized = False
     _db_url: str = None
     _engine: Engine = None
+    _async_engine: Optional[AsyncEngine] = None
+    _async_unavailable = False
+
+    # Async drivers used for the read path of the API, by database backend
+    ASYNC_DRIVERS = {
+        "postgresql": "asyncpg",
+        "sqlite": "aiosqlite",
+    }
 
     def __new__(cls, config: Optional[Config] = None, *args, **kwargs):
         """
         Ensures that only one instance of the Database class is created.
         If the instance already exists, return it without needing the config.
         """
-        if cls._instance is None:
+        if DatabaseBase._instance is None:
             if config is None or not isinstance(config, Config):
                 raise ValueError("A valid config is required for the first instantiation")
 
-            cls._instance = super(DatabaseBase, cls).__new__(cls)
+            # Stored on the base class, so DatabaseBase() also returns an instance created by a subclass.
+            DatabaseBase._instance = super(DatabaseBase, cls).__new__(cls)
 
-        return cls._instance
+        return DatabaseBase._instance
 
     def __init__(self, config: Config = None):
         if self._initialized:
@@ -76,8 +89,17 @@ class DatabaseBase:
         """
         logging.info("Creating engine...")
 
+        try:
+            engine = create_engine(db_url, **DatabaseBase._engine_options())
+            return engine
+        except SQLAlchemyError as e:
+            logging.error(f"Error creating SQLAlchemy engine: {e}")
+            raise  # Re-raise the exception or handle it as needed
+
+    @staticmethod
+    def _engine_options() -> dict:
         # Optional: Engine configuration settings
-        engine_options = {
+        return {
             "echo": False,  # Set to True to log all SQL statements (useful for debugging)
             "pool_pre_ping": True,  # Check for broken connections before checkout
             "pool_recycle": 3600,  # Time to recycle connections
@@ -85,12 +107,35 @@ class DatabaseBase:
             # Additional options can be added here as needed
         }
 
+    def _get_async_engine(self) -> Optional[AsyncEngine]:
+        """
+        Returns the async engine, creating it on first use. The async driver is derived from the
+        configured URL (e.g. postgresql:// uses asyncpg). Returns None if no async driver is
+        available for the backend, callers then fall back to the sync engine in a worker thread.
+        """
+        if self._async_engine is not None or self._async_unavailable:
+            return self._async_engine
+
+        url = make_url(self._db_url)
+        backend = url.get_backend_name()
+        driver = self.ASYNC_DRIVERS.get(backend)
         try:
-            engine = create_engine(db_url, **engine_options)
-            return engine
-        except SQLAlchemyError as e:
-            logging.error(f"Error creating SQLAlchemy engine: {e}")
-            raise  # Re-raise the exception or handle it as needed
+            if driver is None:
+                raise ImportError(f"no async driver known for '{backend}'")
+            self._async_engine = create_async_engine(url.set(drivername=f"{backend}+{driver}"),
+                                                     **self._engine_options())
+            logging.info("Async engine created using driver '%s'.", driver)
+        except (ImportError, SQLAlchemyError) as e:
+            logging.warning(f"Async database access unavailable, using the sync engine in a thread: {e}")
+            self._async_unavailable = True
+        return self._async_engine
+
+    def get_async_session(self) -> AsyncSession:
+        """Create and return a new async session."""
+        engine = self._get_async_engine()
+        if engine is None:
+            raise Exception("Async database engine is not available.")
+        return AsyncSession(engine)
 
     def _get_session(self) -> Session:
         """Create and return a new session."""
@@ -129,7 +174,29 @@ class DatabaseBase:
             result = session.execute(text(query))
             all_rows = result.all()
 
-            for row in all_rows:
-                logging.info(f"Database Row '{row}'.")
+            logging.debug("Query returned %s rows.", len(all_rows))
+            return all_rows
+
+    async def execute_async(self, query: str) -> Sequence[Any]:
+        """
+        Execute a SQL query without blocking the event loop and return the results.
+        Uses the async engine if available, otherwise runs the sync query in a worker thread.
+        """
+        engine = self._get_async_engine()
+        if engine is None:
+            return await asyncio.to_thread(self.execute, query)
+
+        async with AsyncSession(engine) as session:
+            result = await session.execute(text(query))
+            all_rows = result.all()
 
+            logging.debug("Query returned %s rows.", len(all_rows))
             return all_rows
+
+    async def dispose_async(self):
+        """
+        Close all connections of the async engine.
+        """
+        if self._async_engine is not None:
+            await self._async_engine.dispose()
+            self._async_engine = None
@@ -11,7 +11,7 @@ class Postgresql(DatabaseBase):
         """
         return super(Postgresql, cls).__new__(cls, config, *args, **kwargs)
 
-    def __init__(self, config: Config):
+    def __init__(self, config: Optional[Config] = None):
         """
         Initialize the PostgreSQL-specific features, ensuring that the base
         initialization is also called.
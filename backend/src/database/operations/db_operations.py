@@ -1,8 +1,16 @@
+import os
 import sqlite3
 import logging
 import json
 from database.operations.db_operations_files import DatabaseOperationsFiles
 from database.operations.db_operations_duplicates import DatabaseOperationsDuplicates
+from database.operations.db_operations_rollups import DatabaseOperationsRollups
+from database.operations.db_operations_quarantine import DatabaseOperationsQuarantine
+from database.operations.db_operations_checkpoints import DatabaseOperationsCheckpoints
+from database.operations.db_operations_directories import DatabaseOperationsDirectories
+from database.operations.db_operations_directory_duplicates import DatabaseOperationsDirectoryDuplicates
+from database.operations.db_operations_chunks import DatabaseOperationsChunks
+from database.operations.db_operations_images import DatabaseOperationsImages
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -10,37 +18,51 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 class DatabaseOperations:
     """Class provides all database operations"""
 
-    def __init__(self, db_name="duplicates.db"):
+    def __init__(self, db_name="duplicates.db", check_same_thread=True):
         """
         Initializes the DatabaseOperations object with a connection to the specified SQLite database.
         It also initializes two sub-classes for handling operations on 'files' and 'duplicates' tables.
 
         Args:
             db_name (str): Name of the SQLite database file.
+            check_same_thread (bool): If False, the connection may be used by a thread other than the one
+                that created it (e.g. a request served from a threadpool). Access must still be sequential.
         """
 
         try:
-            self.conn = self._open_connection(db_name)
+            self.conn = self._open_connection(db_name, check_same_thread)
             self.db_operations_files = DatabaseOperationsFiles(self.conn.cursor())
             self.db_operations_duplicates = DatabaseOperationsDuplicates(self.conn.cursor())
+            self.db_operations_rollups = DatabaseOperationsRollups(self.conn.cursor())
+            self.db_operations_quarantine = DatabaseOperationsQuarantine(self.conn.cursor())
+            self.db_operations_checkpoints = DatabaseOperationsCheckpoints(self.conn.cursor())
+            self.db_operations_directories = DatabaseOperationsDirectories(self.conn.cursor())
+            self.db_operations_directory_duplicates = DatabaseOperationsDirectoryDuplicates(self.conn.cursor())
+            self.db_operations_chunks = DatabaseOperationsChunks(self.conn.cursor())
+            self.db_operations_images = DatabaseOperationsImages(self.conn.cursor())
             logging.info("Database initialized successfully.")
         except sqlite3.Error as e:
             logging.error("Error initializing database: %s", str(e))
             raise
 
-    def _open_connection(self, db_name):
+    def _open_connection(self, db_name, check_same_thread=True):
         """
         Establishes and returns a connection to the SQLite database.
 
         Args:
             db_name (str): Name of the SQLite database file.
+            check_same_thread (bool): Passed through to sqlite3.connect.
 
         Returns:
             sqlite3.Connection: A connection object to the SQLite database.
         """
 
         try:
-            return sqlite3.connect(db_name)
+            # Background jobs write from several processes: wait for locks instead of failing
+            # immediately and let readers proceed while a writer holds the lock.
+            conn = sqlite3.connect(db_name, timeout=30, check_same_thread=check_same_thread)
+            conn.execute("PRAGMA journal_mode=WAL")
+            return conn
         except sqlite3.Error as e:
             logging.error("Error connecting to the database: %s", str(e))
             raise
@@ -50,13 +72,28 @@ class DatabaseOperations:
         Closes the database connection if it is open.
         """
 
-        if self.conn and not self.conn.closed:
+        if self.conn:
             self.conn.close()
+            self.conn = None
             logging.info("Database connection closed successfully.")
 
+    def close(self):
+        """
+        Closes the database connection.
+        """
+
+        self._close_connection()
+
+    def commit(self):
+        """
+        Commits all pending changes of the connection.
+        """
+
+        self.conn.commit()
+
     def get_existing_paths(self):
         """
-        Fetches and returns existing file paths from the 'files' table in the database.
+        Fetches and returns the paths of the files in the 'files' table that are not deleted.
 
         Returns:
             list: A list of file paths.
@@ -64,9 +101,45 @@ class DatabaseOperations:
 
         return self.db_operations_files.get_existing_paths(self.conn.cursor())
 
+    def get_existing_paths_among(self, paths):
+        """
+        Returns the given paths that are in the index, with point lookups instead of loading all paths.
+        """
+
+        return self.db_operations_files.fetch_existing_paths(self.conn.cursor(), paths)
+
+    def iter_files_after(self, file_id):
+        """
+        Iterates over id, path and hash of the files inserted after the given file ID.
+        """
+
+        return self.db_operations_files.iter_files_after(self.conn.cursor(), file_id)
+
+    def get_file_change_bounds(self):
+        """
+        Returns:
+            tuple: (lowest change ID kept, highest change ID written), see iter_file_changes_after.
+        """
+
+        return self.db_operations_files.fetch_change_bounds(self.conn.cursor())
+
+    def iter_file_changes_after(self, change_id):
+        """
+        Iterates over change ID, path and hash of the files moved or modified after the given change ID.
+        """
+
+        return self.db_operations_files.iter_changes_after(self.conn.cursor(), change_id)
+
+    def trim_file_changes(self, change_id):
+        """
+        Removes the file changes up to the given change ID, once they are reflected elsewhere.
+        """
+
+        self.db_operations_files.trim_changes(self.conn.cursor(), change_id)
+
     def fetch_all_files(self):
         """
-        Retrieves all file records from the 'files' table in the database.
+        Retrieves the file records from the 'files' table that are not deleted.
 
         Returns:
             list: A list of tuples, each containing file data.
@@ -84,6 +157,443 @@ class DatabaseOperations:
 
         return self.db_operations_files.add_files(self.conn.cursor(), file_data_list)
 
+    def quarantine_file(self, path, error):
+        """
+        Records a failed attempt to hash a file that timed out or crashed its worker.
+
+        Args:
+            path (str): The path of the file.
+            error (str): Description of the failure.
+        """
+
+        self.db_operations_quarantine.record_failure(self.conn.cursor(), path, error)
+
+    def release_quarantined_files(self, paths):
+        """
+        Removes files from the quarantine.
+
+        Args:
+            paths (list): The paths of the files.
+        """
+
+        self.db_operations_quarantine.release(self.conn.cursor(), paths)
+
+    def get_quarantine(self):
+        """
+        Returns:
+            dict: The number of failed attempts per quarantined path.
+        """
+
+        return self.db_operations_quarantine.fetch_quarantine(self.conn.cursor())
+
+    def get_quarantine_entries(self):
+        """
+        Returns:
+            list: A list of dictionaries with path, attempts, last_error and last_attempt.
+        """
+
+        return [
+            {'path': path, 'attempts': attempts, 'last_error': last_error, 'last_attempt': last_attempt}
+            for path, attempts, last_error, last_attempt in
+            self.db_operations_quarantine.fetch_entries(self.conn.cursor())
+        ]
+
+    def save_scan_checkpoint(self, source, position, files_done, completed=False):
+        """
+        Records how far the scan of a source directory got. Committed together with the files.
+
+        Args:
+            source (str): The absolute path of the scanned directory.
+            position (tuple): Path components of the last file of the committed prefix.
+            files_done (int): Number of files processed by the scan so far.
+            completed (bool): True if the scan went through the whole directory.
+        """
+
+        self.db_operations_checkpoints.save(self.conn.cursor(), source, position, files_done, completed)
+
+    def get_scanned_sources(self):
+        """
+        Returns:
+            list: The absolute paths of the source directories that were scanned into the index.
+        """
+
+        return self.db_operations_checkpoints.fetch_sources(self.conn.cursor())
+
+    def get_scan_checkpoint(self, source):
+        """
+        Args:
+            source (str): The absolute path of the scanned directory.
+
+        Returns:
+            dict: position, files_done, completed and updated_at, or None if the source has no checkpoint.
+        """
+
+        checkpoint = self.db_operations_checkpoints.fetch(self.conn.cursor(), source)
+        if checkpoint is None:
+            return None
+        position, files_done, completed, updated_at = checkpoint
+        return {'position': position, 'files_done': files_done, 'completed': completed, 'updated_at': updated_at}
+
+    def get_files_by_paths(self, paths):
+        """
+        Args:
+            paths (list): The paths of the files.
+
+        Returns:
+            dict: id, hash, size and modification_time of every indexed file that is not deleted, by path.
+        """
+
+        return {
+            path: {'id': file_id, 'hash': file_hash, 'size': size, 'modification_time': modification_time}
+            for file_id, path, file_hash, size, modification_time in
+            self.db_operations_files.fetch_files_by_paths(self.conn.cursor(), paths)
+        }
+
+    def get_files_below(self, directory):
+        """
+        Args:
+            directory (str): The directory.
+
+        Returns:
+            dict: id, hash, size and modification_time of every indexed file below the directory, by path.
+        """
+
+        return {
+            path: {'id': file_id, 'hash': file_hash, 'size': size, 'modification_time': modification_time}
+            for file_id, path, file_hash, size, modification_time in
+            self.db_operations_files.fetch_files_below(self.conn.cursor(), directory.rstrip(os.sep), os.sep)
+        }
+
+    def update_files(self, file_data_list):
+        """
+        Replaces the metadata of indexed files whose content changed.
+
+        Args:
+            file_data_list (list): File data dictionaries including the 'id' of the file.
+        """
+
+        self.db_operations_files.update_files(self.conn.cursor(), file_data_list)
+
+    def update_file_paths(self, paths_by_id):
+        """
+        Changes the paths of moved files.
+
+        Args:
+            paths_by_id (dict): The new path per file ID.
+        """
+
+        self.db_operations_files.update_paths(self.conn.cursor(), paths_by_id)
+
+    def mark_files_deleted(self, file_ids):
+        """
+        Marks files as deleted without touching the duplicate groups, see detach_duplicate_groups.
+
+        Args:
+            file_ids (list): The IDs of the files.
+        """
+
+        self.db_operations_files.mark_many_as_deleted(self.conn.cursor(), file_ids)
+
+    def detach_duplicate_groups(self, hashes):
+        """
+        Removes the duplicate groups of the given hashes and their rollups. Called before the
+        files of the groups change, the rollups are subtracted with the old paths and sizes.
+
+        Args:
+            hashes (set): The content hashes whose groups are going to change.
+        """
+
+        cur = self.conn.cursor()
+        groups = self.db_operations_duplicates.fetch_groups_by_hashes(cur, hashes)
+        for original_id, duplicate_ids in groups:
+            self._apply_rollup_delta(original_id, duplicate_ids, -1)
+        self.db_operations_duplicates.remove_groups(cur, [original_id for original_id, _ in groups])
+
+    def attach_duplicate_groups(self, hashes, exclude_ids=()):
+        """
+        Builds the duplicate groups of the given hashes from the files that are not deleted, the
+        oldest file being the original, as add_duplicates does for the whole index.
+
+        Args:
+            hashes (set): The content hashes whose groups changed, see detach_duplicate_groups.
+            exclude_ids (set): Files left out of the groups, e.g. those covered by a directory duplicate group.
+        """
+
+        files_by_hash = {}
+        for file_id, file_hash, creation_time in self.db_operations_files.fetch_files_by_hashes(
+                self.conn.cursor(), hashes):
+            if file_id not in exclude_ids:
+                files_by_hash.setdefault(file_hash, []).append((creation_time, file_id))
+
+        for files in files_by_hash.values():
+            if len(files) > 1:
+                files.sort()
+                self.process_duplicates(files[0][1], [file_id for _, file_id in files[1:]])
+
+    def regroup_deleted_originals(self):
+        """
+        Rebuilds the duplicate groups whose original is marked as deleted, left by indexes that
+        only took deleted files out of duplicate_ids. Their rollups are subtracted with the group.
+
+        Returns:
+            int: The number of hashes whose groups were rebuilt.
+        """
+
+        hashes = self.db_operations_duplicates.fetch_deleted_original_hashes(self.conn.cursor())
+        self.detach_duplicate_groups(hashes)
+        self.attach_duplicate_groups(hashes)
+        return len(hashes)
+
+    def get_indexed_directories(self):
+        """
+        Returns:
+            list: The directories that contain indexed files that are not deleted.
+        """
+
+        return self.db_operations_files.fetch_directories(self.conn.cursor(), os.sep)
+
+    def get_files_in_directory(self, directory):
+        """
+        Args:
+            directory (str): The directory.
+
+        Returns:
+            dict: The IDs of the indexed files directly in the directory that are not deleted, by path.
+        """
+
+        return {path: file_id for file_id, path in
+                self.db_operations_files.fetch_files_in_directory(self.conn.cursor(), directory, os.sep)}
+
+    def get_directory_mtimes(self):
+        """
+        Returns:
+            dict: The modification time in nanoseconds of every checked directory, by path.
+        """
+
+        return self.db_operations_directories.fetch_mtimes(self.conn.cursor())
+
+    def save_directory_mtimes(self, mtimes):
+        """
+        Args:
+            mtimes (dict): The modification time in nanoseconds per checked directory.
+        """
+
+        self.db_operations_directories.save_mtimes(self.conn.cursor(), mtimes)
+
+    def remove_directories(self, paths):
+        """
+        Args:
+            paths (list): Checked directories that no longer exist.
+        """
+
+        self.db_operations_directories.remove(self.conn.cursor(), paths)
+
+    def iter_live_files(self):
+        """
+        Iterates over path, hash, size and creation time of the files that are not deleted.
+        """
+
+        # A cursor of its own, the caller may write through the connection meanwhile
+        return self.db_operations_files.iter_live_files(self.conn.cursor())
+
+    def iter_live_files_by_hash(self):
+        """
+        Iterates over id, path, hash, size and hash algorithm of the files that are not deleted,
+        ordered by hash, size and path.
+        """
+
+        return self.db_operations_files.iter_live_files_by_hash(self.conn.cursor())
+
+    def save_directory_duplicates(self, directory_hashes, groups):
+        """
+        Replaces the directory hashes and the directory duplicate groups.
+
+        Args:
+            directory_hashes (dict): Per directory path a tuple (hash, file_count, size, creation_time).
+            groups (list): Tuples (hash, original_path, duplicate_paths, file_count, size).
+        """
+
+        cur = self.conn.cursor()
+        self.db_operations_directory_duplicates.replace_hashes(cur, directory_hashes)
+        self.db_operations_directory_duplicates.replace_groups(cur, groups)
+
+    def get_directory_groups(self, after_id=0, limit=100):
+        """
+        Fetches one page of directory duplicate groups, ordered by group ID (keyset pagination).
+
+        Args:
+            after_id (int): Cursor; only groups with an ID greater than this value are returned.
+            limit (int): Maximum number of groups in the page.
+
+        Returns:
+            list: A list of dictionaries with the keys 'id', 'hash', 'original_path', 'file_count',
+            'size' and 'duplicates' (a list of dictionaries with 'path' and 'creation_time').
+        """
+
+        cur = self.conn.cursor()
+        rows = self.db_operations_directory_duplicates.fetch_groups(cur, after_id or 0, limit)
+        creation_times = self.db_operations_directory_duplicates.fetch_creation_times(
+            cur, [path for row in rows for path in row[3]])
+
+        return [{
+            'id': group_id,
+            'hash': directory_hash,
+            'original_path': original_path,
+            'file_count': file_count,
+            'size': size,
+            'duplicates': [{'path': path, 'creation_time': creation_times.get(path)} for path in duplicate_paths],
+        } for group_id, directory_hash, original_path, duplicate_paths, file_count, size in rows]
+
+    def iter_directory_groups(self, page_size=500):
+        """
+        Iterates over all directory duplicate groups page by page.
+
+        Yields:
+            dict: A group as returned by get_directory_groups.
+        """
+
+        after_id = 0
+        while True:
+            groups = self.get_directory_groups(after_id, page_size)
+            if not groups:
+                return
+            yield from groups
+            after_id = groups[-1]['id']
+
+    def remove_directory_group(self, group_id):
+        """
+        Args:
+            group_id (int): The ID of a directory duplicate group that was dealt with.
+        """
+
+        self.db_operations_directory_duplicates.remove_group(self.conn.cursor(), group_id)
+
+    def get_files_to_chunk(self, min_file_size):
+        """
+        Args:
+            min_file_size (int): Smallest file size to chunk.
+
+        Returns:
+            list: Tuples (id, path, hash, size) of the files whose current content has no chunks yet.
+        """
+
+        return self.db_operations_chunks.fetch_pending_files(self.conn.cursor(), min_file_size)
+
+    def save_file_chunks(self, chunked):
+        """
+        Args:
+            chunked (list): Tuples (file_id, file_hash, chunks) with chunks a list of (size, digest) in file order.
+
+        Returns:
+            int: The number of file_chunks rows written.
+        """
+
+        return self.db_operations_chunks.save_file_chunks(self.conn.cursor(), chunked)
+
+    def remove_stale_chunks(self):
+        """
+        Removes the chunks of deleted files.
+        """
+
+        self.db_operations_chunks.remove_deleted_files(self.conn.cursor())
+
+    def get_similar_files(self, path, min_ratio=0.0, limit=50):
+        """
+        Finds the files that share content with a file, by their common chunks.
+
+        Args:
+            path (str): The path of an indexed file.
+            min_ratio (float): Smallest share of the file's bytes another file must contain.
+            limit (int): Maximum number of files returned.
+
+        Returns:
+            dict: 'id', 'path' and 'size' of the file and 'similar', a list of dictionaries with
+            'id', 'path', 'size', 'shared_bytes' and 'shared_ratio' (shared bytes / size of the file),
+            or None if the file is not in the index.
+        """
+
+        cur = self.conn.cursor()
+        rows = self.db_operations_files.fetch_files_by_paths(cur, [path], columns=("id", "path", "size"))
+        if not rows:
+            return None
+        file_id, path, size = rows[0]
+
+        similar = []
+        for other_id, other_path, other_size, shared_bytes in self.db_operations_chunks.fetch_shared_bytes(
+                cur, file_id, limit):
+            shared_ratio = shared_bytes / size if size else 0.0
+            if shared_ratio >= min_ratio:
+                similar.append({'id': other_id, 'path': other_path, 'size': other_size,
+                                'shared_bytes': shared_bytes, 'shared_ratio': round(shared_ratio, 4)})
+        return {'id': file_id, 'path': path, 'size': size, 'similar': similar}
+
+    def get_chunk_summary(self):
+        """
+        Returns:
+            dict: 'files' (chunked files), 'bytes' (their total size) and 'unique_bytes' (size of their distinct chunks).
+        """
+
+        file_count, total_bytes, unique_bytes = self.db_operations_chunks.fetch_summary(self.conn.cursor())
+        return {'files': file_count, 'bytes': total_bytes, 'unique_bytes': unique_bytes}
+
+    def get_images_to_fingerprint(self, extensions):
+        """
+        Args:
+            extensions (list): The file extensions of images, lower case with the dot.
+
+        Returns:
+            list: Tuples (hash, path), one path per image content without a fingerprint entry.
+        """
+
+        return self.db_operations_images.fetch_pending(self.conn.cursor(), extensions)
+
+    def save_image_fingerprints(self, fingerprints):
+        """
+        Args:
+            fingerprints (list): Tuples (hash, fingerprint), fingerprint None for an image that could not be decoded.
+        """
+
+        self.db_operations_images.save_fingerprints(self.conn.cursor(), fingerprints)
+
+    def remove_stale_image_fingerprints(self):
+        """
+        Removes the fingerprints of contents no file has anymore.
+        """
+
+        self.db_operations_images.remove_stale(self.conn.cursor())
+
+    def get_image_fingerprints(self):
+        """
+        Returns:
+            list: Tuples (id, hash, size, creation_time, fingerprint) of the files that are not deleted and have a fingerprint.
+        """
+
+        return self.db_operations_images.fetch_fingerprinted_files(self.conn.cursor())
+
+    def save_near_duplicate_groups(self, groups):
+        """
+        Args:
+            groups (list): Tuples (original_id, duplicate_ids, max_distance), replacing all near duplicate groups.
+        """
+
+        self.db_operations_images.replace_groups(self.conn.cursor(), groups)
+
+    def get_near_duplicate_groups(self, after_id=0, limit=100):
+        """
+        Fetches one page of near duplicate image groups, ordered by original file ID (keyset pagination).
+
+        Returns:
+            list: Groups as returned by get_duplicate_groups, with the largest Hamming distance of a
+            duplicate to the original as 'max_distance'.
+        """
+
+        cur = self.conn.cursor()
+        rows = self.db_operations_images.fetch_groups(cur, after_id or 0, limit)
+        groups = self._resolve_duplicate_groups(cur, rows)
+        for group, row in zip(groups, rows):
+            group['max_distance'] = row[4]
+        return groups
+
     def process_duplicates(self, original_id, duplicate_ids):
         """
         Processes and stores duplicate file information in the 'duplicates' table.
@@ -93,7 +603,27 @@ class DatabaseOperations:
             duplicate_ids (list): A list of duplicate file IDs.
         """
 
-        return self.db_operations_duplicates.add_duplicates(self.conn.cursor(), original_id, duplicate_ids)
+        added_ids = self.db_operations_duplicates.add_duplicates(self.conn.cursor(), original_id, duplicate_ids)
+        self._apply_rollup_delta(original_id, added_ids, 1)
+        return added_ids
+
+    def _apply_rollup_delta(self, original_id, file_ids, sign):
+        """
+        Adds files to (sign=1) or removes files from (sign=-1) the rollups of a duplicate group.
+        Only files that are not deleted are added, like rebuild_rollups and get_duplicates_summary count them.
+
+        Args:
+            original_id (int): The ID of the original file of the group.
+            file_ids (list): The IDs of the duplicate files that joined or left the group.
+            sign (int): 1 for added duplicates, -1 for removed duplicates.
+        """
+
+        if not file_ids:
+            return
+        cur = self.conn.cursor()
+        rows = self.db_operations_files.fetch_files_by_ids(cur, file_ids, columns=("id", "path", "size", "is_deleted"))
+        files = [(path, size) for _, path, size, is_deleted in rows if sign < 0 or not is_deleted]
+        self.db_operations_rollups.apply_delta(cur, original_id, files, sign)
 
     def process_deleted_files(self, id):
         """
@@ -104,8 +634,117 @@ class DatabaseOperations:
             id (int): The ID of the file to be marked as deleted.
         """
 
-        self.db_operations_files.mark_as_deleted(self.conn.cursor(), id)
-        self.db_operations_duplicates.remove_marked_deleted(self.conn.cursor(), id)
+        self.process_deleted_files_batch([id])
+
+    def process_deleted_files_batch(self, file_ids):
+        """
+        Marks several files as deleted and removes them from their duplicate groups and the
+        rollups with a few set based statements. A group whose original is deleted is rebuilt
+        from its live files instead, with the oldest of them as the new original, like
+        _apply_changes in the processor does for changed files.
+
+        Args:
+            file_ids (list): The IDs of the files to be marked as deleted.
+
+        Returns:
+            int: The number of duplicates removed from groups that keep their original.
+        """
+
+        cur = self.conn.cursor()
+        original_hashes = self.db_operations_duplicates.fetch_original_hashes(cur, file_ids)
+        self.detach_duplicate_groups(original_hashes)
+        self.db_operations_files.mark_many_as_deleted(cur, file_ids)
+        removed = self.db_operations_duplicates.remove_files(cur, file_ids)
+        self.attach_duplicate_groups(original_hashes)
+        if not removed:
+            return 0
+
+        files_by_id = {file_id: (path, size) for file_id, path, size in self.db_operations_files.fetch_files_by_ids(
+            cur, [file_id for ids in removed.values() for file_id in ids], columns=("id", "path", "size"))}
+        self.db_operations_rollups.apply_deltas(
+            cur, {original_id: [files_by_id[file_id] for file_id in ids if file_id in files_by_id]
+                  for original_id, ids in removed.items()}, -1)
+        return sum(len(ids) for ids in removed.values())
+
+    def rebuild_rollups(self, page_size=1000):
+        """
+        Recomputes all rollups from the 'duplicates' table, reading the groups page by page.
+        """
+
+        cur = self.conn.cursor()
+        self.db_operations_rollups.clear(cur)
+
+        after_id = 0
+        while True:
+            cur.execute("SELECT original_id, duplicate_ids FROM duplicates WHERE original_id > ? "
+                        "ORDER BY original_id LIMIT ?", (after_id, page_size))
+            groups = [(original_id, json.loads(duplicate_ids_json)) for original_id, duplicate_ids_json in cur.fetchall()]
+            if not groups:
+                break
+
+            files_by_id = {
+                file_id: (path, size) for file_id, path, size, is_deleted in self.db_operations_files.fetch_files_by_ids(
+                    cur, [dup_id for _, duplicate_ids in groups for dup_id in duplicate_ids],
+                    columns=("id", "path", "size", "is_deleted"))
+                if not is_deleted
+            }
+            for original_id, duplicate_ids in groups:
+                files = [files_by_id[dup_id] for dup_id in duplicate_ids if dup_id in files_by_id]
+                self.db_operations_rollups.apply_delta(cur, original_id, files, 1)
+            after_id = groups[-1][0]
+
+        self.db_operations_rollups.mark_built(cur)
+        logging.info("Rollups rebuilt.")
+
+    def ensure_rollups(self):
+        """
+        Builds the rollups once for an index that was filled before rollups existed.
+        Afterwards they are kept up to date incrementally.
+        """
+
+        if not self.db_operations_rollups.is_built(self.conn.cursor()):
+            self.rebuild_rollups()
+
+    def get_rollup_directories(self, parent=None, limit=50):
+        """
+        Returns the direct subdirectories of a directory, largest reclaimable bytes first.
+
+        Args:
+            parent (str): The parent directory, None for the outermost directories.
+            limit (int): Maximum number of directories.
+
+        Returns:
+            list: A list of dictionaries with the keys 'path', 'duplicate_files' and 'reclaimable_bytes'.
+        """
+
+        rows = self.db_operations_rollups.fetch_directories(self.conn.cursor(), parent, limit)
+        return [{'path': path, 'duplicate_files': count, 'reclaimable_bytes': total} for path, count, total in rows]
+
+    def get_rollup_directory(self, path):
+        """
+        Returns the recursive rollup of a single directory, or None if it holds no duplicates.
+        """
+
+        row = self.db_operations_rollups.fetch_directory(self.conn.cursor(), path)
+        return {'path': row[0], 'duplicate_files': row[1], 'reclaimable_bytes': row[2]} if row else None
+
+    def get_rollup_extensions(self, limit=50):
+        """
+        Returns the duplicate counts per file extension, largest reclaimable bytes first.
+        """
+
+        rows = self.db_operations_rollups.fetch_extensions(self.conn.cursor(), limit)
+        return [{'extension': extension, 'duplicate_files': count, 'reclaimable_bytes': total}
+                for extension, count, total in rows]
+
+    def get_top_groups(self, limit=50):
+        """
+        Returns the duplicate groups with the most reclaimable bytes.
+        """
+
+        rows = self.db_operations_rollups.fetch_top_groups(self.conn.cursor(), limit)
+        return [{'original_id': original_id, 'original_path': path, 'duplicate_files': count,
+                 'reclaimable_bytes': total} for original_id, path, count, total in rows]
 
     def fetch_files_and_duplicate_json(self):
         """
@@ -150,24 +789,21 @@ class DatabaseOperations:
             originals = self.fetch_files_and_duplicate_json()
             originals_and_duplicates = {}
 
-            # Collect all duplicate IDs
-            all_duplicate_ids = [dup_id for _, _, duplicate_ids_json in originals for dup_id in
-                                 json.loads(duplicate_ids_json)]
+            # Parse every JSON list once and remember which original each duplicate belongs to
+            original_by_duplicate = {}
+            for original_id, _, duplicate_ids_json in originals:
+                for dup_id in json.loads(duplicate_ids_json):
+                    original_by_duplicate[dup_id] = original_id
 
-            if all_duplicate_ids:
-                # Fetch all paths for duplicate IDs in a single query
-                cursor = self.conn.cursor()
-                query = "SELECT id, path, creation_time FROM files WHERE id IN ({0})"
-                query = query.format(",".join("?" * len(all_duplicate_ids)))
-                cursor.execute(query, all_duplicate_ids)
-                all_duplicates = cursor.fetchall()
+            if original_by_duplicate:
+                # Fetch all paths for duplicate IDs in chunked queries
+                all_duplicates = self.db_operations_files.fetch_files_by_ids(self.conn.cursor(),
+                                                                             original_by_duplicate.keys())
 
                 # Group duplicates by their original file
                 duplicates_by_original = {original_id: [] for original_id, _, _ in originals}
                 for dup_id, dup_path, create_time in all_duplicates:
-                    for original_id, _, duplicate_ids_json in originals:
-                        if dup_id in json.loads(duplicate_ids_json):
-                            duplicates_by_original[original_id].append((dup_id, dup_path, create_time))
+                    duplicates_by_original[original_by_duplicate[dup_id]].append((dup_id, dup_path, create_time))
 
                 # Map original paths to their duplicates
                 for original_id, original_path, _ in originals:
@@ -178,6 +814,100 @@ class DatabaseOperations:
         except sqlite3.Error as e:
             logging.error("Database error occurred while fetching duplicates summary: %s", e)
 
+    def get_duplicate_groups(self, after_id=0, limit=100):
+        """
+        Fetches one page of duplicate groups, ordered by original file ID (keyset pagination).
+        Each JSON list of duplicate IDs is parsed once and all duplicates of the page are resolved
+        with a single lookup on the primary key.
+
+        Args:
+            after_id (int): Cursor; only groups with an original ID greater than this value are returned.
+            limit (int): Maximum number of groups in the page.
+
+        Returns:
+            list: A list of dictionaries with the keys 'original_id', 'original_path', 'original_size'
+            and 'duplicates' (a list of dictionaries with 'id', 'path' and 'creation_time').
+        """
+
+        try:
+            cur = self.conn.cursor()
+            rows = self.db_operations_duplicates.fetch_duplicate_groups(cur, after_id or 0, limit)
+            return self._resolve_duplicate_groups(cur, rows)
+
+        except sqlite3.Error as e:
+            logging.error("Database error occurred while fetching duplicate groups: %s", e)
+            raise
+
+    def _resolve_duplicate_groups(self, cur, rows):
+        """
+        Turns rows (original_id, original_path, original_size, duplicate_ids_json, *extra) into group
+        dictionaries, resolving the duplicates of all rows with a single lookup on the primary key.
+        """
+
+        groups = []
+        for original_id, original_path, original_size, duplicate_ids_json, *_ in rows:
+            groups.append({
+                'original_id': original_id,
+                'original_path': original_path,
+                'original_size': original_size,
+                'duplicate_ids': json.loads(duplicate_ids_json),
+            })
+
+        all_duplicate_ids = [dup_id for group in groups for dup_id in group['duplicate_ids']]
+        files_by_id = {
+            file_id: {'id': file_id, 'path': path, 'creation_time': creation_time}
+            for file_id, path, creation_time in self.db_operations_files.fetch_files_by_ids(cur, all_duplicate_ids)
+        }
+
+        for group in groups:
+            duplicate_ids = group.pop('duplicate_ids')
+            group['duplicates'] = [files_by_id[dup_id] for dup_id in duplicate_ids if dup_id in files_by_id]
+
+        return groups
+
+    def iter_duplicate_groups(self, page_size=500):
+        """
+        Iterates over all duplicate groups page by page, without loading the whole table into memory.
+
+        Args:
+            page_size (int): Number of groups fetched per query.
+
+        Yields:
+            dict: A duplicate group as returned by get_duplicate_groups.
+        """
+
+        after_id = 0
+        while True:
+            groups = self.get_duplicate_groups(after_id, page_size)
+            if not groups:
+                return
+            yield from groups
+            after_id = groups[-1]['original_id']
+
+    def get_duplicates_summary(self):
+        """
+        Computes the number of duplicate groups, duplicate files and the bytes that
+        would be reclaimed by removing all duplicates.
+
+        Returns:
+            dict: A dictionary with the keys 'groups', 'duplicates' and 'reclaimable_bytes', and the
+            same figures for directory duplicate groups as 'directory_groups', 'directory_duplicates'
+            and 'directory_reclaimable_bytes'.
+        """
+
+        cur = self.conn.cursor()
+        group_count, duplicate_count, reclaimable_bytes = self.db_operations_duplicates.fetch_summary(cur)
+        directory_group_count, directory_duplicate_count, directory_reclaimable_bytes = \
+            self.db_operations_directory_duplicates.fetch_summary(cur)
+        return {
+            'groups': group_count,
+            'duplicates': duplicate_count,
+            'reclaimable_bytes': reclaimable_bytes,
+            'directory_groups': directory_group_count,
+            'directory_duplicates': directory_duplicate_count,
+            'directory_reclaimable_bytes': directory_reclaimable_bytes,
+        }
+
     def remove_duplicate_entry(self, duplicate_id):
         """
         Removes an entry from the 'duplicates' table based on the duplicate file ID.
@@ -205,6 +935,7 @@ class DatabaseOperations:
                         # Remove the duplicate ID
                         if duplicate_id in duplicate_ids:
                             duplicate_ids.remove(duplicate_id)
+                            self._apply_rollup_delta(original_id, [duplicate_id], -1)
                             if duplicate_ids:  # If there are more duplicates, update the entry
                                 cur.execute("UPDATE duplicates SET duplicate_ids = ? WHERE original_id = ?",
                                             (json.dumps(duplicate_ids), original_id))
@@ -0,0 +1,113 @@
+import sqlite3
+import json
+from sqlite3 import Cursor
+import logging
+
+logging.basicConfig(level=logging.WARN, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class DatabaseOperationsCheckpoints:
+    """
+    Class provides all database operations for the schema scan_checkpoints.
+
+    A checkpoint records how far the scan of a source directory got: the position in the walk
+    order up to which every file is hashed and committed to the index. It is written in the
+    same transaction as the files, so it never points past data that was lost.
+    """
+
+    def __init__(self, cursor: Cursor):
+        """
+        Initializes the DatabaseOperationsCheckpoints object, setting up the schema for the 'scan_checkpoints' table.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+        """
+
+        try:
+            self._initialize_schema_checkpoints(cursor)
+            logging.info("Database schema scan_checkpoints initialized successfully.")
+        except sqlite3.Error as e:
+            logging.error("Error initializing database: %s", str(e))
+            raise
+
+    def _initialize_schema_checkpoints(self, cursor: Cursor):
+        """
+        Creates the 'scan_checkpoints' table in the database if it does not exist.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+        """
+
+        cursor.execute("""
+                CREATE TABLE IF NOT EXISTS scan_checkpoints (
+                    source TEXT PRIMARY KEY,
+                    position TEXT,
+                    files_done INTEGER DEFAULT 0,
+                    completed INTEGER DEFAULT 0,
+                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+    def save(self, cursor: Cursor, source, position, files_done, completed=False):
+        """
+        Inserts or replaces the checkpoint of a source directory.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            source (str): The absolute path of the scanned directory.
+            position (tuple): Path components of the last file of the committed prefix, None if there is none.
+            files_done (int): Number of files processed by the scan so far.
+            completed (bool): True if the scan went through the whole directory.
+        """
+
+        try:
+            cursor.execute("""
+                INSERT INTO scan_checkpoints (source, position, files_done, completed, updated_at)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT (source) DO UPDATE SET
+                    position = excluded.position,
+                    files_done = excluded.files_done,
+                    completed = excluded.completed,
+                    updated_at = excluded.updated_at
+            """, (source, json.dumps(list(position)) if position else None, files_done, int(completed)))
+        except sqlite3.Error as e:
+            logging.error("Error saving the checkpoint of %s: %s", source, e)
+            raise
+
+    def fetch_sources(self, cursor: Cursor):
+        """
+        Fetches the source directories that have a checkpoint, i.e. that were scanned.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+
+        Returns:
+            list: The absolute paths of the source directories.
+        """
+
+        try:
+            cursor.execute("SELECT source FROM scan_checkpoints")
+            return [source for source, in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logging.error("Error fetching the scanned sources: %s", e)
+            raise
+
+    def fetch(self, cursor: Cursor, source):
+        """
+        Fetches the checkpoint of a source directory.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            source (str): The absolute path of the scanned directory.
+
+        Returns:
+            tuple: (position, files_done, completed, updated_at) or None if the source has no checkpoint.
+        """
+
+        cursor.execute("SELECT position, files_done, completed, updated_at FROM scan_checkpoints WHERE source = ?",
+                       (source,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        position, files_done, completed, updated_at = row
+        return (tuple(json.loads(position)) if position else None), files_done, bool(completed), updated_at
@@ -0,0 +1,199 @@
+import sqlite3
+from sqlite3 import Cursor
+import logging
+
+logging.basicConfig(level=logging.WARN, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class DatabaseOperationsChunks:
+    """
+    Class provides all database operations for the schemas chunks, file_chunks and chunked_files.
+
+    chunks stores every distinct content-defined chunk once, keyed by its 16 byte digest as a
+    BLOB in a table without rowid, so the key is the row. file_chunks lists the chunks of each
+    file in order and is indexed by digest to find the files sharing a chunk. chunked_files
+    records which content (hash) of a file was chunked, a file is chunked again when it changes.
+    """
+
+    def __init__(self, cursor: Cursor):
+        """
+        Initializes the DatabaseOperationsChunks object, setting up the schemas of its tables.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+        """
+
+        try:
+            self._initialize_schema_chunks(cursor)
+            logging.info("Database schema chunks initialized successfully.")
+        except sqlite3.Error as e:
+            logging.error("Error initializing database: %s", str(e))
+            raise
+
+    def _initialize_schema_chunks(self, cursor: Cursor):
+        """
+        Creates the 'chunks', 'file_chunks' and 'chunked_files' tables in the database if they do not exist.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+        """
+
+        cursor.execute("""
+                CREATE TABLE IF NOT EXISTS chunks (
+                    digest BLOB PRIMARY KEY,
+                    size INTEGER
+                ) WITHOUT ROWID
+            """)
+        cursor.execute("""
+                CREATE TABLE IF NOT EXISTS file_chunks (
+                    file_id INTEGER,
+                    seq INTEGER,
+                    digest BLOB,
+                    PRIMARY KEY (file_id, seq)
+                ) WITHOUT ROWID
+            """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_file_chunks_digest ON file_chunks (digest, file_id)")
+        cursor.execute("""
+                CREATE TABLE IF NOT EXISTS chunked_files (
+                    file_id INTEGER PRIMARY KEY,
+                    hash TEXT,
+                    chunk_count INTEGER
+                )
+            """)
+
+    def fetch_pending_files(self, cursor: Cursor, min_file_size):
+        """
+        Fetches the files that are not deleted, have at least the given size and were not chunked
+        with their current content.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            min_file_size (int): Smallest file size to chunk.
+
+        Returns:
+            list: A list of tuples (id, path, hash, size).
+        """
+
+        try:
+            cursor.execute("""
+                SELECT f.id, f.path, f.hash, f.size FROM files f
+                LEFT JOIN chunked_files c ON c.file_id = f.id
+                WHERE f.is_deleted = 0 AND f.size >= ? AND (c.file_id IS NULL OR c.hash IS NOT f.hash)
+                ORDER BY f.path
+            """, (min_file_size,))
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            logging.error("Error fetching the files to chunk: %s", e)
+            raise
+
+    def save_file_chunks(self, cursor: Cursor, chunked):
+        """
+        Replaces the chunks of several files in one batch.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            chunked (list): Tuples (file_id, file_hash, chunks) with chunks a list of (size, digest) in file order.
+
+        Returns:
+            int: The number of file_chunks rows written.
+        """
+
+        try:
+            file_ids = [(file_id,) for file_id, _, _ in chunked]
+            cursor.executemany("DELETE FROM file_chunks WHERE file_id = ?", file_ids)
+            cursor.executemany("INSERT OR IGNORE INTO chunks (digest, size) VALUES (?, ?)",
+                               [(digest, size) for _, _, chunks in chunked for size, digest in chunks])
+            rows = [(file_id, seq, digest) for file_id, _, chunks in chunked for seq, (_, digest) in enumerate(chunks)]
+            cursor.executemany("INSERT INTO file_chunks (file_id, seq, digest) VALUES (?, ?, ?)", rows)
+            cursor.executemany("INSERT OR REPLACE INTO chunked_files (file_id, hash, chunk_count) VALUES (?, ?, ?)",
+                               [(file_id, file_hash, len(chunks)) for file_id, file_hash, chunks in chunked])
+            return len(rows)
+        except sqlite3.Error as e:
+            logging.error("Error saving file chunks: %s", e)
+            raise
+
+    def remove_deleted_files(self, cursor: Cursor):
+        """
+        Removes the chunk lists of deleted files and the chunks no file refers to anymore.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+        """
+
+        try:
+            cursor.execute("""
+                DELETE FROM file_chunks WHERE file_id IN (
+                    SELECT c.file_id FROM chunked_files c LEFT JOIN files f ON f.id = c.file_id
+                    WHERE f.id IS NULL OR f.is_deleted = 1)
+            """)
+            cursor.execute("""
+                DELETE FROM chunked_files WHERE file_id NOT IN (SELECT id FROM files WHERE is_deleted = 0)
+            """)
+            # Served by the digest index of file_chunks, no scan per chunk
+            cursor.execute("""
+                DELETE FROM chunks WHERE NOT EXISTS (SELECT 1 FROM file_chunks fc WHERE fc.digest = chunks.digest)
+            """)
+        except sqlite3.Error as e:
+            logging.error("Error removing the chunks of deleted files: %s", e)
+            raise
+
+    def fetch_shared_bytes(self, cursor: Cursor, file_id, limit=50):
+        """
+        Fetches the files that share chunks with a file, with the number of bytes of the file
+        that they contain. A chunk repeated within a file is counted once.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            file_id (int): The ID of the file.
+            limit (int): Maximum number of files returned.
+
+        Returns:
+            list: A list of tuples (id, path, size, shared_bytes), most shared bytes first.
+        """
+
+        try:
+            cursor.execute("""
+                WITH own AS (
+                    SELECT DISTINCT fc.digest, c.size FROM file_chunks fc
+                    INNER JOIN chunks c ON c.digest = fc.digest
+                    WHERE fc.file_id = :file_id
+                ), other AS (
+                    SELECT DISTINCT fc.file_id, fc.digest FROM own
+                    INNER JOIN file_chunks fc ON fc.digest = own.digest
+                    WHERE fc.file_id != :file_id
+                )
+                SELECT f.id, f.path, f.size, SUM(own.size) AS shared_bytes FROM other
+                INNER JOIN own ON own.digest = other.digest
+                INNER JOIN files f ON f.id = other.file_id
+                WHERE f.is_deleted = 0
+                GROUP BY f.id
+                ORDER BY shared_bytes DESC, f.id
+                LIMIT :limit
+            """, {'file_id': file_id, 'limit': limit})
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            logging.error("Error fetching the files sharing chunks with %s: %s", file_id, e)
+            raise
+
+    def fetch_summary(self, cursor: Cursor):
+        """
+        Computes the number of chunked files, the bytes they hold and the bytes of their distinct chunks.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+
+        Returns:
+            tuple: (file_count, total_bytes, unique_bytes)
+        """
+
+        try:
+            cursor.execute("""
+                SELECT COUNT(*), COALESCE(SUM(f.size), 0) FROM chunked_files c
+                INNER JOIN files f ON f.id = c.file_id WHERE f.is_deleted = 0
+            """)
+            file_count, total_bytes = cursor.fetchone()
+            cursor.execute("SELECT COALESCE(SUM(size), 0) FROM chunks")
+            return file_count, total_bytes, cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            logging.error("Error computing the chunk summary: %s", e)
+            raise
@@ -0,0 +1,89 @@
+import sqlite3
+from sqlite3 import Cursor
+import logging
+
+logging.basicConfig(level=logging.WARN, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class DatabaseOperationsDirectories:
+    """
+    Class provides all database operations for the schema directories.
+
+    A directory stores its modification time from the last time its listing was compared with
+    the index. Creating, deleting or renaming an entry changes the modification time of its
+    directory, so while it is unchanged no indexed file of the directory can have disappeared
+    and the directory does not have to be listed again.
+    """
+
+    def __init__(self, cursor: Cursor):
+        """
+        Initializes the DatabaseOperationsDirectories object, setting up the schema for the 'directories' table.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+        """
+
+        try:
+            self._initialize_schema_directories(cursor)
+            logging.info("Database schema directories initialized successfully.")
+        except sqlite3.Error as e:
+            logging.error("Error initializing database: %s", str(e))
+            raise
+
+    def _initialize_schema_directories(self, cursor: Cursor):
+        """
+        Creates the 'directories' table in the database if it does not exist.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+        """
+
+        cursor.execute("""
+                CREATE TABLE IF NOT EXISTS directories (
+                    path TEXT PRIMARY KEY,
+                    mtime_ns INTEGER,
+                    checked_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+    def fetch_mtimes(self, cursor: Cursor):
+        """
+        Returns:
+            dict: The stored modification time in nanoseconds per directory path.
+        """
+
+        cursor.execute("SELECT path, mtime_ns FROM directories")
+        return dict(cursor.fetchall())
+
+    def save_mtimes(self, cursor: Cursor, mtimes):
+        """
+        Stores the modification times of checked directories.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            mtimes (dict): The modification time in nanoseconds per directory path, None to check it again next time.
+        """
+
+        try:
+            cursor.executemany("""
+                INSERT INTO directories (path, mtime_ns, checked_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT (path) DO UPDATE SET mtime_ns = excluded.mtime_ns, checked_at = excluded.checked_at
+            """, list(mtimes.items()))
+        except sqlite3.Error as e:
+            logging.error("Error saving directory modification times: %s", e)
+            raise
+
+    def remove(self, cursor: Cursor, paths):
+        """
+        Removes directories that no longer exist.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            paths (list): The directory paths.
+        """
+
+        try:
+            cursor.executemany("DELETE FROM directories WHERE path = ?", [(path,) for path in paths])
+        except sqlite3.Error as e:
+            logging.error("Error removing directories: %s", e)
+            raise
@@ -0,0 +1,186 @@
+import sqlite3
+import json
+from sqlite3 import Cursor
+import logging
+
+logging.basicConfig(level=logging.WARN, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class DatabaseOperationsDirectoryDuplicates:
+    """
+    Class provides all database operations for the schemas directory_hashes and directory_duplicates.
+
+    directory_hashes holds the Merkle hash of every directory with indexed files, computed
+    from the hashes of its files and subdirectories. directory_duplicates holds one group per
+    set of identical subtrees: the original directory and the directories that duplicate it.
+    Both tables are derived from the files and replaced as a whole by each dedupe run.
+    """
+
+    def __init__(self, cursor: Cursor):
+        """
+        Initializes the DatabaseOperationsDirectoryDuplicates object, setting up the schemas of its tables.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+        """
+
+        try:
+            self._initialize_schema_directory_duplicates(cursor)
+            logging.info("Database schema directory_duplicates initialized successfully.")
+        except sqlite3.Error as e:
+            logging.error("Error initializing database: %s", str(e))
+            raise
+
+    def _initialize_schema_directory_duplicates(self, cursor: Cursor):
+        """
+        Creates the 'directory_hashes' and 'directory_duplicates' tables in the database if they do not exist.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+        """
+
+        cursor.execute("""
+                CREATE TABLE IF NOT EXISTS directory_hashes (
+                    path TEXT PRIMARY KEY,
+                    hash TEXT,
+                    file_count INTEGER,
+                    size INTEGER,
+                    creation_time REAL
+                )
+            """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_directory_hashes_hash ON directory_hashes (hash)")
+        cursor.execute("""
+                CREATE TABLE IF NOT EXISTS directory_duplicates (
+                    id INTEGER PRIMARY KEY,
+                    hash TEXT,
+                    original_path TEXT,
+                    duplicate_paths TEXT,
+                    file_count INTEGER,
+                    size INTEGER
+                )
+            """)
+
+    def replace_hashes(self, cursor: Cursor, directory_hashes):
+        """
+        Replaces all directory hashes.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            directory_hashes (dict): Per directory path a tuple (hash, file_count, size, creation_time).
+        """
+
+        try:
+            cursor.execute("DELETE FROM directory_hashes")
+            cursor.executemany(
+                "INSERT INTO directory_hashes (path, hash, file_count, size, creation_time) VALUES (?, ?, ?, ?, ?)",
+                [(path,) + tuple(values) for path, values in directory_hashes.items()])
+        except sqlite3.Error as e:
+            logging.error("Error replacing directory hashes: %s", e)
+            raise
+
+    def replace_groups(self, cursor: Cursor, groups):
+        """
+        Replaces all directory duplicate groups.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            groups (list): Tuples (hash, original_path, duplicate_paths, file_count, size).
+        """
+
+        try:
+            cursor.execute("DELETE FROM directory_duplicates")
+            cursor.executemany("""
+                INSERT INTO directory_duplicates (hash, original_path, duplicate_paths, file_count, size)
+                VALUES (?, ?, ?, ?, ?)
+            """, [(directory_hash, original_path, json.dumps(duplicate_paths), file_count, size)
+                  for directory_hash, original_path, duplicate_paths, file_count, size in groups])
+        except sqlite3.Error as e:
+            logging.error("Error replacing directory duplicate groups: %s", e)
+            raise
+
+    def fetch_groups(self, cursor: Cursor, after_id=0, limit=100):
+        """
+        Fetches one page of directory duplicate groups, ordered by ID (keyset pagination).
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            after_id (int): Only groups with an ID greater than this value are returned.
+            limit (int): Maximum number of groups in the page.
+
+        Returns:
+            list: A list of tuples (id, hash, original_path, duplicate_paths, file_count, size).
+        """
+
+        try:
+            cursor.execute("""
+                SELECT id, hash, original_path, duplicate_paths, file_count, size FROM directory_duplicates
+                WHERE id > ? ORDER BY id LIMIT ?
+            """, (after_id, limit))
+            return [(group_id, directory_hash, original_path, json.loads(duplicate_paths), file_count, size)
+                    for group_id, directory_hash, original_path, duplicate_paths, file_count, size in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logging.error("Error fetching directory duplicate groups: %s", e)
+            raise
+
+    def fetch_creation_times(self, cursor: Cursor, paths, chunk_size=500):
+        """
+        Fetches the oldest creation time of the files below each of the given directories.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            paths (list): The directory paths.
+            chunk_size (int): Maximum number of paths bound per query.
+
+        Returns:
+            dict: The creation time by directory path.
+        """
+
+        paths = list(paths)
+        creation_times = {}
+        try:
+            for start in range(0, len(paths), chunk_size):
+                chunk = paths[start:start + chunk_size]
+                cursor.execute("SELECT path, creation_time FROM directory_hashes WHERE path IN ({0})".format(
+                    ",".join("?" * len(chunk))), chunk)
+                creation_times.update(cursor.fetchall())
+            return creation_times
+        except sqlite3.Error as e:
+            logging.error("Error fetching directory creation times: %s", e)
+            raise
+
+    def fetch_summary(self, cursor: Cursor):
+        """
+        Computes aggregate figures over all directory duplicate groups.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+
+        Returns:
+            tuple: (group_count, duplicate_count, reclaimable_bytes)
+        """
+
+        try:
+            cursor.execute("""
+                SELECT COUNT(*), COALESCE(SUM(json_array_length(duplicate_paths)), 0),
+                    COALESCE(SUM(json_array_length(duplicate_paths) * size), 0)
+                FROM directory_duplicates
+            """)
+            return cursor.fetchone()
+        except sqlite3.Error as e:
+            logging.error("Error computing the directory duplicates summary: %s", e)
+            raise
+
+    def remove_group(self, cursor: Cursor, group_id):
+        """
+        Removes a directory duplicate group, e.g. after its duplicates were moved.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            group_id (int): The ID of the group.
+        """
+
+        try:
+            cursor.execute("DELETE FROM directory_duplicates WHERE id = ?", (group_id,))
+        except sqlite3.Error as e:
+            logging.error("Error removing directory duplicate group %s: %s", group_id, e)
+            raise
@@ -34,7 +34,76 @@ class DatabaseOperationsDuplicates:
             logging.error("Error fetching all duplicates: %s", e)
             raise
 
+    def fetch_duplicate_groups(self, cursor: Cursor, after_id=0, limit=100):
+        """
+        Fetches one page of duplicate groups using keyset pagination on the 'original_id' primary key.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            after_id (int): Only groups with an original ID greater than this value are returned.
+            limit (int): Maximum number of groups to return.
+
+        Returns:
+            list: A list of tuples (original_id, original_path, original_size, duplicate_ids_json),
+            ordered by original ID.
+        """
+
+        try:
+            cursor.execute("""
+                SELECT d.original_id, f.path, f.size, d.duplicate_ids
+                FROM duplicates d
+                INNER JOIN files f ON f.id = d.original_id
+                WHERE d.original_id > ? AND f.is_deleted = 0
+                ORDER BY d.original_id
+                LIMIT ?
+            """, (after_id, limit))
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            logging.error("Error fetching duplicate groups: %s", e)
+            raise
+
+    def fetch_summary(self, cursor: Cursor):
+        """
+        Computes aggregate figures over all duplicate groups whose original file is not deleted.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+
+        Returns:
+            tuple: (group_count, duplicate_count, reclaimable_bytes)
+        """
+
+        try:
+            cursor.execute("""
+                SELECT COUNT(*), COALESCE(SUM(json_array_length(d.duplicate_ids)), 0)
+                FROM duplicates d
+                INNER JOIN files f ON f.id = d.original_id
+                WHERE f.is_deleted = 0
+            """)
+            group_count, duplicate_count = cursor.fetchone()
+
+            cursor.execute("""
+                SELECT COALESCE(SUM(dup.size), 0)
+                FROM duplicates d
+                INNER JOIN files f ON f.id = d.original_id
+                INNER JOIN json_each(d.duplicate_ids) j
+                INNER JOIN files dup ON dup.id = j.value
+                WHERE f.is_deleted = 0 AND dup.is_deleted = 0
+            """)
+            reclaimable_bytes = cursor.fetchone()[0]
+
+            return group_count, duplicate_count, reclaimable_bytes
+        except sqlite3.Error as e:
+            logging.error("Error computing duplicates summary: %s", e)
+            raise
+
     def add_duplicates(self, cursor: Cursor, original_id, duplicate_ids):
+        """
+        Adds duplicate IDs to the group of an original file.
+
+        Returns:
+            list: The duplicate IDs that were not part of the group before.
+        """
         try:
             # Check if original_id already has an entry in the duplicates table
             cursor.execute("SELECT duplicate_ids FROM duplicates WHERE original_id = ?", (original_id,))
@@ -52,38 +121,161 @@ class DatabaseOperationsDuplicates:
                 
                 # Update the existing entry with new unique duplicate_ids
                 cursor.execute("UPDATE duplicates SET duplicate_ids = ? WHERE original_id = ?", (new_duplicate_ids_json, original_id))
+                return list(new_duplicate_ids_set - existing_duplicate_ids_set)
             else:
                 # Insert new entry into duplicates table with the unique list of duplicate IDs
                 cursor.execute("INSERT INTO duplicates (original_id, duplicate_ids) VALUES (?, ?)", (original_id, json.dumps(duplicate_ids)))
+                return list(duplicate_ids)
 
         except sqlite3.Error as e:
             logging.error("Error processing duplicates: %s", e)
             raise
 
-    def remove_marked_deleted(self, cursor: Cursor, id):
+    def fetch_groups_by_hashes(self, cursor: Cursor, hashes, chunk_size=500):
+        """
+        Fetches the duplicate groups whose original file has one of the given hashes.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            hashes (list): The content hashes.
+            chunk_size (int): Maximum number of hashes bound per query.
+
+        Returns:
+            list: A list of tuples (original_id, duplicate_ids).
+        """
+
+        hashes = list(hashes)
+        groups = []
         try:
-            # Find all duplicate entries where this file ID is present
-            cursor.execute("SELECT original_id, duplicate_ids FROM duplicates")
-            duplicates = cursor.fetchall()
+            for start in range(0, len(hashes), chunk_size):
+                chunk = hashes[start:start + chunk_size]
+                cursor.execute("""
+                    SELECT d.original_id, d.duplicate_ids
+                    FROM duplicates d
+                    INNER JOIN files f ON f.id = d.original_id
+                    WHERE f.hash IN ({0})
+                """.format(",".join("?" * len(chunk))), chunk)
+                groups.extend((original_id, json.loads(duplicate_ids)) for original_id, duplicate_ids in cursor.fetchall())
+            return groups
+        except sqlite3.Error as e:
+            logging.error("Error fetching duplicate groups by hash: %s", e)
+            raise
 
-            for original_id, duplicate_ids_json in duplicates:
-                duplicate_ids = json.loads(duplicate_ids_json)
-                
-                # If the file ID is in the duplicate IDs, remove it
-                if id in duplicate_ids:
-                    duplicate_ids.remove(id)
+    def fetch_original_hashes(self, cursor: Cursor, file_ids, chunk_size=500):
+        """
+        Fetches the hashes of the given files that are the original of a duplicate group.
 
-                    if duplicate_ids:  # If there are more duplicates, update the entry
-                        updated_json = json.dumps(duplicate_ids)
-                        cursor.execute("UPDATE duplicates SET duplicate_ids = ? WHERE original_id = ?", (updated_json, original_id))
-                    else:  # If no more duplicates, delete the entry
-                        cursor.execute("DELETE FROM duplicates WHERE original_id = ?", (original_id,))
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            file_ids (list): The file IDs.
+            chunk_size (int): Maximum number of IDs bound per query.
 
+        Returns:
+            set: The content hashes of the groups whose original is one of the files.
+        """
 
+        file_ids = list(file_ids)
+        hashes = set()
+        try:
+            for start in range(0, len(file_ids), chunk_size):
+                chunk = file_ids[start:start + chunk_size]
+                cursor.execute("""
+                    SELECT f.hash
+                    FROM duplicates d
+                    INNER JOIN files f ON f.id = d.original_id
+                    WHERE d.original_id IN ({0})
+                """.format(",".join("?" * len(chunk))), chunk)
+                hashes.update(file_hash for file_hash, in cursor.fetchall())
+            return hashes
         except sqlite3.Error as e:
-            logging.error("Error processing duplicates: %s", e)
+            logging.error("Error fetching the hashes of group originals: %s", e)
             raise
 
-        
+    def fetch_deleted_original_hashes(self, cursor: Cursor):
+        """
+        Fetches the hashes of the duplicate groups whose original file is marked as deleted.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+
+        Returns:
+            set: The content hashes of the groups.
+        """
+
+        try:
+            cursor.execute("""
+                SELECT DISTINCT f.hash
+                FROM duplicates d
+                INNER JOIN files f ON f.id = d.original_id
+                WHERE f.is_deleted = 1
+            """)
+            return {file_hash for file_hash, in cursor.fetchall()}
+        except sqlite3.Error as e:
+            logging.error("Error fetching the hashes of deleted group originals: %s", e)
+            raise
+
+    def remove_groups(self, cursor: Cursor, original_ids):
+        """
+        Deletes the duplicate groups of the given original files.
+        """
+        try:
+            cursor.executemany("DELETE FROM duplicates WHERE original_id = ?", [(original_id,) for original_id in original_ids])
+        except sqlite3.Error as e:
+            logging.error("Error removing duplicate groups: %s", e)
+            raise
 
-        
+    def remove_files(self, cursor: Cursor, file_ids):
+        """
+        Removes several file IDs from every duplicate group that contains them with set based
+        statements. All members of a group share the hash of its original, so the groups are
+        found through the hash index of the files instead of reading every group.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            file_ids (list): The IDs of the files to remove, e.g. deleted files.
+
+        Returns:
+            dict: The removed file IDs per original ID of the groups they were removed from.
+        """
+        try:
+            cursor.execute("CREATE TEMP TABLE IF NOT EXISTS removed_files (id INTEGER PRIMARY KEY)")
+            cursor.execute("CREATE TEMP TABLE IF NOT EXISTS affected_groups (original_id INTEGER PRIMARY KEY)")
+            cursor.execute("DELETE FROM temp.removed_files")
+            cursor.execute("DELETE FROM temp.affected_groups")
+            cursor.executemany("INSERT OR IGNORE INTO temp.removed_files (id) VALUES (?)",
+                               [(file_id,) for file_id in file_ids])
+
+            cursor.execute("""
+                SELECT DISTINCT d.original_id, j.value
+                FROM temp.removed_files r
+                INNER JOIN files removed ON removed.id = r.id
+                INNER JOIN files original ON original.hash = removed.hash
+                INNER JOIN duplicates d ON d.original_id = original.id
+                INNER JOIN json_each(d.duplicate_ids) j
+                WHERE j.value IN (SELECT id FROM temp.removed_files)
+            """)
+            removed = {}
+            for original_id, file_id in cursor.fetchall():
+                removed.setdefault(original_id, []).append(file_id)
+            if not removed:
+                return removed
+
+            cursor.executemany("INSERT INTO temp.affected_groups (original_id) VALUES (?)",
+                               [(original_id,) for original_id in removed])
+            cursor.execute("""
+                UPDATE duplicates SET duplicate_ids = (
+                    SELECT json_group_array(j.value) FROM json_each(duplicates.duplicate_ids) j
+                    WHERE j.value NOT IN (SELECT id FROM temp.removed_files)
+                )
+                WHERE original_id IN (SELECT original_id FROM temp.affected_groups)
+            """)
+            cursor.execute("""
+                DELETE FROM duplicates
+                WHERE original_id IN (SELECT original_id FROM temp.affected_groups)
+                AND json_array_length(duplicate_ids) = 0
+            """)
+            return removed
+
+        except sqlite3.Error as e:
+            logging.error("Error removing files from duplicate groups: %s", e)
+            raise
@@ -33,7 +33,7 @@ class DatabaseOperationsFiles:
 
         cursor.execute("""
                 CREATE TABLE IF NOT EXISTS files (
-                    id BIGSERIAL PRIMARY KEY,
+                    id INTEGER PRIMARY KEY,
                     hash TEXT,
                     path TEXT,
                     size INTEGER,
@@ -41,13 +41,32 @@ class DatabaseOperationsFiles:
                     access_time REAL,
                     creation_time REAL,
                     date_added TEXT DEFAULT CURRENT_TIMESTAMP,
-                    is_deleted INTEGER DEFAULT 0
+                    is_deleted INTEGER DEFAULT 0,
+                    hash_algorithm TEXT,
+                    hash_range_size INTEGER
+                )
+            """)
+        # Indexes created before the hash algorithm was recorded: their hashes are sample hashes (NULL)
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(files)")}
+        for column, column_type in (("hash_algorithm", "TEXT"), ("hash_range_size", "INTEGER")):
+            if column not in columns:
+                cursor.execute("ALTER TABLE files ADD COLUMN {0} {1}".format(column, column_type))
+        # Point lookups of the continuous indexer: files by path (also ranges below a directory)
+        # and the members of a duplicate group by hash
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_files_path ON files (path)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_files_hash ON files (hash)")
+        # Files whose path or hash changed after they were inserted, read by the Bloom filters of
+        # the index to catch up (see IndexPrefilter). AUTOINCREMENT: ids of trimmed rows are not reused.
+        cursor.execute("""
+                CREATE TABLE IF NOT EXISTS file_changes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    file_id INTEGER
                 )
             """)
 
     def fetch_files(self, cursor: Cursor):
         """
-        Fetches all file records from the 'files' table in the database.
+        Fetches the file records from the 'files' table that are not deleted, the members of the duplicate groups.
 
         Args:
             cursor (Cursor): A SQLite cursor object to execute database operations.
@@ -57,12 +76,62 @@ class DatabaseOperationsFiles:
         """
 
         try:
-            cursor.execute("SELECT id, hash, creation_time FROM files")
+            cursor.execute("SELECT id, hash, creation_time FROM files WHERE is_deleted = 0")
             return cursor.fetchall()
         except sqlite3.Error as e:
             logging.error("Error fetching all files: %s", e)
             raise
 
+    def iter_live_files(self, cursor: Cursor, columns=("path", "hash", "size", "creation_time")):
+        """
+        Iterates over the given columns of the files that are not deleted, without loading them all at once.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object used only for this iteration.
+            columns (tuple): The columns of the 'files' table to return.
+
+        Yields:
+            tuple: The requested columns of a file.
+        """
+
+        try:
+            cursor.execute("SELECT {0} FROM files WHERE is_deleted = 0 AND hash IS NOT NULL".format(", ".join(columns)))
+            while True:
+                rows = cursor.fetchmany(10000)
+                if not rows:
+                    return
+                yield from rows
+        except sqlite3.Error as e:
+            logging.error("Error iterating over files: %s", e)
+            raise
+
+    def iter_live_files_by_hash(self, cursor: Cursor):
+        """
+        Iterates over the files that are not deleted in the order of hash, size and path, the order
+        of an index shard, without loading them all at once. SQLite sorts in its temporary storage.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object used only for this iteration.
+
+        Yields:
+            tuple: (id, path, hash, size, hash_algorithm, hash_range_size) of a file.
+        """
+
+        try:
+            cursor.execute("""
+                SELECT id, path, hash, size, hash_algorithm, hash_range_size FROM files
+                WHERE is_deleted = 0 AND hash IS NOT NULL
+                ORDER BY hash, size, path
+            """)
+            while True:
+                rows = cursor.fetchmany(10000)
+                if not rows:
+                    return
+                yield from rows
+        except sqlite3.Error as e:
+            logging.error("Error iterating over files by hash: %s", e)
+            raise
+
     def add_files(self, cursor: Cursor, file_data_list):
         """
         Inserts multiple file data entries into the 'files' table in the database.
@@ -73,8 +142,10 @@ class DatabaseOperationsFiles:
         """
 
         query = """
-            INSERT INTO files (hash, path, size, modification_time, access_time, creation_time)
-            VALUES (:hash, :path, :size, :modification_time, :access_time, :creation_time)
+            INSERT INTO files (hash, path, size, modification_time, access_time, creation_time,
+                               hash_algorithm, hash_range_size)
+            VALUES (:hash, :path, :size, :modification_time, :access_time, :creation_time,
+                    :hash_algorithm, :hash_range_size)
         """
         try:
             cursor.executemany(query, file_data_list)
@@ -83,6 +154,326 @@ class DatabaseOperationsFiles:
             logging.error("Error inserting batch into database: %s", e)
             raise
 
+    def fetch_files_by_ids(self, cursor: Cursor, file_ids, chunk_size=500, columns=("id", "path", "creation_time")):
+        """
+        Fetches the given columns (by default id, path and creation time) for the given file IDs.
+        The IDs are queried in chunks to stay below the SQLite variable limit.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            file_ids (list): The IDs of the files to fetch.
+            chunk_size (int): Maximum number of IDs bound per query.
+            columns (tuple): The columns of the 'files' table to return.
+
+        Returns:
+            list: A list of tuples with the requested columns.
+        """
+
+        file_ids = list(file_ids)
+        rows = []
+        try:
+            for start in range(0, len(file_ids), chunk_size):
+                chunk = file_ids[start:start + chunk_size]
+                query = "SELECT {0} FROM files WHERE id IN ({1})".format(", ".join(columns), ",".join("?" * len(chunk)))
+                cursor.execute(query, chunk)
+                rows.extend(cursor.fetchall())
+            return rows
+        except sqlite3.Error as e:
+            logging.error("Error fetching files by id: %s", e)
+            raise
+
+    def fetch_files_by_paths(self, cursor: Cursor, paths, chunk_size=500,
+                             columns=("id", "path", "hash", "size", "modification_time")):
+        """
+        Fetches the given columns for the files that are not deleted and have one of the given paths.
+        The paths are queried in chunks to stay below the SQLite variable limit.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            paths (list): The paths of the files to fetch.
+            chunk_size (int): Maximum number of paths bound per query.
+            columns (tuple): The columns of the 'files' table to return.
+
+        Returns:
+            list: A list of tuples with the requested columns.
+        """
+
+        paths = list(paths)
+        rows = []
+        try:
+            for start in range(0, len(paths), chunk_size):
+                chunk = paths[start:start + chunk_size]
+                query = "SELECT {0} FROM files WHERE is_deleted = 0 AND path IN ({1})".format(
+                    ", ".join(columns), ",".join("?" * len(chunk)))
+                cursor.execute(query, chunk)
+                rows.extend(cursor.fetchall())
+            return rows
+        except sqlite3.Error as e:
+            logging.error("Error fetching files by path: %s", e)
+            raise
+
+    def fetch_files_by_hashes(self, cursor: Cursor, hashes, chunk_size=500):
+        """
+        Fetches id, hash and creation time of the files that are not deleted and have one of the given hashes.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            hashes (list): The content hashes.
+            chunk_size (int): Maximum number of hashes bound per query.
+
+        Returns:
+            list: A list of tuples (id, hash, creation_time).
+        """
+
+        hashes = list(hashes)
+        rows = []
+        try:
+            for start in range(0, len(hashes), chunk_size):
+                chunk = hashes[start:start + chunk_size]
+                cursor.execute("SELECT id, hash, creation_time FROM files WHERE is_deleted = 0 AND hash IN ({0})".format(
+                    ",".join("?" * len(chunk))), chunk)
+                rows.extend(cursor.fetchall())
+            return rows
+        except sqlite3.Error as e:
+            logging.error("Error fetching files by hash: %s", e)
+            raise
+
+    def fetch_files_below(self, cursor: Cursor, directory, separator="/",
+                          columns=("id", "path", "hash", "size", "modification_time")):
+        """
+        Fetches the given columns for the files that are not deleted and lie below a directory.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            directory (str): The directory, without trailing separator.
+            separator (str): The path separator.
+            columns (tuple): The columns of the 'files' table to return.
+
+        Returns:
+            list: A list of tuples with the requested columns.
+        """
+
+        # A range on the path index instead of LIKE, which would treat '%' and '_' in names as wildcards
+        prefix = directory + separator
+        upper = directory + chr(ord(separator) + 1)
+        try:
+            cursor.execute("SELECT {0} FROM files WHERE is_deleted = 0 AND path >= ? AND path < ?".format(
+                ", ".join(columns)), (prefix, upper))
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            logging.error("Error fetching files below %s: %s", directory, e)
+            raise
+
+    def fetch_directories(self, cursor: Cursor, separator="/"):
+        """
+        Fetches the distinct directories that contain files that are not deleted.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            separator (str): The path separator.
+
+        Returns:
+            list: The directory paths, without trailing separator.
+        """
+
+        # rtrim strips the characters of the file name, which are all but the separator, up to the last separator
+        try:
+            cursor.execute("SELECT DISTINCT rtrim(path, replace(path, ?, '')) FROM files WHERE is_deleted = 0",
+                           (separator,))
+            return [directory[:-1] or directory for directory, in cursor.fetchall() if directory]
+        except sqlite3.Error as e:
+            logging.error("Error fetching directories: %s", e)
+            raise
+
+    def fetch_files_in_directory(self, cursor: Cursor, directory, separator="/"):
+        """
+        Fetches id and path of the files that are not deleted and lie directly in a directory.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            directory (str): The directory, without trailing separator.
+            separator (str): The path separator.
+
+        Returns:
+            list: A list of tuples (id, path).
+        """
+
+        prefix = directory if directory.endswith(separator) else directory + separator
+        upper = prefix[:-1] + chr(ord(separator) + 1)
+        try:
+            cursor.execute("""
+                SELECT id, path FROM files
+                WHERE is_deleted = 0 AND path >= ? AND path < ? AND instr(substr(path, ?), ?) = 0
+            """, (prefix, upper, len(prefix) + 1, separator))
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            logging.error("Error fetching the files of %s: %s", directory, e)
+            raise
+
+    def update_files(self, cursor: Cursor, file_data_list):
+        """
+        Replaces the metadata of existing files, e.g. after their content changed.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            file_data_list (list): File data dictionaries as for add_files, with the 'id' of the file.
+        """
+
+        query = """
+            UPDATE files SET hash = :hash, path = :path, size = :size, modification_time = :modification_time,
+                access_time = :access_time, creation_time = :creation_time, hash_algorithm = :hash_algorithm,
+                hash_range_size = :hash_range_size, is_deleted = 0
+            WHERE id = :id
+        """
+        try:
+            cursor.executemany(query, file_data_list)
+            cursor.executemany("INSERT INTO file_changes (file_id) VALUES (?)",
+                               [(file_data['id'],) for file_data in file_data_list])
+        except sqlite3.Error as e:
+            logging.error("Error updating files: %s", e)
+            raise
+
+    def update_paths(self, cursor: Cursor, paths_by_id):
+        """
+        Changes the paths of files that were moved or renamed.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            paths_by_id (dict): The new path per file ID.
+        """
+
+        try:
+            cursor.executemany("UPDATE files SET path = ? WHERE id = ?",
+                               [(path, file_id) for file_id, path in paths_by_id.items()])
+            cursor.executemany("INSERT INTO file_changes (file_id) VALUES (?)", [(file_id,) for file_id in paths_by_id])
+        except sqlite3.Error as e:
+            logging.error("Error updating file paths: %s", e)
+            raise
+
+    def mark_many_as_deleted(self, cursor: Cursor, file_ids):
+        """
+        Marks several file entries as deleted in the 'files' table in the database.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            file_ids (list): The IDs of the files to be marked as deleted.
+        """
+
+        try:
+            cursor.executemany("UPDATE files SET is_deleted = 1 WHERE id = ?", [(file_id,) for file_id in file_ids])
+        except sqlite3.Error as e:
+            logging.error("Error marking files as deleted: %s", e)
+            raise
+
+    def fetch_existing_paths(self, cursor: Cursor, paths, chunk_size=500):
+        """
+        Returns the given paths of files in the 'files' table that are not deleted, like get_existing_paths
+        but with point lookups on the path index. The paths are queried in chunks to stay below the
+        SQLite variable limit.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            paths (list): The paths to look up.
+            chunk_size (int): Maximum number of paths bound per query.
+
+        Returns:
+            set: The paths that were found.
+        """
+
+        paths = list(paths)
+        found = set()
+        try:
+            for start in range(0, len(paths), chunk_size):
+                chunk = paths[start:start + chunk_size]
+                cursor.execute("SELECT path FROM files WHERE is_deleted = 0 AND path IN ({0})".format(
+                    ",".join("?" * len(chunk))), chunk)
+                found.update(path for path, in cursor.fetchall())
+            return found
+        except sqlite3.Error as e:
+            logging.error("Error looking up existing paths: %s", e)
+            raise
+
+    def iter_files_after(self, cursor: Cursor, file_id):
+        """
+        Iterates over id, path and hash of the files inserted after the given file ID, in ID order.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object used only for this iteration.
+            file_id (int): The last file ID that was already read.
+
+        Yields:
+            tuple: (id, path, hash) of a file.
+        """
+
+        try:
+            cursor.execute("SELECT id, path, hash FROM files WHERE id > ? ORDER BY id", (file_id,))
+            while True:
+                rows = cursor.fetchmany(10000)
+                if not rows:
+                    return
+                yield from rows
+        except sqlite3.Error as e:
+            logging.error("Error iterating over new files: %s", e)
+            raise
+
+    def fetch_change_bounds(self, cursor: Cursor):
+        """
+        Returns:
+            tuple: (lowest id kept in 'file_changes', highest id ever written) or None for either if there is none.
+        """
+
+        try:
+            cursor.execute("SELECT MIN(id) FROM file_changes")
+            lowest = cursor.fetchone()[0]
+            cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'file_changes'")
+            row = cursor.fetchone()
+            return lowest, row[0] if row else None
+        except sqlite3.Error as e:
+            logging.error("Error fetching the file change bounds: %s", e)
+            raise
+
+    def iter_changes_after(self, cursor: Cursor, change_id):
+        """
+        Iterates over the current path and hash of the files changed after the given change ID, in change order.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object used only for this iteration.
+            change_id (int): The last change ID that was already read.
+
+        Yields:
+            tuple: (change id, path, hash) of a changed file.
+        """
+
+        try:
+            cursor.execute("""
+                SELECT file_changes.id, files.path, files.hash FROM file_changes
+                JOIN files ON files.id = file_changes.file_id
+                WHERE file_changes.id > ? ORDER BY file_changes.id
+            """, (change_id,))
+            while True:
+                rows = cursor.fetchmany(10000)
+                if not rows:
+                    return
+                yield from rows
+        except sqlite3.Error as e:
+            logging.error("Error iterating over file changes: %s", e)
+            raise
+
+    def trim_changes(self, cursor: Cursor, change_id):
+        """
+        Removes the file changes up to the given change ID.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            change_id (int): The last change ID to remove.
+        """
+
+        try:
+            cursor.execute("DELETE FROM file_changes WHERE id <= ?", (change_id,))
+        except sqlite3.Error as e:
+            logging.error("Error trimming file changes: %s", e)
+            raise
+
     def get_existing_paths(self, cursor: Cursor):
 
         """
@@ -94,7 +485,8 @@ class DatabaseOperationsFiles:
         """
 
         try:
-            cursor.execute("SELECT path FROM files")
+            # A file that comes back at the path of a deleted entry is indexed again
+            cursor.execute("SELECT path FROM files WHERE is_deleted = 0")
             paths = cursor.fetchall()  # This will get all paths as a list of tuples
             return set(path[0] for path in paths)  # Convert to a set of strings
         except Exception as e:
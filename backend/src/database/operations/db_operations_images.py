@@ -0,0 +1,193 @@
+import sqlite3
+import json
+from sqlite3 import Cursor
+import logging
+
+logging.basicConfig(level=logging.WARN, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+def _to_signed(fingerprint):
+    # SQLite integers are signed 64 bit, a 64 bit fingerprint is stored in two's complement
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+
+def _to_unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+
+class DatabaseOperationsImages:
+    """
+    Class provides all database operations for the schemas image_hashes and near_duplicates.
+
+    image_hashes stores the perceptual fingerprint of an image per content hash, so identical
+    copies are decoded once and a file is fingerprinted again only when its content changes.
+    An image that could not be decoded has no fingerprint. near_duplicates holds the groups of
+    images that look alike, in the layout of the 'duplicates' table, replaced by each run.
+    """
+
+    def __init__(self, cursor: Cursor):
+        """
+        Initializes the DatabaseOperationsImages object, setting up the schemas of its tables.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+        """
+
+        try:
+            self._initialize_schema_images(cursor)
+            logging.info("Database schema images initialized successfully.")
+        except sqlite3.Error as e:
+            logging.error("Error initializing database: %s", str(e))
+            raise
+
+    def _initialize_schema_images(self, cursor: Cursor):
+        """
+        Creates the 'image_hashes' and 'near_duplicates' tables in the database if they do not exist.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+        """
+
+        cursor.execute("""
+                CREATE TABLE IF NOT EXISTS image_hashes (
+                    hash TEXT PRIMARY KEY,
+                    fingerprint INTEGER
+                )
+            """)
+        cursor.execute("""
+                CREATE TABLE IF NOT EXISTS near_duplicates (
+                    original_id INTEGER PRIMARY KEY,
+                    duplicate_ids TEXT,
+                    max_distance INTEGER
+                )
+            """)
+
+    def fetch_pending(self, cursor: Cursor, extensions):
+        """
+        Fetches one path per content hash of the images that have no fingerprint entry yet.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            extensions (list): The file extensions of images, lower case with the dot.
+
+        Returns:
+            list: A list of tuples (hash, path).
+        """
+
+        if not extensions:
+            return []
+        try:
+            cursor.execute("""
+                SELECT f.hash, MIN(f.path) FROM files f
+                LEFT JOIN image_hashes i ON i.hash = f.hash
+                WHERE f.is_deleted = 0 AND f.hash IS NOT NULL AND i.hash IS NULL AND ({0})
+                GROUP BY f.hash
+            """.format(" OR ".join(["lower(f.path) LIKE ?"] * len(extensions))),
+                ["%" + extension for extension in extensions])
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            logging.error("Error fetching the images to fingerprint: %s", e)
+            raise
+
+    def save_fingerprints(self, cursor: Cursor, fingerprints):
+        """
+        Stores fingerprints by content hash.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            fingerprints (list): Tuples (hash, fingerprint), fingerprint None for an image that could not be decoded.
+        """
+
+        try:
+            cursor.executemany("INSERT OR REPLACE INTO image_hashes (hash, fingerprint) VALUES (?, ?)",
+                               [(file_hash, None if fingerprint is None else _to_signed(fingerprint))
+                                for file_hash, fingerprint in fingerprints])
+        except sqlite3.Error as e:
+            logging.error("Error saving image fingerprints: %s", e)
+            raise
+
+    def remove_stale(self, cursor: Cursor):
+        """
+        Removes the fingerprints of contents no file that is not deleted has anymore.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+        """
+
+        try:
+            cursor.execute("""
+                DELETE FROM image_hashes WHERE NOT EXISTS (
+                    SELECT 1 FROM files f WHERE f.hash = image_hashes.hash AND f.is_deleted = 0)
+            """)
+        except sqlite3.Error as e:
+            logging.error("Error removing stale image fingerprints: %s", e)
+            raise
+
+    def fetch_fingerprinted_files(self, cursor: Cursor):
+        """
+        Fetches the files that are not deleted and whose content has a fingerprint.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+
+        Returns:
+            list: A list of tuples (id, hash, size, creation_time, fingerprint).
+        """
+
+        try:
+            cursor.execute("""
+                SELECT f.id, f.hash, f.size, f.creation_time, i.fingerprint FROM files f
+                INNER JOIN image_hashes i ON i.hash = f.hash
+                WHERE f.is_deleted = 0 AND i.fingerprint IS NOT NULL
+            """)
+            return [(file_id, file_hash, size, creation_time, _to_unsigned(fingerprint))
+                    for file_id, file_hash, size, creation_time, fingerprint in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logging.error("Error fetching image fingerprints: %s", e)
+            raise
+
+    def replace_groups(self, cursor: Cursor, groups):
+        """
+        Replaces all near duplicate groups.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            groups (list): Tuples (original_id, duplicate_ids, max_distance).
+        """
+
+        try:
+            cursor.execute("DELETE FROM near_duplicates")
+            cursor.executemany("INSERT INTO near_duplicates (original_id, duplicate_ids, max_distance) VALUES (?, ?, ?)",
+                               [(original_id, json.dumps(duplicate_ids), max_distance)
+                                for original_id, duplicate_ids, max_distance in groups])
+        except sqlite3.Error as e:
+            logging.error("Error replacing near duplicate groups: %s", e)
+            raise
+
+    def fetch_groups(self, cursor: Cursor, after_id=0, limit=100):
+        """
+        Fetches one page of near duplicate groups using keyset pagination on the 'original_id' primary key.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            after_id (int): Only groups with an original ID greater than this value are returned.
+            limit (int): Maximum number of groups to return.
+
+        Returns:
+            list: A list of tuples (original_id, original_path, original_size, duplicate_ids_json, max_distance),
+            ordered by original ID.
+        """
+
+        try:
+            cursor.execute("""
+                SELECT n.original_id, f.path, f.size, n.duplicate_ids, n.max_distance
+                FROM near_duplicates n
+                INNER JOIN files f ON f.id = n.original_id
+                WHERE n.original_id > ? AND f.is_deleted = 0
+                ORDER BY n.original_id
+                LIMIT ?
+            """, (after_id, limit))
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            logging.error("Error fetching near duplicate groups: %s", e)
+            raise
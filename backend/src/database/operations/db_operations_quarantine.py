@@ -0,0 +1,108 @@
+import sqlite3
+from sqlite3 import Cursor
+import logging
+
+logging.basicConfig(level=logging.WARN, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class DatabaseOperationsQuarantine:
+    """
+    Class provides all database operations for the schema quarantine.
+
+    The quarantine lists files whose hashing timed out or crashed a worker, e.g. files on a
+    stale network mount or a failing disk. They are retried by the following scans until
+    they fail max_retries times, then skipped until they are released.
+    """
+
+    def __init__(self, cursor: Cursor):
+        """
+        Initializes the DatabaseOperationsQuarantine object, setting up the schema for the 'quarantine' table.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+        """
+
+        try:
+            self._initialize_schema_quarantine(cursor)
+            logging.info("Database schema quarantine initialized successfully.")
+        except sqlite3.Error as e:
+            logging.error("Error initializing database: %s", str(e))
+            raise
+
+    def _initialize_schema_quarantine(self, cursor: Cursor):
+        """
+        Creates the 'quarantine' table in the database if it does not exist.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+        """
+
+        cursor.execute("""
+                CREATE TABLE IF NOT EXISTS quarantine (
+                    path TEXT PRIMARY KEY,
+                    attempts INTEGER DEFAULT 0,
+                    last_error TEXT,
+                    last_attempt TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+    def record_failure(self, cursor: Cursor, path, error):
+        """
+        Adds a file to the quarantine or increases its number of failed attempts.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            path (str): The path of the file.
+            error (str): Description of the failure.
+        """
+
+        try:
+            cursor.execute("""
+                INSERT INTO quarantine (path, attempts, last_error, last_attempt)
+                VALUES (?, 1, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT (path) DO UPDATE SET
+                    attempts = attempts + 1,
+                    last_error = excluded.last_error,
+                    last_attempt = excluded.last_attempt
+            """, (path, error))
+        except sqlite3.Error as e:
+            logging.error("Error quarantining file %s: %s", path, e)
+            raise
+
+    def release(self, cursor: Cursor, paths):
+        """
+        Removes files from the quarantine, e.g. after they were hashed successfully.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            paths (list): The paths of the files.
+        """
+
+        try:
+            cursor.executemany("DELETE FROM quarantine WHERE path = ?", [(path,) for path in paths])
+        except sqlite3.Error as e:
+            logging.error("Error releasing files from quarantine: %s", e)
+            raise
+
+    def fetch_quarantine(self, cursor: Cursor):
+        """
+        Fetches all quarantined files.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+
+        Returns:
+            dict: The number of failed attempts per path.
+        """
+
+        cursor.execute("SELECT path, attempts FROM quarantine")
+        return dict(cursor.fetchall())
+
+    def fetch_entries(self, cursor: Cursor):
+        """
+        Returns:
+            list: A list of tuples (path, attempts, last_error, last_attempt), most attempts first.
+        """
+
+        cursor.execute("SELECT path, attempts, last_error, last_attempt FROM quarantine ORDER BY attempts DESC, path")
+        return cursor.fetchall()
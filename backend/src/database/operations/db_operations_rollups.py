@@ -0,0 +1,248 @@
+import os
+import sqlite3
+from sqlite3 import Cursor
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+
+class DatabaseOperationsRollups:
+    """
+    Class provides all database operations for the materialized storage rollups.
+
+    The rollups hold the reclaimable bytes and duplicate counts per directory (recursive),
+    per file extension and per duplicate group. They are maintained with deltas whenever
+    duplicates are added to or removed from a group, so dashboard queries read a handful of
+    indexed rows instead of aggregating the whole index.
+    """
+
+    def __init__(self, cursor: Cursor):
+        """
+        Initializes the DatabaseOperationsRollups object, setting up the rollup tables.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+        """
+
+        try:
+            self._initialize_schema_rollups(cursor)
+            logging.info("Database schema rollups initialized successfully.")
+        except sqlite3.Error as e:
+            logging.error("Error initializing database: %s", str(e))
+            raise
+
+    def _initialize_schema_rollups(self, cursor: Cursor):
+        """
+        Creates the rollup tables and their indexes if they do not exist.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+        """
+
+        cursor.execute("""
+                CREATE TABLE IF NOT EXISTS rollup_directories (
+                    path TEXT PRIMARY KEY,
+                    parent TEXT,
+                    duplicate_files INTEGER DEFAULT 0,
+                    reclaimable_bytes INTEGER DEFAULT 0
+                )
+            """)
+        cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_rollup_directories_parent
+                ON rollup_directories (parent, reclaimable_bytes)
+            """)
+        cursor.execute("""
+                CREATE TABLE IF NOT EXISTS rollup_extensions (
+                    extension TEXT PRIMARY KEY,
+                    duplicate_files INTEGER DEFAULT 0,
+                    reclaimable_bytes INTEGER DEFAULT 0
+                )
+            """)
+        cursor.execute("""
+                CREATE TABLE IF NOT EXISTS rollup_groups (
+                    original_id INTEGER PRIMARY KEY,
+                    duplicate_files INTEGER DEFAULT 0,
+                    reclaimable_bytes INTEGER DEFAULT 0
+                )
+            """)
+        cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_rollup_groups_bytes
+                ON rollup_groups (reclaimable_bytes)
+            """)
+        cursor.execute("""
+                CREATE TABLE IF NOT EXISTS rollup_state (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )
+            """)
+
+    @staticmethod
+    def _ancestors(path):
+        """
+        Yields (directory, parent) for every directory containing the path, innermost first.
+        The parent of the outermost directory is None.
+        """
+        directory = os.path.dirname(path)
+        while directory:
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                yield directory, None
+                return
+            yield directory, parent or None
+            directory = parent
+
+    def apply_delta(self, cursor: Cursor, original_id, files, sign):
+        """
+        Adds files to (sign=1) or removes files from (sign=-1) the rollups of a duplicate group.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            original_id (int): The ID of the original file of the group.
+            files (list): A list of (path, size) tuples of the duplicate files.
+            sign (int): 1 to add the files, -1 to remove them.
+        """
+
+        self.apply_deltas(cursor, {original_id: files}, sign)
+
+    def apply_deltas(self, cursor: Cursor, files_by_group, sign):
+        """
+        Adds files to (sign=1) or removes files from (sign=-1) the rollups of several duplicate groups.
+        Deltas are aggregated in memory first, so every touched rollup row is written once.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            files_by_group (dict): A list of (path, size) tuples of duplicate files per original ID.
+            sign (int): 1 to add the files, -1 to remove them.
+        """
+
+        directories = {}
+        extensions = {}
+        groups = {}
+        for original_id, files in files_by_group.items():
+            if not files:
+                continue
+            group_count, group_bytes = 0, 0
+            for path, size in files:
+                size = size or 0
+                for directory, parent in self._ancestors(path):
+                    count, total, _ = directories.get(directory, (0, 0, parent))
+                    directories[directory] = (count + sign, total + sign * size, parent)
+                extension = os.path.splitext(path)[1].lower()
+                count, total = extensions.get(extension, (0, 0))
+                extensions[extension] = (count + sign, total + sign * size)
+                group_count += sign
+                group_bytes += sign * size
+            groups[original_id] = (group_count, group_bytes)
+
+        if not groups:
+            return
+
+        try:
+            cursor.executemany("""
+                INSERT INTO rollup_directories (path, parent, duplicate_files, reclaimable_bytes)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (path) DO UPDATE SET
+                    duplicate_files = duplicate_files + excluded.duplicate_files,
+                    reclaimable_bytes = reclaimable_bytes + excluded.reclaimable_bytes
+            """, [(path, parent, count, total) for path, (count, total, parent) in directories.items()])
+            cursor.executemany("""
+                INSERT INTO rollup_extensions (extension, duplicate_files, reclaimable_bytes)
+                VALUES (?, ?, ?)
+                ON CONFLICT (extension) DO UPDATE SET
+                    duplicate_files = duplicate_files + excluded.duplicate_files,
+                    reclaimable_bytes = reclaimable_bytes + excluded.reclaimable_bytes
+            """, [(extension, count, total) for extension, (count, total) in extensions.items()])
+            cursor.executemany("""
+                INSERT INTO rollup_groups (original_id, duplicate_files, reclaimable_bytes)
+                VALUES (?, ?, ?)
+                ON CONFLICT (original_id) DO UPDATE SET
+                    duplicate_files = duplicate_files + excluded.duplicate_files,
+                    reclaimable_bytes = reclaimable_bytes + excluded.reclaimable_bytes
+            """, [(original_id, count, total) for original_id, (count, total) in groups.items()])
+
+            if sign < 0:
+                # Drop the rows that no longer hold duplicates, only among the rows touched here.
+                cursor.executemany("DELETE FROM rollup_directories WHERE path = ? AND duplicate_files <= 0",
+                                   [(path,) for path in directories])
+                cursor.executemany("DELETE FROM rollup_extensions WHERE extension = ? AND duplicate_files <= 0",
+                                   [(extension,) for extension in extensions])
+                cursor.executemany("DELETE FROM rollup_groups WHERE original_id = ? AND duplicate_files <= 0",
+                                   [(original_id,) for original_id in groups])
+        except sqlite3.Error as e:
+            logging.error("Error updating rollups: %s", e)
+            raise
+
+    def clear(self, cursor: Cursor):
+        """
+        Removes all rollup rows, e.g. before a rebuild.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+        """
+
+        cursor.execute("DELETE FROM rollup_directories")
+        cursor.execute("DELETE FROM rollup_extensions")
+        cursor.execute("DELETE FROM rollup_groups")
+
+    def is_built(self, cursor: Cursor):
+        cursor.execute("SELECT value FROM rollup_state WHERE key = 'built'")
+        row = cursor.fetchone()
+        return bool(row and row[0] == '1')
+
+    def mark_built(self, cursor: Cursor):
+        cursor.execute("INSERT OR REPLACE INTO rollup_state (key, value) VALUES ('built', '1')")
+
+    def fetch_directories(self, cursor: Cursor, parent=None, limit=50):
+        """
+        Fetches the direct subdirectories of a directory ordered by reclaimable bytes.
+
+        Args:
+            cursor (Cursor): A SQLite cursor object to execute database operations.
+            parent (str): The parent directory, None for the outermost directories.
+            limit (int): Maximum number of rows.
+
+        Returns:
+            list: A list of tuples (path, duplicate_files, reclaimable_bytes).
+        """
+
+        if parent is None:
+            cursor.execute("""
+                SELECT path, duplicate_files, reclaimable_bytes FROM rollup_directories
+                WHERE parent IS NULL ORDER BY reclaimable_bytes DESC LIMIT ?
+            """, (limit,))
+        else:
+            cursor.execute("""
+                SELECT path, duplicate_files, reclaimable_bytes FROM rollup_directories
+                WHERE parent = ? ORDER BY reclaimable_bytes DESC LIMIT ?
+            """, (parent, limit))
+        return cursor.fetchall()
+
+    def fetch_directory(self, cursor: Cursor, path):
+        cursor.execute("SELECT path, duplicate_files, reclaimable_bytes FROM rollup_directories WHERE path = ?",
+                       (path,))
+        return cursor.fetchone()
+
+    def fetch_extensions(self, cursor: Cursor, limit=50):
+        cursor.execute("""
+            SELECT extension, duplicate_files, reclaimable_bytes FROM rollup_extensions
+            ORDER BY reclaimable_bytes DESC LIMIT ?
+        """, (limit,))
+        return cursor.fetchall()
+
+    def fetch_top_groups(self, cursor: Cursor, limit=50):
+        """
+        Fetches the largest duplicate groups by reclaimable bytes using the index on the rollup.
+
+        Returns:
+            list: A list of tuples (original_id, original_path, duplicate_files, reclaimable_bytes).
+        """
+
+        cursor.execute("""
+            SELECT g.original_id, f.path, g.duplicate_files, g.reclaimable_bytes
+            FROM rollup_groups g
+            INNER JOIN files f ON f.id = g.original_id
+            WHERE f.is_deleted = 0
+            ORDER BY g.reclaimable_bytes DESC
+            LIMIT ?
+        """, (limit,))
+        return cursor.fetchall()
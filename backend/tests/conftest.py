@@ -0,0 +1,37 @@
+import os
+import sys
+
+import pytest
+
+BACKEND_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The application imports modules relative to backend/ (src.core) and to backend/src (database, api)
+sys.path[:0] = [BACKEND_DIRECTORY, os.path.join(BACKEND_DIRECTORY, "src")]
+
+
+@pytest.fixture
+def make_files(tmp_path):
+    """
+    Writes files below tmp_path/source from a dictionary of relative path to content and returns the source directory.
+    """
+    source = tmp_path / "source"
+
+    def make(files):
+        for relative_path, content in files.items():
+            path = source / relative_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content)
+        return str(source)
+    return make
+
+
+@pytest.fixture
+def redis_connector():
+    """
+    A RedisConnector on an in-process fake server, with Lua scripting (fakeredis and lupa).
+    """
+    fakeredis = pytest.importorskip("fakeredis")
+    from src.core.redis_connector import RedisConnector
+
+    connector = RedisConnector.__new__(RedisConnector)
+    connector.client = fakeredis.FakeRedis(server=fakeredis.FakeServer(), decode_responses=True)
+    return connector
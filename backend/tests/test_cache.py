@@ -0,0 +1,72 @@
+import pytest
+import redis
+
+from src.core.cache import SummaryCache
+
+
+def _disconnect(redis_connector):
+    redis_connector.client.connection_pool.connection_kwargs['server'].connected = False
+
+
+def test_bumping_the_generation_invalidates_entries(redis_connector):
+    cache = SummaryCache(redis_connector)
+    cache.set("summary", {'groups': 3}, cache.generation())
+    assert cache.get("summary") == {'groups': 3}
+
+    cache.bump_generation()
+    assert cache.get("summary") is None
+    assert cache.get_or_compute("summary", lambda: {'groups': 4}) == {'groups': 4}
+    assert cache.get("summary") == {'groups': 4}
+
+
+def test_get_many_and_set_many_take_one_round_trip(redis_connector, monkeypatch):
+    round_trips = []
+    pipeline = redis_connector.client.pipeline
+
+    def counting_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+        execute = pipe.execute
+        pipe.execute = lambda *a, **k: round_trips.append(len(pipe.command_stack)) or execute(*a, **k)
+        return pipe
+    monkeypatch.setattr(redis_connector.client, "pipeline", counting_pipeline)
+
+    cache = SummaryCache(redis_connector)
+    cache.set_many({"a": 1, "b": 2, "c": 3}, generation=0)
+    assert cache.get_many(["a", "b", "missing", "c"]) == [1, 2, None, 3]
+    # The generation is read in the same round trip as the entries
+    assert round_trips == [3, 5]
+
+
+def test_entries_expire_after_their_ttl(redis_connector):
+    cache = SummaryCache(redis_connector, default_ttl=300)
+    cache.set("default", 1, generation=0)
+    cache.set("short", 2, generation=0, ttl=30)
+
+    assert 290 < redis_connector.client.ttl("matr:cache:default") <= 300
+    assert 0 < redis_connector.client.ttl("matr:cache:short") <= 30
+
+
+def test_connector_round_trips_set_their_ttl(redis_connector):
+    redis_connector.set("key", "value", ttl=60)
+    redis_connector.set_many({"one": "1", "two": "2"}, ttl=120)
+
+    assert redis_connector.get_many(["key", "one", "two", "missing"]) == ["value", "1", "2", None]
+    assert 0 < redis_connector.client.ttl("key") <= 60
+    assert 60 < redis_connector.client.ttl("two") <= 120
+
+
+def test_unavailable_redis_is_a_miss(redis_connector):
+    cache = SummaryCache(redis_connector)
+    _disconnect(redis_connector)
+
+    assert cache.generation() is None
+    assert cache.bump_generation() is None
+    assert cache.get_many(["a", "b"]) == [None, None]
+    cache.set("a", 1, generation=1)  # logged, not raised
+    assert cache.get_or_compute("a", lambda: "computed") == "computed"
+
+
+def test_unavailable_redis_raises_from_the_connector(redis_connector):
+    _disconnect(redis_connector)
+    with pytest.raises(redis.ConnectionError):
+        redis_connector.get_many(["a"])
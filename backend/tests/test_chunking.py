@@ -0,0 +1,37 @@
+import random
+
+import pytest
+
+from src.config.ConfigModel import AppConfig, ChunkingConfig
+from src.core import chunking
+from src.core.processor import Processor
+
+
+def _config(**sections):
+    return AppConfig(source=None, destination=None, batch_size=None, api_endpoint=None, api_token=None,
+                     Database=None, API=None, **sections)
+
+
+def test_vectorised_boundaries_match_the_python_loop(tmp_path, monkeypatch):
+    pytest.importorskip("numpy")
+    content = random.Random(1).randbytes(3 << 20)
+    files = {"random": content, "edited": content[:500000] + b"inserted" + content[500000:],
+             "zeros": bytes(1 << 20), "short": content[:20000], "empty": b""}
+    for name, data in files.items():
+        (tmp_path / name).write_bytes(data)
+
+    vectorised = [chunking.chunk_file(str(tmp_path / name), 4096, 16384, 65536)[1] for name in files]
+    monkeypatch.setattr(chunking, "numpy", None)
+    assert vectorised == [chunking.chunk_file(str(tmp_path / name), 4096, 16384, 65536)[1] for name in files]
+    assert sum(size for size, _ in vectorised[0]) == len(content)
+
+
+def test_capped_chunking_leaves_the_other_files_to_the_next_run(tmp_path, make_files):
+    source = make_files({f"{index}.bin": random.Random(index).randbytes(100000) for index in range(3)})
+    processor = Processor(db_name=str(tmp_path / "index.db"),
+                          config=_config(Chunking=ChunkingConfig(min_file_size=1000, max_bytes=150000, workers=1)))
+    processor.add_files(source)
+
+    assert processor.add_chunks() == 2
+    assert processor.add_chunks() == 1
+    assert processor.add_chunks() == 0
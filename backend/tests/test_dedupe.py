@@ -0,0 +1,81 @@
+import os
+
+from src.core.processor import Processor
+
+
+def _duplicate_paths(processor):
+    return {duplicate['path'] for group in processor.db_operations.iter_duplicate_groups()
+            for duplicate in group['duplicates']}
+
+
+def test_deleted_duplicate_stays_out_of_its_group_after_dedupe(tmp_path, make_files):
+    source = make_files({"a/one.txt": b"same content", "b/two.txt": b"same content", "c/three.txt": b"same content",
+                         "d/other.txt": b"other content"})
+    processor = Processor(db_name=str(tmp_path / "index.db"))
+    processor.add_files(source)
+    processor.add_duplicates()
+    assert processor.db_operations.get_duplicates_summary()['duplicates'] == 2
+
+    deleted = os.path.join(source, "c", "three.txt")
+    os.remove(deleted)
+    assert processor.reconcile_deletions() == 1
+    processor.add_duplicates()
+
+    summary = processor.db_operations.get_duplicates_summary()
+    assert deleted not in _duplicate_paths(processor)
+    assert summary['duplicates'] == 1
+    assert summary['reclaimable_bytes'] == len(b"same content")
+
+
+def test_file_back_at_the_path_of_a_deleted_entry_is_indexed_again(tmp_path, make_files):
+    source = make_files({"a/one.txt": b"first", "a/two.txt": b"second"})
+    processor = Processor(db_name=str(tmp_path / "index.db"))
+    processor.add_files(source)
+
+    path = os.path.join(source, "a", "two.txt")
+    os.remove(path)
+    processor.reconcile_deletions()
+    make_files({"a/two.txt": b"second, again"})
+    processor.add_files(source)
+
+    entry = processor.db_operations.get_files_by_paths([path])[path]
+    assert entry['size'] == len(b"second, again")
+    assert processor.db_operations.get_existing_paths_among([path]) == {path}
+
+
+def _groups(processor):
+    return [(group['original_path'], sorted(duplicate['path'] for duplicate in group['duplicates']))
+            for group in processor.db_operations.iter_duplicate_groups()]
+
+
+def test_deleted_original_hands_its_group_to_a_live_file(tmp_path, make_files):
+    source = make_files({"a/one.txt": b"same content", "b/two.txt": b"same content", "c/three.txt": b"same content"})
+    processor = Processor(db_name=str(tmp_path / "index.db"))
+    processor.add_files(source)
+    processor.add_duplicates()
+    [(original, duplicates)] = _groups(processor)
+
+    os.remove(original)
+    assert processor.reconcile_deletions() == 1
+    assert _groups(processor) == [(duplicates[0], duplicates[1:])]
+
+    processor.add_duplicates()
+    assert _groups(processor) == [(duplicates[0], duplicates[1:])]
+    assert processor.db_operations.get_duplicates_summary()['duplicates'] == 1
+
+
+def test_deleting_originals_in_a_batch_keeps_every_file_in_one_group(tmp_path, make_files):
+    source = make_files({f"{directory}/{directory}.txt": b"same content" for directory in "abcd"})
+    processor = Processor(db_name=str(tmp_path / "index.db"))
+    processor.add_files(source)
+    processor.add_duplicates()
+    [(original, duplicates)] = _groups(processor)
+    db_operations = processor.db_operations
+    entries = db_operations.get_files_by_paths([original, duplicates[0]])
+
+    db_operations.process_deleted_files_batch([entries[original]['id'], entries[duplicates[0]]['id']])
+    assert _groups(processor) == [(duplicates[1], duplicates[2:])]
+
+    processor.add_duplicates()
+    assert _groups(processor) == [(duplicates[1], duplicates[2:])]
+    assert db_operations.conn.execute("SELECT COUNT(*) FROM duplicates").fetchone()[0] == 1
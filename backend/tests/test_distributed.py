@@ -0,0 +1,143 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from src.config.ConfigModel import AppConfig, DistributedConfig
+from src.core import distributed
+from src.core.distributed import ScanWorker, WorkQueue, iter_result_files
+from src.core.hash_cache import HashCache
+from src.core.processor import Processor
+
+LEASE_SECONDS = 0.2
+
+
+def _config(**sections):
+    return AppConfig(source=None, destination=None, batch_size=None, api_endpoint=None, api_token=None,
+                     Database=None, API=None, **sections)
+
+
+def _result_files(work_queue, scan_id):
+    return [data for payload in work_queue.pop_results(scan_id, timeout=0.1) for data in iter_result_files(payload)]
+
+
+def _expire_leases():
+    time.sleep(LEASE_SECONDS * 1.5)
+
+
+def test_claim_and_complete_units(redis_connector):
+    work_queue = WorkQueue(redis_connector)
+    unit_ids = work_queue.publish("scan", [("/data/a", True), ("/data/b", False)])
+
+    claimed = [work_queue.claim("worker"), work_queue.claim("worker")]
+    assert work_queue.claim("worker") is None
+    assert [unit_id for unit_id, _ in claimed] == unit_ids
+    assert claimed[1][1] == {'scan': "scan", 'directory': "/data/b", 'recursive': False}
+
+    for unit_id, _ in claimed:
+        assert work_queue.push_results(unit_id, "worker", "scan", "{}")
+        assert work_queue.complete(unit_id, "worker", "scan")
+    assert work_queue.finished_units("scan") == (2, 0)
+    assert work_queue.pop_results("scan", timeout=0.1) == ["{}", "{}"]
+
+
+def test_reap_queues_a_unit_with_an_expired_lease_again(redis_connector):
+    work_queue = WorkQueue(redis_connector, lease_seconds=LEASE_SECONDS)
+    [unit_id] = work_queue.publish("scan", [("/data/a", True)])
+    assert work_queue.claim("dead")[0] == unit_id
+
+    assert work_queue.reap() == (0, 0)  # the lease is still valid
+    _expire_leases()
+    assert work_queue.reap() == (1, 0)
+    assert work_queue.claim("alive")[0] == unit_id
+
+
+def test_reaped_worker_cannot_push_results_or_complete(redis_connector):
+    work_queue = WorkQueue(redis_connector, lease_seconds=LEASE_SECONDS)
+    [unit_id] = work_queue.publish("scan", [("/data/a", True)])
+    work_queue.claim("slow")
+    _expire_leases()
+    work_queue.reap()
+    work_queue.claim("alive")
+
+    assert not work_queue.heartbeat(unit_id, "slow")
+    assert not work_queue.push_results(unit_id, "slow", "scan", "late")
+    assert not work_queue.complete(unit_id, "slow", "scan")
+    assert work_queue.push_results(unit_id, "alive", "scan", "{}")
+    assert work_queue.complete(unit_id, "alive", "scan")
+    assert work_queue.pop_results("scan", timeout=0.1) == ["{}"]
+    assert work_queue.finished_units("scan") == (1, 0)
+
+
+def test_unit_is_given_up_after_max_attempts(redis_connector):
+    work_queue = WorkQueue(redis_connector, lease_seconds=LEASE_SECONDS, max_attempts=2)
+    [unit_id] = work_queue.publish("scan", [("/data/a", True)])
+
+    work_queue.claim("first")
+    _expire_leases()
+    assert work_queue.reap() == (1, 0)
+    work_queue.claim("second")
+    _expire_leases()
+    assert work_queue.reap() == (0, 1)
+
+    assert work_queue.claim("third") is None
+    assert work_queue.failed_units("scan") == [unit_id]
+    assert work_queue.finished_units("scan") == (0, 1)
+
+
+class _RepeatingWorker(ScanWorker):
+    """
+    Sends every result batch twice, as a unit processed by a worker whose lease expired after it
+    sent its results, and then by the worker the unit was handed to.
+    """
+
+    def _push(self, unit_id, scan_id, header, rows):
+        return super()._push(unit_id, scan_id, header, rows) and super()._push(unit_id, scan_id, header, rows)
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+def test_coordinator_merges_every_file_once(tmp_path, make_files, redis_connector, monkeypatch, indexed):
+    source = make_files({f"d{directory}/f{index}.txt": f"{directory}-{index}".encode()
+                         for directory in range(3) for index in range(4)})
+    monkeypatch.setattr(distributed, "RedisConnector", lambda: redis_connector)
+    config = _config(Distributed=DistributedConfig(split_depth=1, result_batch_size=3, local_workers=0,
+                                                   poll_seconds=0.1))
+    processor = Processor(db_name=str(tmp_path / "index.db"), config=config)
+    if indexed:
+        processor.add_files(source)  # the workers send files that are already in the index
+
+    stop_event = threading.Event()
+    worker = threading.Thread(target=_RepeatingWorker(config, worker_id="worker").run, args=(stop_event,))
+    worker.start()
+    try:
+        processor.add_files_distributed(source)
+    finally:
+        stop_event.set()
+        worker.join()
+
+    paths = [path for path, in sqlite3.connect(tmp_path / "index.db").execute("SELECT path FROM files")]
+    assert len(paths) == len(set(paths)) == 12
+    assert redis_connector.client.keys("*") == []
+
+
+def test_worker_takes_hashes_from_the_hash_cache(redis_connector, make_files):
+    source = make_files({"one.txt": b"first", "two.txt": b"second"})
+    work_queue = WorkQueue(redis_connector)
+    worker = ScanWorker(_config(), work_queue=work_queue, worker_id="worker",
+                        hash_cache=HashCache(redis_connector, batch_size=10))
+    reads = []
+    read_file = worker.file_operations._get_file_content_hash
+    worker.file_operations._get_file_content_hash = lambda path: reads.append(path) or read_file(path)
+
+    work_queue.publish("first", [(source, True)])
+    assert worker.process_unit(*work_queue.claim("worker"))
+    assert len(reads) == 2
+    first = _result_files(work_queue, "first")
+
+    work_queue.publish("second", [(source, True)])
+    assert worker.process_unit(*work_queue.claim("worker"))
+    assert len(reads) == 2
+    second = _result_files(work_queue, "second")
+    assert sorted((data['path'], data['hash']) for data in second) == \
+        sorted((data['path'], data['hash']) for data in first)
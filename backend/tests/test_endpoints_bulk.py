@@ -0,0 +1,120 @@
+from typing import Optional
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Field, Session, SQLModel, create_engine, select
+
+from api.v1.dependencies import get_database_session
+from api.v1.endpoints.Base import EndpointsBase
+from api.v1.routers import routerItems
+from src.database.models.item import Item
+
+
+class BulkRecord(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str
+    size: int = 0
+
+
+class BulkRecordCreate(BaseModel):
+    name: str
+    size: int = 0
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all([BulkRecord(id=1, name="one"), BulkRecord(id=2, name="two")])
+        session.commit()
+        yield session
+
+
+def test_update_bulk_accounts_for_every_row(session):
+    result = EndpointsBase(BulkRecord).update_bulk(session, objs_in=[
+        {"id": 1, "name": "first"},
+        {"id": 2},
+        {"id": 3, "name": "unknown"},
+        {"name": "no id"},
+    ], return_rows=True)
+
+    assert result["succeeded"] == 1
+    assert [item["name"] for item in result["items"]] == ["first"]
+    assert [(error["index"], error["detail"]) for error in result["failed"]] == [
+        (1, "No fields to update"), (2, "Item with ID 3 not found"), (3, "Missing 'id'")]
+
+
+def _names(session):
+    return sorted(record.name for record in session.exec(select(BulkRecord)))
+
+
+def test_create_bulk_inserts_the_valid_rows_and_reports_the_others(session):
+    result = EndpointsBase(BulkRecord, create_schema=BulkRecordCreate).create_bulk(session, objs_in=[
+        {"name": "three", "size": 3},
+        {"size": 4},
+        {"name": "five", "size": "not a number"},
+        {"name": "six"},
+    ], return_rows=True)
+
+    assert result["succeeded"] == 2
+    assert [(item["name"], item["size"]) for item in result["items"]] == [("three", 3), ("six", 0)]
+    assert [error["index"] for error in result["failed"]] == [1, 2]
+    assert _names(session) == ["one", "six", "three", "two"]
+
+
+def test_create_bulk_without_valid_rows_inserts_nothing(session):
+    result = EndpointsBase(BulkRecord, create_schema=BulkRecordCreate).create_bulk(session, objs_in=[{"size": 1}])
+
+    assert (result["succeeded"], [error["index"] for error in result["failed"]]) == (0, [0])
+    assert _names(session) == ["one", "two"]
+
+
+def test_remove_bulk_deletes_the_known_ids_and_reports_the_others(session):
+    result = EndpointsBase(BulkRecord).remove_bulk(session, ids=[2, 7, 1, 7], return_rows=True)
+
+    assert result["succeeded"] == 2
+    assert sorted(item["id"] for item in result["items"]) == [1, 2]
+    assert [(error["index"], error["id"]) for error in result["failed"]] == [(1, 7), (3, 7)]
+    assert _names(session) == []
+
+
+@pytest.fixture
+def client():
+    # One connection for every request, so all of them see the same in-memory database
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+
+    def database_session():
+        with Session(engine) as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(routerItems.router)
+    app.dependency_overrides[get_database_session] = database_session
+    with Session(engine) as session:
+        session.add(Item(id=1, name="one", description="first"))
+        session.commit()
+    return TestClient(app)
+
+
+def test_items_bulk_endpoints_report_every_failed_row(client):
+    created = client.post("/items/bulk", params={"return_rows": True}, json=[
+        {"name": "two", "description": "second"},
+        {"description": "no name"},
+        {"name": "three", "description": "third"},
+    ])
+    assert created.status_code == 200
+    body = created.json()
+    assert body["succeeded"] == 2
+    assert [item["name"] for item in body["items"]] == ["two", "three"]
+    assert [error["index"] for error in body["failed"]] == [1]
+
+    deleted = client.request("DELETE", "/items/bulk", json=[1, 99, body["items"][0]["id"]])
+    assert deleted.status_code == 200
+    assert deleted.json()["succeeded"] == 2
+    assert [(error["index"], error["id"]) for error in deleted.json()["failed"]] == [(1, 99)]
+    assert client.get("/items/1").status_code == 404
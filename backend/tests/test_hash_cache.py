@@ -0,0 +1,73 @@
+import os
+
+from src.core.file_operations import FileOperations
+from src.core.hash_cache import HashCache
+from src.core.processor import Processor
+
+
+def test_lookup_returns_stored_hashes(redis_connector, make_files):
+    source = make_files({"one.txt": b"first", "two.txt": b"second"})
+    paths = [os.path.join(source, name) for name in ("one.txt", "two.txt")]
+    stats = {path: os.stat(path) for path in paths}
+    cache = HashCache(redis_connector, algorithm="sha256-sample")
+
+    assert cache.lookup(stats) == {}
+    cache.store([(paths[0], stats[paths[0]], "hash-one")])
+    assert cache.lookup(stats) == {paths[0]: "hash-one"}
+
+    stat_result = stats[paths[0]]
+    [key] = redis_connector.client.keys("matr:hash:*")
+    assert key == "matr:hash:sha256-sample:{0}:{1}:{2}:{3}".format(
+        cache.filesystem_id(paths[0], stat_result), stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns)
+    assert 0 < redis_connector.client.ttl(key) <= cache.ttl
+
+
+def test_other_algorithm_misses(redis_connector, make_files):
+    path = os.path.join(make_files({"one.txt": b"first"}), "one.txt")
+    stats = {path: os.stat(path)}
+    HashCache(redis_connector, algorithm="sha256-sample").store([(path, stats[path], "sample")])
+
+    assert HashCache(redis_connector, algorithm="sha1").lookup(stats) == {}
+
+
+def test_changed_modification_time_or_size_misses(redis_connector, make_files):
+    path = os.path.join(make_files({"one.txt": b"first"}), "one.txt")
+    cache = HashCache(redis_connector)
+    cache.store([(path, os.stat(path), "hash-one")])
+
+    stat_result = os.stat(path)
+    os.utime(path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 1))
+    assert cache.lookup({path: os.stat(path)}) == {}
+
+    os.utime(path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns))
+    assert cache.lookup({path: os.stat(path)}) == {path: "hash-one"}
+    with open(path, "ab") as file:
+        file.write(b", longer")
+    os.utime(path, ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns))
+    assert cache.lookup({path: os.stat(path)}) == {}
+
+
+def test_hashes_of_files_changed_while_hashing_are_not_stored(redis_connector, make_files):
+    source = make_files({"stable.txt": b"stable", "changing.txt": b"before"})
+    stable, changing = (os.path.join(source, name) for name in ("stable.txt", "changing.txt"))
+    stats = {path: os.stat(path) for path in (stable, changing)}  # taken before the files are read
+    with open(changing, "wb") as file:
+        file.write(b"after the stat")
+    file_operations = FileOperations()
+    hashed = [file_operations.get_file_metadata(path) for path in (stable, changing)]
+    cache = HashCache(redis_connector)
+
+    Processor._store_hashes(cache, stats, hashed)
+
+    assert cache.lookup({path: os.stat(path) for path in (stable, changing)}) == {stable: hashed[0]['hash']}
+    assert stats == {}
+
+
+def test_unavailable_redis_is_a_miss(redis_connector, make_files):
+    path = os.path.join(make_files({"one.txt": b"first"}), "one.txt")
+    cache = HashCache(redis_connector)
+    cache.store([(path, os.stat(path), "hash-one")])
+    redis_connector.client.connection_pool.connection_kwargs['server'].connected = False
+
+    assert cache.lookup({path: os.stat(path)}) == {}
+    cache.store([(path, os.stat(path), "hash-one")])  # logged, not raised
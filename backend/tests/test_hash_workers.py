@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+from src.config.ConfigModel import AppConfig, ScanConfig
+from src.core import processor as processor_module
+from src.core.hash_workers import HashWorkerPool
+from src.core.processor import Processor
+
+
+def _config(**sections):
+    return AppConfig(source=None, destination=None, batch_size=None, api_endpoint=None, api_token=None,
+                     Database=None, API=None, **sections)
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="needs named pipes")
+def test_file_that_blocks_its_worker_is_quarantined_and_the_scan_finishes(tmp_path, make_files):
+    source = make_files({f"{index}.txt": str(index).encode() for index in range(10)})
+    blocked = os.path.join(source, "5.fifo")
+    os.mkfifo(blocked)  # opening it for reading blocks until a writer comes, which never does
+    processor = Processor(db_name=str(tmp_path / "index.db"),
+                          config=_config(Scan=ScanConfig(file_timeout=0.5, workers=1, max_workers=1)))
+
+    processor.add_files(source)
+
+    files = [os.path.join(source, f"{index}.txt") for index in range(10)]
+    assert processor.db_operations.get_existing_paths_among(files) == set(files)
+    assert list(processor.db_operations.get_quarantine()) == [blocked]
+    assert processor.db_operations.get_scan_checkpoint(os.path.abspath(source))['completed']
+
+
+class _RefusingPool(HashWorkerPool):
+    """Refuses every other file, as when the queues of all workers are full."""
+
+    refused = 0
+
+    def submit(self, filepath):
+        _RefusingPool.refused += 1
+        if _RefusingPool.refused % 2:
+            return False
+        return super().submit(filepath)
+
+
+def test_file_refused_by_the_workers_is_submitted_again(tmp_path, make_files, monkeypatch):
+    source = make_files({f"{index}.txt": str(index).encode() for index in range(10)})
+    monkeypatch.setattr(processor_module, "HashWorkerPool", _RefusingPool)
+    monkeypatch.setattr(_RefusingPool, "refused", 0)
+    processor = Processor(db_name=str(tmp_path / "index.db"))
+
+    processor.add_files(source)
+
+    files = [os.path.join(source, f"{index}.txt") for index in range(10)]
+    assert _RefusingPool.refused >= 20
+    assert processor.db_operations.get_existing_paths_among(files) == set(files)
+    assert processor.db_operations.get_scan_checkpoint(os.path.abspath(source))['completed']
@@ -0,0 +1,99 @@
+import os
+
+import pytest
+
+from database.operations.db_operations import DatabaseOperations
+from src.core.prefilter import IndexPrefilter
+from src.core.processor import Processor
+
+
+@pytest.fixture
+def index(tmp_path, make_files):
+    """
+    An index of five files, returns its database path and the paths of the files.
+    """
+    source = make_files({f"{index}.txt": str(index).encode() for index in range(5)})
+    db_name = str(tmp_path / "index.db")
+    Processor(db_name=db_name).add_files(source)
+    return db_name, sorted(os.path.join(source, name) for name in os.listdir(source))
+
+
+def _prefilter(db_operations, db_name, capacity=1000):
+    return IndexPrefilter(db_operations, f"{db_name}.bloom", capacity=capacity)
+
+
+def _changed(file_id, path, file_hash):
+    return {'id': file_id, 'hash': file_hash, 'path': path, 'size': 1, 'modification_time': None,
+            'access_time': None, 'creation_time': None, 'hash_algorithm': 'sha256', 'hash_range_size': None}
+
+
+def test_saved_prefilter_loads_with_the_same_filters(index):
+    db_name, paths = index
+    prefilter = _prefilter(DatabaseOperations(db_name), db_name)
+    prefilter.refresh()
+    prefilter.save()
+
+    loaded = _prefilter(DatabaseOperations(db_name), db_name)
+    assert loaded._load()
+    assert (loaded.file_id, loaded.change_id) == (prefilter.file_id, prefilter.change_id)
+    assert (loaded.paths.bits, loaded.hashes.bits) == (prefilter.paths.bits, prefilter.hashes.bits)
+    assert all(loaded.may_contain_path(path) for path in paths)
+
+    with open(prefilter.path, "r+b") as file:
+        file.truncate(os.path.getsize(prefilter.path) - 1)
+    assert not _prefilter(DatabaseOperations(db_name), db_name)._load()
+
+
+def test_prefilter_catches_up_with_changes_of_another_process(index, monkeypatch):
+    db_name, paths = index
+    prefilter = _prefilter(DatabaseOperations(db_name), db_name)
+    prefilter.refresh()
+
+    other = DatabaseOperations(db_name)
+    entries = other.get_files_by_paths(paths[:2])
+    moved = paths[0] + ".moved"
+    other.update_file_paths({entries[paths[0]]['id']: moved})
+    other.update_files([_changed(entries[paths[1]]['id'], paths[1], "f" * 64)])
+    other.commit()
+
+    monkeypatch.setattr(prefilter, "_rebuild", lambda capacity: pytest.fail("rebuilt instead of catching up"))
+    prefilter.refresh()
+    assert prefilter.may_contain_path(moved)
+    assert prefilter.may_contain_hash("f" * 64)
+
+
+def test_prefilter_is_rebuilt_when_its_changes_were_trimmed(index):
+    db_name, paths = index
+    prefilter = _prefilter(DatabaseOperations(db_name), db_name)
+    prefilter.refresh()
+
+    # Another process moves a file and saves its own prefilter, which trims the change
+    other = DatabaseOperations(db_name)
+    entries = other.get_files_by_paths(paths)
+    other.update_file_paths({entries[paths[0]]['id']: paths[0] + ".moved"})
+    other_prefilter = _prefilter(other, db_name)
+    other_prefilter.refresh()
+    other_prefilter.save()
+    other.update_file_paths({entries[paths[1]]['id']: paths[1] + ".moved"})
+    other.commit()
+
+    rebuilt = []
+    rebuild = prefilter._rebuild
+    prefilter._rebuild = lambda capacity: rebuilt.append(capacity) or rebuild(capacity)
+    prefilter.refresh()
+
+    assert rebuilt
+    assert prefilter.may_contain_path(paths[0] + ".moved") and prefilter.may_contain_path(paths[1] + ".moved")
+
+
+def test_saturated_prefilter_is_rebuilt_larger(index):
+    db_name, paths = index
+    prefilter = _prefilter(DatabaseOperations(db_name), db_name, capacity=2)
+    prefilter.refresh()
+    assert prefilter.paths.saturated
+
+    prefilter.refresh()
+
+    assert not prefilter.paths.saturated
+    assert prefilter.paths.capacity >= 2 * len(paths)
+    assert all(prefilter.may_contain_path(path) for path in paths)
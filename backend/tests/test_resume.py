@@ -0,0 +1,83 @@
+import os
+
+import pytest
+
+from src.core.processor import Processor
+from src.core.progress import JobCancelled, Progress
+from src.core.walker import CommitWatermark, path_key, walk_files
+
+
+def _relative(source, paths):
+    return [os.path.relpath(path, source) for path in paths]
+
+
+def test_walk_resumes_after_a_nested_file(make_files):
+    source = make_files({name: b"x" for name in ("a/b/one.txt", "a/b/two.txt", "a/b/c/three.txt", "a/four.txt",
+                                                 "b/five.txt", "six.txt")})
+
+    resumed = walk_files(source, resume_after=("a", "b", "c", "three.txt"))
+
+    assert _relative(source, resumed) == [os.path.join(*name.split("/")) for name in
+                                          ("a/b/one.txt", "a/b/two.txt", "a/four.txt", "b/five.txt", "six.txt")]
+
+
+def test_walk_does_not_list_the_subtrees_before_the_resume_position(make_files):
+    source = make_files({name: b"x" for name in ("a/x/one.txt", "a/y/two.txt", "b/three.txt", "c/d/four.txt")})
+    listed = []
+
+    resumed = list(walk_files(source, resume_after=path_key(source, os.path.join(source, "b", "three.txt")),
+                              on_directory=listed.append))
+
+    assert _relative(source, resumed) == [os.path.join("c", "d", "four.txt")]
+    assert _relative(source, listed) == [".", "b", "c", os.path.join("c", "d")]
+
+
+def test_watermark_stops_before_a_file_in_flight():
+    watermark = CommitWatermark(4)
+    watermark.done(0)
+    watermark.done(2)
+    watermark.done(3)
+
+    assert watermark.advance() == 0
+    assert not watermark.complete
+
+    watermark.done(1)
+    assert watermark.advance() == 3
+    assert watermark.complete
+
+
+class _CancelAfter:
+    """A cancel event that is set once it was checked a number of times."""
+
+    def __init__(self, checks):
+        self.checks = checks
+
+    def is_set(self):
+        self.checks -= 1
+        return self.checks < 0
+
+
+def test_interrupted_scan_resumes_after_its_checkpoint(tmp_path, make_files):
+    names = [os.path.join(directory, f"{index}.txt") for directory in ("a", "b", "c") for index in range(5)]
+    source = make_files({name: name.encode() for name in names})
+    processor = Processor(db_name=str(tmp_path / "index.db"))
+
+    with pytest.raises(JobCancelled):
+        processor.add_files(source, progress=Progress("Scan", show_bar=False, cancel_event=_CancelAfter(6)))
+
+    checkpoint = processor.db_operations.get_scan_checkpoint(os.path.abspath(source))
+    assert checkpoint and not checkpoint['completed']
+    position = tuple(checkpoint['position'])
+    paths = [os.path.join(source, name) for name in names]
+    before = [path for path in paths if path_key(source, path) <= position]
+    # Every file up to the checkpoint is in the index, also when later files completed first
+    assert len(before) == checkpoint['files_done']
+    assert processor.db_operations.get_existing_paths_among(before) == set(before)
+
+    # A subtree before the checkpoint is not walked again by the resumed scan
+    make_files({"0/late.txt": b"late"})
+    processor.add_files(source, progress=Progress("Scan", show_bar=False), resume=True)
+
+    assert processor.db_operations.get_existing_paths_among(paths) == set(paths)
+    assert not processor.db_operations.get_existing_paths_among([os.path.join(source, "0", "late.txt")])
+    assert processor.db_operations.get_scan_checkpoint(os.path.abspath(source))['completed']
@@ -0,0 +1,85 @@
+import os
+
+from src.core.processor import Processor
+
+
+def _rollup_totals(db_operations):
+    groups = db_operations.get_top_groups(limit=1000)
+    return sum(group['duplicate_files'] for group in groups), sum(group['reclaimable_bytes'] for group in groups)
+
+
+def _assert_rollups_match_summary(db_operations):
+    summary = db_operations.get_duplicates_summary()
+    assert _rollup_totals(db_operations) == (summary['duplicates'], summary['reclaimable_bytes'])
+    root = db_operations.get_rollup_directory(os.sep) or {'duplicate_files': 0, 'reclaimable_bytes': 0}
+    assert (root['duplicate_files'], root['reclaimable_bytes']) == (summary['duplicates'], summary['reclaimable_bytes'])
+
+
+def test_rollups_match_the_summary_after_reconcile_and_dedupe(tmp_path, make_files):
+    source = make_files({"a/one.txt": b"12345", "b/two.txt": b"12345", "c/three.txt": b"12345",
+                         "d/four.bin": b"abcdefgh", "e/five.bin": b"abcdefgh"})
+    processor = Processor(db_name=str(tmp_path / "index.db"))
+    processor.add_files(source)
+    processor.add_duplicates()
+    _assert_rollups_match_summary(processor.db_operations)
+
+    os.remove(os.path.join(source, "c", "three.txt"))
+    os.remove(os.path.join(source, "e", "five.bin"))
+    processor.reconcile_deletions()
+    processor.add_duplicates()
+
+    summary = processor.db_operations.get_duplicates_summary()
+    assert (summary['duplicates'], summary['reclaimable_bytes']) == (1, 5)
+    _assert_rollups_match_summary(processor.db_operations)
+
+
+def test_deleted_files_added_to_a_group_are_not_rolled_up(tmp_path, make_files):
+    source = make_files({"a/one.txt": b"12345", "b/two.txt": b"12345", "c/three.txt": b"12345"})
+    processor = Processor(db_name=str(tmp_path / "index.db"))
+    processor.add_files(source)
+    db_operations = processor.db_operations
+    paths = [os.path.join(source, path) for path in ("a/one.txt", "b/two.txt", "c/three.txt")]
+    entries = db_operations.get_files_by_paths(paths)
+    original, duplicate, deleted = (entries[path]['id'] for path in paths)
+    db_operations.mark_files_deleted([deleted])
+
+    db_operations.process_duplicates(original, [duplicate, deleted])
+
+    assert _rollup_totals(db_operations) == (1, 5)
+
+
+def test_rollups_follow_the_group_of_a_deleted_original(tmp_path, make_files):
+    source = make_files({"a/one.txt": b"12345", "b/two.txt": b"12345", "c/three.txt": b"12345",
+                         "d/four.txt": b"12345"})
+    processor = Processor(db_name=str(tmp_path / "index.db"))
+    processor.add_files(source)
+    processor.add_duplicates()
+    db_operations = processor.db_operations
+    [group] = db_operations.get_top_groups()
+
+    os.remove(group['original_path'])
+    processor.reconcile_deletions()
+    _assert_rollups_match_summary(db_operations)
+    processor.add_duplicates()
+
+    summary = db_operations.get_duplicates_summary()
+    assert (summary['duplicates'], summary['reclaimable_bytes']) == (2, 10)
+    _assert_rollups_match_summary(db_operations)
+    assert group['original_path'] not in {top['original_path'] for top in db_operations.get_top_groups()}
+
+
+def test_stale_group_of_a_deleted_original_is_rebuilt_on_dedupe(tmp_path, make_files):
+    source = make_files({"a/one.txt": b"12345", "b/two.txt": b"12345", "c/three.txt": b"12345"})
+    processor = Processor(db_name=str(tmp_path / "index.db"))
+    processor.add_files(source)
+    processor.add_duplicates()
+    db_operations = processor.db_operations
+    [group] = db_operations.get_top_groups()
+    # An index written before deleted originals were regrouped: only the mark is set
+    db_operations.mark_files_deleted([group['original_id']])
+
+    processor.add_duplicates()
+
+    assert [top['original_path'] for top in db_operations.get_top_groups()] != [group['original_path']]
+    assert db_operations.conn.execute("SELECT COUNT(*) FROM duplicates").fetchone()[0] == 1
+    _assert_rollups_match_summary(db_operations)
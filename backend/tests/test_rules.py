@@ -0,0 +1,65 @@
+import os
+
+from src.config.ConfigModel import RulesConfig
+from src.core.processor import Processor
+from src.core.rules import RuleSet
+from src.core.walker import walk_files
+
+
+def test_default_rules_skip_the_paths_the_keyword_filter_skipped(make_files):
+    source = make_files({
+        "photos/a.jpg": b"a",
+        "photos/x@__thumb.jpg": b"thumbnail file",
+        "photos/.@__thumb/a.jpg": b"thumbnail cache",
+        "photos/.DS_Store": b"finder",
+        "photos/._.DS_Store": b"apple double",
+    })
+    rules = RuleSet.from_config(RulesConfig())
+
+    assert [os.path.relpath(path, source) for path in walk_files(source, rules=rules)] == \
+        [os.path.join("photos", "a.jpg")]
+    for path in ("/x/photos/x@__thumb.jpg", "/x/.@__thumb/a.jpg", "/x/photos/.DS_Store"):
+        assert rules.excludes_path(path)
+    assert not rules.excludes_path("/x/photos/a.jpg")
+
+
+def test_rules_prune_directories_and_filter_files(make_files):
+    source = make_files({
+        "keep/a.jpg": b"a" * 10,
+        "keep/b.txt": b"b" * 10,
+        "keep/small.jpg": b"s",
+        "snapshots/daily/c.jpg": b"c" * 10,
+        "cache/d.jpg": b"d" * 10,
+    })
+    rules = RuleSet(include=("*.jpg",), prune=("snapshots",), exclude_regex=(r"/cache/",), min_size=2)
+
+    assert [os.path.relpath(path, source) for path in walk_files(source, rules=rules)] == \
+        [os.path.join("keep", "a.jpg")]
+
+
+def test_prune_rules_apply_below_the_source_root_only():
+    rules = RuleSet.from_config(RulesConfig())
+    root = os.path.join(os.sep, "share", "@__thumb_archive")
+
+    assert rules.excludes_path(os.path.join(root, "photos", "a.jpg"))
+    assert not rules.excludes_path(os.path.join(root, "photos", "a.jpg"), {root})
+    assert rules.excludes_path(os.path.join(root, "photos", ".@__thumb", "a.jpg"), {root})
+
+
+def test_source_below_a_pruned_name_takes_events_and_moves(tmp_path):
+    source = tmp_path / "@__thumb_archive"
+    for name in ("a/one.jpg", "b/two.jpg"):
+        (source / name).parent.mkdir(parents=True, exist_ok=True)
+        (source / name).write_bytes(b"same content")
+    Processor(db_name=str(tmp_path / "index.db")).add_files(str(source))
+    # Another process, e.g. the watcher, knows the source from the index
+    processor = Processor(db_name=str(tmp_path / "index.db"))
+
+    (source / "c").mkdir()
+    (source / "c" / "three.jpg").write_bytes(b"same content")
+    assert processor.update_index([str(source / "c" / "three.jpg")]) == 1
+
+    processor.add_duplicates()
+    destination = tmp_path / "moved"
+    processor.move_duplicates(str(destination))
+    assert sorted(path.name for path in destination.rglob("*.jpg")) == ["three.jpg", "two.jpg"]